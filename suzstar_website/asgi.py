@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'suzstar_website.settings')
+# Each ASGI request runs its sync code in a thread of its own, so persistent
+# connections would never be reused; set DATABASE_POOL_SIZE instead
+os.environ.setdefault('DATABASE_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -7,8 +7,11 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib.auth import views as auth_views  # Add this import
 
+from website import profiling
+
 urlpatterns = [
     # Admin site
+    path('admin/profiles/', include(profiling.urls)),
     path('admin/', admin.site.urls),
     
     # Authentication URLs (place these BEFORE the website include)
@@ -1,13 +1,16 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
+from .changelists import PerformanceMixin
+from .exports import EXPORT_ACTIONS, ExportMixin
 from .models import *
 
 @admin.register(Service)
-class ServiceAdmin(admin.ModelAdmin):
+class ServiceAdmin(PerformanceMixin, admin.ModelAdmin):
     list_display = ['name', 'service_type', 'duration', 'is_active', 'order']
     list_filter = ['service_type', 'is_active']
-    search_fields = ['name', 'short_description']
+    search_fields = ['name']
+    search_index_kind = 'services'
     list_editable = ['is_active', 'order']
     fieldsets = (
         ('Basic Information', {
@@ -21,8 +24,17 @@ class ServiceAdmin(admin.ModelAdmin):
         }),
     )
 
+class CounselorAvailabilityInline(admin.TabularInline):
+    model = CounselorAvailability
+    extra = 1
+
+class CounselorBlackoutInline(admin.TabularInline):
+    model = CounselorBlackout
+    extra = 0
+
 @admin.register(Counselor)
-class CounselorAdmin(admin.ModelAdmin):
+class CounselorAdmin(PerformanceMixin, admin.ModelAdmin):
+    inlines = [CounselorAvailabilityInline, CounselorBlackoutInline]
     list_display = ['name', 'title', 'experience_years', 'is_active', 'order']
     list_filter = ['is_active', 'languages']
     search_fields = ['name', 'title', 'specialties']
@@ -46,13 +58,18 @@ class CounselorAdmin(admin.ModelAdmin):
     image_preview.short_description = 'Preview'
 
 @admin.register(BlogPost)
-class BlogPostAdmin(admin.ModelAdmin):
+class BlogPostAdmin(PerformanceMixin, ExportMixin, admin.ModelAdmin):
     list_display = ['title', 'author', 'category', 'published_date', 'is_featured', 'is_published', 'views_count']
     list_filter = ['category', 'is_featured', 'is_published', 'published_date']
-    search_fields = ['title', 'content', 'tags']
+    # content is searched through the full-text index, not LIKE
+    search_fields = ['title', 'tags']
+    search_index_kind = 'blog'
     prepopulated_fields = {'slug': ('title',)}
     list_editable = ['is_featured', 'is_published']
     date_hierarchy = 'published_date'
+    actions = EXPORT_ACTIONS
+    export_fields = ['id', 'title', 'slug', 'author', 'category', 'tags', 'excerpt', 'content', 'word_count',
+                     'reading_time', 'views_count', 'is_featured', 'is_published', 'published_date', 'updated_at']
     fieldsets = (
         ('Blog Information', {
             'fields': ('title', 'slug', 'author', 'category')
@@ -71,11 +88,12 @@ class BlogPostAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 @admin.register(Appointment)
-class AppointmentAdmin(admin.ModelAdmin):
+class AppointmentAdmin(PerformanceMixin, ExportMixin, admin.ModelAdmin):
     list_display = ['name', 'preferred_date', 'preferred_time', 'appointment_type', 'session_mode', 'counselor_name', 'status']
     list_filter = ['status', 'appointment_type', 'session_mode', 'preferred_date']
     search_fields = ['name', 'email', 'phone']
     list_editable = ['status']
+    list_select_related = ['counselor']
     date_hierarchy = 'preferred_date'
     fieldsets = (
         ('Client Information', {
@@ -96,7 +114,10 @@ class AppointmentAdmin(admin.ModelAdmin):
         return obj.counselor.name if obj.counselor else "Not assigned"
     counselor_name.short_description = 'Counselor'
     
-    actions = ['mark_as_confirmed', 'mark_as_completed']
+    actions = ['mark_as_confirmed', 'mark_as_completed', *EXPORT_ACTIONS]
+    export_fields = ['id', 'name', 'email', 'phone', 'is_new_client', 'preferred_date', 'preferred_time',
+                     'appointment_type', 'session_mode', 'counselor__name', 'concerns', 'hear_about_us',
+                     'status', 'notes', 'created_at']
     
     def mark_as_confirmed(self, request, queryset):
         queryset.update(status='confirmed')
@@ -107,7 +128,7 @@ class AppointmentAdmin(admin.ModelAdmin):
     mark_as_completed.short_description = "Mark selected as completed"
 
 @admin.register(ContactMessage)
-class ContactMessageAdmin(admin.ModelAdmin):
+class ContactMessageAdmin(PerformanceMixin, ExportMixin, admin.ModelAdmin):
     list_display = ['name', 'email', 'subject', 'created_at', 'is_read', 'is_replied']
     list_filter = ['is_read', 'is_replied', 'created_at']
     search_fields = ['name', 'email', 'subject', 'message']
@@ -115,7 +136,9 @@ class ContactMessageAdmin(admin.ModelAdmin):
     date_hierarchy = 'created_at'
     readonly_fields = ['created_at']
     
-    actions = ['mark_as_read', 'mark_as_unread']
+    actions = ['mark_as_read', 'mark_as_unread', *EXPORT_ACTIONS]
+    export_fields = ['id', 'name', 'email', 'phone', 'subject', 'message', 'is_read', 'is_replied',
+                     'replied_at', 'created_at']
     
     def mark_as_read(self, request, queryset):
         queryset.update(is_read=True)
@@ -126,10 +149,11 @@ class ContactMessageAdmin(admin.ModelAdmin):
     mark_as_unread.short_description = "Mark selected as unread"
 
 @admin.register(Resource)
-class ResourceAdmin(admin.ModelAdmin):
+class ResourceAdmin(PerformanceMixin, admin.ModelAdmin):
     list_display = ['title', 'resource_type', 'category', 'is_featured', 'downloads_count', 'created_at']
     list_filter = ['resource_type', 'category', 'is_featured']
-    search_fields = ['title', 'description']
+    search_fields = ['title']
+    search_index_kind = 'resources'
     list_editable = ['is_featured']
     fieldsets = (
         ('Resource Information', {
@@ -144,7 +168,7 @@ class ResourceAdmin(admin.ModelAdmin):
     )
 
 @admin.register(Testimonial)
-class TestimonialAdmin(admin.ModelAdmin):
+class TestimonialAdmin(PerformanceMixin, admin.ModelAdmin):
     list_display = ['client_initials', 'rating', 'service_received', 'is_featured', 'is_approved', 'created_at']
     list_filter = ['rating', 'is_featured', 'is_approved']
     search_fields = ['client_name', 'testimonial']
@@ -162,10 +186,11 @@ class TestimonialAdmin(admin.ModelAdmin):
     )
 
 @admin.register(FAQ)
-class FAQAdmin(admin.ModelAdmin):
+class FAQAdmin(PerformanceMixin, admin.ModelAdmin):
     list_display = ['question', 'category', 'order', 'is_active']
     list_filter = ['category', 'is_active']
-    search_fields = ['question', 'answer']
+    search_fields = ['question']
+    search_index_kind = 'faqs'
     list_editable = ['order', 'is_active']
     fieldsets = (
         (None, {
@@ -174,12 +199,16 @@ class FAQAdmin(admin.ModelAdmin):
     )
 
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
+class EventAdmin(PerformanceMixin, ExportMixin, admin.ModelAdmin):
     list_display = ['title', 'event_type', 'start_date', 'location', 'is_online', 'spots_available', 'is_published']
     list_filter = ['event_type', 'is_online', 'is_published', 'start_date']
-    search_fields = ['title', 'description', 'location']
+    search_fields = ['title', 'location']
+    search_index_kind = 'events'
     list_editable = ['is_published']
     date_hierarchy = 'start_date'
+    actions = EXPORT_ACTIONS
+    export_fields = ['id', 'title', 'event_type', 'start_date', 'end_date', 'location', 'is_online',
+                     'max_participants', 'current_participants', 'price', 'is_featured', 'is_published']
     fieldsets = (
         ('Event Information', {
             'fields': ('title', 'event_type', 'description', 'featured_image')
@@ -203,30 +232,15 @@ class EventAdmin(admin.ModelAdmin):
     spots_available.short_description = "Spots Available"
 
 @admin.register(NewsletterSubscriber)
-class NewsletterSubscriberAdmin(admin.ModelAdmin):
+class NewsletterSubscriberAdmin(PerformanceMixin, ExportMixin, admin.ModelAdmin):
     list_display = ['email', 'first_name', 'is_active', 'subscribed_date']
     list_filter = ['is_active', 'subscribed_date']
     search_fields = ['email', 'first_name']
     list_editable = ['is_active']
     date_hierarchy = 'subscribed_date'
     
-    actions = ['export_subscribers']
-    
-    def export_subscribers(self, request, queryset):
-        import csv
-        from django.http import HttpResponse
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="subscribers.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Email', 'First Name', 'Subscribed Date'])
-        
-        for subscriber in queryset:
-            writer.writerow([subscriber.email, subscriber.first_name, subscriber.subscribed_date])
-        
-        return response
-    export_subscribers.short_description = "Export selected subscribers"
+    actions = EXPORT_ACTIONS
+    export_fields = ['email', 'first_name', 'is_active', 'subscribed_date', 'unsubscribed_date']
 
 @admin.register(SiteSetting)
 class SiteSettingAdmin(admin.ModelAdmin):
@@ -250,4 +264,81 @@ class SiteSettingAdmin(admin.ModelAdmin):
         ('SEO & Analytics', {
             'fields': ('meta_description', 'meta_keywords', 'google_analytics_id')
         }),
-    )
\ No newline at end of file
+    )
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(PerformanceMixin, admin.ModelAdmin):
+    list_display = ['subject', 'recipients', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status']
+    search_fields = ['subject', 'recipients']
+    readonly_fields = ['created_at', 'sent_at', 'last_error']
+    
+    actions = ['requeue']
+    
+    def requeue(self, request, queryset):
+        from django.utils import timezone
+        queryset.exclude(status='sent').update(status='queued', attempts=0, next_attempt_at=timezone.now())
+    requeue.short_description = "Requeue selected emails"
+
+@admin.register(ProcessedImage)
+class ProcessedImageAdmin(PerformanceMixin, admin.ModelAdmin):
+    list_display = ['name', 'status', 'width', 'height', 'updated_at']
+    list_filter = ['status']
+    search_fields = ['name']
+    readonly_fields = ['name', 'source_hash', 'width', 'height', 'variants', 'last_error', 'claimed_at', 'updated_at']
+    
+    actions = ['reprocess']
+    
+    def reprocess(self, request, queryset):
+        queryset.update(status='pending', source_hash='', claimed_at=None)
+    reprocess.short_description = "Rebuild derivatives of selected images"
+
+@admin.register(EventRegistration)
+class EventRegistrationAdmin(PerformanceMixin, admin.ModelAdmin):
+    list_display = ['name', 'email', 'event', 'status', 'created_at']
+    list_filter = ['status']
+    search_fields = ['name', 'email', 'event__title']
+    list_select_related = ['event']
+    readonly_fields = ['event', 'status', 'created_at']
+    
+    actions = ['cancel_registrations']
+    
+    def cancel_registrations(self, request, queryset):
+        from .registrations import cancel_registration
+        for registration in queryset.exclude(status='cancelled'):
+            cancel_registration(registration)
+    cancel_registrations.short_description = "Cancel selected (promotes the waitlist)"
+
+@admin.register(Campaign)
+class CampaignAdmin(PerformanceMixin, admin.ModelAdmin):
+    list_display = ['subject', 'status', 'sent_count', 'failed_count', 'created_at', 'started_at', 'finished_at']
+    list_filter = ['status']
+    search_fields = ['subject']
+    readonly_fields = ['status', 'created_at', 'started_at', 'finished_at']
+    
+    def get_queryset(self, request):
+        from django.db.models import Count, Q
+        return super().get_queryset(request).annotate(
+            sent_count=Count('deliveries', filter=Q(deliveries__status='sent')),
+            failed_count=Count('deliveries', filter=Q(deliveries__status='failed')),
+        )
+    
+    def sent_count(self, obj):
+        return obj.sent_count
+    sent_count.short_description = "Sent"
+    sent_count.admin_order_field = 'sent_count'
+    
+    def failed_count(self, obj):
+        return obj.failed_count
+    failed_count.short_description = "Failed"
+
+@admin.register(CampaignDelivery)
+class CampaignDeliveryAdmin(PerformanceMixin, admin.ModelAdmin):
+    list_display = ['subscriber', 'campaign', 'status', 'attempts', 'sent_at']
+    list_filter = ['status', 'campaign']
+    search_fields = ['subscriber__email']
+    list_select_related = ['subscriber', 'campaign']
+    readonly_fields = ['campaign', 'subscriber', 'status', 'attempts', 'last_error', 'sent_at']
+    
+    def has_add_permission(self, request):
+        return False
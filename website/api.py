@@ -0,0 +1,242 @@
+"""
+Read-only JSON API, mounted at /api/v1/.
+
+Each endpoint in ENDPOINTS exposes the public rows of one model with a
+fixed allowlist of fields. Lists are cursor-paginated (pagination.py) and
+fetched with ``values()``, so only the projected columns are read and no
+model instances are built. ``?fields=a,b`` narrows the projection further.
+
+Every response carries a strong ETag and a Last-Modified derived from
+``updated_at``: for a list, the newest ``updated_at`` and the row count of
+the filtered queryset, read with one aggregate query before anything else;
+for a detail, the row's own, read with the row. A matching If-None-Match
+(or If-Modified-Since) is answered with 304 without fetching (lists) or
+serializing any rows.
+"""
+import hashlib
+from dataclasses import dataclass
+
+from django.core.files.storage import default_storage
+from django.db.models import Count, FileField, Max
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .models import FAQ, BlogPost, Counselor, Event, Resource, Service, Testimonial
+from .pagination import CursorPaginator
+
+API_VERSION = 'v1'
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    queryset: object
+    fields: tuple
+    # Default projection for lists when it should leave out heavy fields
+    list_fields: tuple = None
+    # File fields served through a view rather than straight from media
+    file_views: dict = None
+
+    @property
+    def model(self):
+        return self.queryset.model
+
+
+ENDPOINTS = {
+    'services': Endpoint(
+        Service.objects.filter(is_active=True),
+        fields=('id', 'name', 'service_type', 'short_description', 'description_html', 'icon_name',
+                'price_range', 'duration', 'order', 'updated_at'),
+    ),
+    'counselors': Endpoint(
+        Counselor.objects.filter(is_active=True),
+        fields=('id', 'name', 'title', 'bio_html', 'image', 'specialties', 'languages',
+                'experience_years', 'order', 'updated_at'),
+    ),
+    'blog': Endpoint(
+        BlogPost.objects.filter(is_published=True),
+        fields=('id', 'title', 'slug', 'author', 'featured_image', 'excerpt', 'content_html', 'category',
+                'tags', 'is_featured', 'word_count', 'reading_time', 'published_date', 'updated_at'),
+        list_fields=('id', 'title', 'slug', 'author', 'featured_image', 'excerpt', 'category', 'tags',
+                     'is_featured', 'reading_time', 'published_date', 'updated_at'),
+    ),
+    'events': Endpoint(
+        Event.objects.filter(is_published=True),
+        fields=('id', 'title', 'event_type', 'description_html', 'featured_image', 'start_date', 'end_date',
+                'location', 'is_online', 'max_participants', 'current_participants', 'price', 'is_featured',
+                'updated_at'),
+    ),
+    'resources': Endpoint(
+        Resource.objects.all(),
+        fields=('id', 'title', 'resource_type', 'description', 'external_url', 'file_upload', 'category',
+                'is_featured', 'created_at', 'updated_at'),
+        # Downloads are counted and support Range (downloads.py)
+        file_views={'file_upload': 'website:download_resource'},
+    ),
+    'faqs': Endpoint(
+        FAQ.objects.filter(is_active=True),
+        fields=('id', 'question', 'answer_html', 'category', 'order', 'updated_at'),
+    ),
+    'testimonials': Endpoint(
+        Testimonial.objects.filter(is_approved=True),
+        fields=('id', 'client_initials', 'location', 'testimonial', 'rating', 'service_received_id',
+                'is_featured', 'created_at', 'updated_at'),
+    ),
+}
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _error(message, status):
+    return JsonResponse({'error': message}, status=status)
+
+
+def _projection(request, endpoint, detail):
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(endpoint.fields if detail or not endpoint.list_fields else endpoint.list_fields)
+    fields = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = sorted(set(fields) - set(endpoint.fields))
+    if unknown:
+        raise ApiError(f"Unknown field(s) {', '.join(unknown)}; choose from {', '.join(endpoint.fields)}")
+    return fields
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ApiError('limit must be a number')
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def _key_columns(model):
+    """Columns the cursor is built from: the model's ordering plus the pk"""
+    pk = model._meta.pk.attname
+    return [pk if name.lstrip('-') == 'pk' else name.lstrip('-') for name in model._meta.ordering] + [pk]
+
+
+def _file_urls(endpoint, fields):
+    """field -> function turning a row's stored file name into a URL"""
+    urls = {}
+    for name in fields:
+        if not isinstance(endpoint.model._meta.get_field(name), FileField):
+            continue
+        view = (endpoint.file_views or {}).get(name)
+        if view:
+            urls[name] = lambda row, view=view: reverse(view, args=[row['id']])
+        else:
+            urls[name] = lambda row, name=name: default_storage.url(row[name])
+    return urls
+
+
+def serialize(rows, fields, file_urls=None):
+    """Project ``values()`` rows onto ``fields``, turning file names into URLs"""
+    results = []
+    for row in rows:
+        item = {name: row[name] for name in fields}
+        for name, url in (file_urls or {}).items():
+            item[name] = url(row) if row[name] else None
+        results.append(item)
+    return results
+
+
+def _aggregate(queryset):
+    """(newest updated_at, row count) of a queryset, in one query"""
+    state = queryset.aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+    return state['last_modified'], state['count']
+
+
+def _validators(request, last_modified, count):
+    """Strong ETag and Last-Modified for the rows a request would return"""
+    query = sorted(request.GET.lists())
+    digest = hashlib.md5(
+        f"{API_VERSION}|{request.path}|{query}|{last_modified and last_modified.isoformat()}|{count}".encode()
+    ).hexdigest()
+    # HTTP dates have whole seconds
+    return f'"{digest}"', last_modified and int(last_modified.timestamp())
+
+
+def _respond(request, last_modified, count, build):
+    etag, last_modified = _validators(request, last_modified, count)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = build(count)
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+    return response
+
+
+def _page_url(request, cursor):
+    if not cursor:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+
+@require_safe
+def list_view(request, endpoint):
+    """GET /api/v1/<endpoint>/ with ?fields=, ?limit= and ?cursor="""
+    if endpoint not in ENDPOINTS:
+        return _error(f'Unknown endpoint {endpoint!r}', 404)
+    config = ENDPOINTS[endpoint]
+    try:
+        fields = _projection(request, config, detail=False)
+        limit = _limit(request)
+    except ApiError as exc:
+        return _error(str(exc), exc.status)
+
+    def build(count):
+        columns = list(dict.fromkeys(fields + _key_columns(config.model)))
+        paginator = CursorPaginator(config.queryset.values(*columns), limit)
+        page = paginator.get_page(request.GET.get('cursor'))
+        return JsonResponse({
+            'count': count,
+            'next': _page_url(request, page.next_cursor),
+            'previous': _page_url(request, page.previous_cursor),
+            'results': serialize(page.object_list, fields, _file_urls(config, fields)),
+        })
+
+    return _respond(request, *_aggregate(config.queryset), build)
+
+
+@require_safe
+def detail_view(request, endpoint, pk):
+    """GET /api/v1/<endpoint>/<pk>/ with ?fields="""
+    if endpoint not in ENDPOINTS:
+        return _error(f'Unknown endpoint {endpoint!r}', 404)
+    config = ENDPOINTS[endpoint]
+    try:
+        fields = _projection(request, config, detail=True)
+    except ApiError as exc:
+        return _error(str(exc), exc.status)
+
+    # Read once: the row's own updated_at makes the validators
+    rows = list(config.queryset.filter(pk=pk).values(*dict.fromkeys([*fields, 'id', 'updated_at'])))
+    if not rows:
+        return _error('Not found', 404)
+
+    def build(count):
+        return JsonResponse(serialize(rows, fields, _file_urls(config, fields))[0])
+
+    return _respond(request, rows[0]['updated_at'], 1, build)
+
+
+@require_safe
+def api_root(request):
+    """Index of endpoints"""
+    return JsonResponse({
+        'version': API_VERSION,
+        'endpoints': {name: request.build_absolute_uri(reverse('website:api_list', args=[name])) for name in ENDPOINTS},
+    })
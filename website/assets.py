@@ -0,0 +1,123 @@
+"""
+Static asset pipeline, run by ``collectstatic``.
+
+``BundledStaticFilesStorage`` concatenates and minifies the bundles named in
+``settings.STATIC_BUNDLES`` into STATIC_ROOT, then hands every file to
+WhiteNoise's manifest storage, which fingerprints them (``site.3f2a....css``)
+and writes ``.gz`` and ``.br`` siblings. WhiteNoise's middleware serves the
+fingerprinted names with ``Cache-Control: immutable`` and picks the
+precompressed variant from the request's Accept-Encoding
+(``StaticFilesMiddleware`` below, an async-capable subclass).
+
+Templates reference bundles with ``{% bundle 'css/site.css' %}`` (see
+templatetags/assets.py). Until collectstatic has built a bundle, as in
+development and tests, the tag falls back to the individual source files.
+
+CSS ``url()`` references are rewritten relative to the bundle, so keep a
+bundle in the same directory as its sources or use absolute paths.
+"""
+import logging
+
+import rcssmin
+import rjsmin
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.files.base import ContentFile
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+logger = logging.getLogger(__name__)
+
+MINIFIERS = {
+    '.css': (rcssmin.cssmin, '\n'),
+    '.js': (rjsmin.jsmin, ';\n'),  # guard against sources without a trailing semicolon
+}
+
+
+def _extension(name):
+    return name[name.rfind('.'):] if '.' in name else ''
+
+
+def minify(name, text):
+    """Minify CSS or JS source ``text`` by the extension of ``name``"""
+    minifier, _ = MINIFIERS.get(_extension(name), (None, None))
+    return minifier(text) if minifier else text
+
+
+def bundle_sources(name):
+    return settings.STATIC_BUNDLES[name]
+
+
+class BundledStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """WhiteNoise's compressed manifest storage plus minified bundles"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._reported_missing = set()
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            for name in self.build_bundles():
+                paths[name] = (self, name)
+        yield from super().post_process(paths, dry_run, **options)
+
+    def build_bundles(self):
+        """Write each configured bundle into STATIC_ROOT and return their names"""
+        built = []
+        for name, sources in settings.STATIC_BUNDLES.items():
+            _, separator = MINIFIERS.get(_extension(name), (None, '\n'))
+            parts = []
+            for source in sources:
+                with self.open(source) as handle:
+                    parts.append(minify(source, handle.read().decode('utf-8')).strip())
+            if self.exists(name):
+                self.delete(name)
+            self.save(name, ContentFile(separator.join(parts).encode('utf-8')))
+            built.append(name)
+        return built
+
+    def has_bundle(self, name):
+        """True once collectstatic has built and fingerprinted ``name``"""
+        return self.hash_key(name) in self.hashed_files
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Not collected yet (development, tests) or a template points at
+            # a file that was never added: link the plain name like the
+            # default storage would rather than failing the whole page.
+            if self.hashed_files and name not in self._reported_missing:
+                self._reported_missing.add(name)
+                logger.warning('Static file %r is missing from the manifest', name)
+            return name
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise's middleware, async-capable. WhiteNoise itself is sync-only,
+    which under ASGI makes Django run every request, static or not, through
+    a thread hop at the top of the middleware stack. Here only the file
+    lookup and serving run in a thread; other requests go straight on.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
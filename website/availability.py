@@ -0,0 +1,201 @@
+"""
+Counselor availability and appointment slots.
+
+Counselors have weekly working hours (CounselorAvailability) and blackout
+dates (CounselorBlackout); session lengths come from Service.duration,
+matched on service type. ``free_slots`` loads everything it needs for
+any number of counselors and days in four queries, then checks candidate
+slots against a per-day index of merged busy intervals with bisect
+instead of querying per slot.
+
+Bookings are checked again by ``lock_and_check_slot`` inside the saving
+transaction with the counselor's row locked, so two overlapping bookings
+cannot both pass. The Appointment unique constraint on (counselor,
+preferred_date, preferred_time) backs up identical start times.
+"""
+import re
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import time, timedelta
+
+from django.utils import timezone
+
+from .models import Appointment, Counselor, CounselorAvailability, CounselorBlackout, Service
+
+DEFAULT_DURATION = 60
+
+
+def parse_duration(text):
+    """Minutes from a Service.duration like '45-60 minutes' or '1.5 hours' (longest wins)"""
+    numbers = [float(n) for n in re.findall(r'\d+(?:\.\d+)?', text or '')]
+    if not numbers:
+        return DEFAULT_DURATION
+    minutes = max(numbers)
+    if re.search(r'\bh(ou)?rs?\b', text, re.I) and not re.search(r'min', text, re.I):
+        minutes *= 60
+    return round(minutes)
+
+
+def session_durations():
+    """{appointment_type: minutes}, from the first active Service of that type"""
+    durations = {}
+    services = Service.objects.filter(is_active=True).order_by('order', 'name')
+    for service_type, duration in services.values_list('service_type', 'duration'):
+        durations.setdefault(service_type, parse_duration(duration))
+    return durations
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def _time(minutes):
+    return time(minutes // 60, minutes % 60)
+
+
+class BusyIndex:
+    """Sorted, merged busy intervals (in minutes) per counselor and day"""
+
+    def __init__(self):
+        self._raw = defaultdict(list)
+        self._starts = {}
+        self._ends = {}
+
+    def add(self, counselor_id, day, start, end):
+        self._raw[(counselor_id, day)].append((start, end))
+
+    def freeze(self):
+        for key, intervals in self._raw.items():
+            starts, ends = [], []
+            for start, end in sorted(intervals):
+                if ends and start < ends[-1]:
+                    ends[-1] = max(ends[-1], end)
+                else:
+                    starts.append(start)
+                    ends.append(end)
+            self._starts[key] = starts
+            self._ends[key] = ends
+        return self
+
+    def is_free(self, counselor_id, day, start, end):
+        starts = self._starts.get((counselor_id, day))
+        if not starts:
+            return True
+        ends = self._ends[(counselor_id, day)]
+        i = bisect_right(starts, start) - 1
+        if i >= 0 and ends[i] > start:
+            return False
+        return i + 1 >= len(starts) or starts[i + 1] >= end
+
+
+class Schedule:
+    """Working hours, blackouts and bookings for some counselors over a date range"""
+
+    def __init__(self, counselor_ids, start_date, end_date, exclude_appointment=None):
+        self.counselor_ids = list(counselor_ids)
+        self.start_date = start_date
+        self.end_date = end_date
+        self.durations = session_durations()
+
+        self.windows = defaultdict(list)
+        self.has_hours = set()
+        hours = CounselorAvailability.objects.filter(counselor_id__in=self.counselor_ids)
+        for counselor_id, weekday, start, end in hours.values_list(
+            'counselor_id', 'weekday', 'start_time', 'end_time'
+        ):
+            self.windows[(counselor_id, weekday)].append((_minutes(start), _minutes(end)))
+            self.has_hours.add(counselor_id)
+
+        self.blackouts = defaultdict(list)
+        blackouts = CounselorBlackout.objects.filter(
+            counselor_id__in=self.counselor_ids,
+            start_date__lte=end_date,
+            end_date__gte=start_date,
+        )
+        for counselor_id, first, last in blackouts.values_list('counselor_id', 'start_date', 'end_date'):
+            self.blackouts[counselor_id].append((first, last))
+
+        self.busy = BusyIndex()
+        bookings = Appointment.objects.filter(
+            counselor_id__in=self.counselor_ids,
+            preferred_date__range=(start_date, end_date),
+        ).exclude(status='cancelled')
+        if exclude_appointment is not None:
+            bookings = bookings.exclude(pk=exclude_appointment)
+        for counselor_id, day, start, appointment_type in bookings.values_list(
+            'counselor_id', 'preferred_date', 'preferred_time', 'appointment_type'
+        ).order_by():
+            start = _minutes(start)
+            self.busy.add(counselor_id, day, start, start + self.duration(appointment_type))
+        self.busy.freeze()
+
+    def duration(self, appointment_type):
+        return self.durations.get(appointment_type, DEFAULT_DURATION)
+
+    def is_blacked_out(self, counselor_id, day):
+        return any(first <= day <= last for first, last in self.blackouts.get(counselor_id, ()))
+
+    def free_slots(self, counselor_id, appointment_type='individual', step=None, now=None):
+        """{date: [time, ...]} of bookable start times for one counselor"""
+        duration = self.duration(appointment_type)
+        step = step or duration
+        now = timezone.localtime(now)
+        slots = {}
+        day = self.start_date
+        while day <= self.end_date:
+            earliest = _minutes(now) if day == now.date() else 0
+            if day >= now.date() and not self.is_blacked_out(counselor_id, day):
+                starts = []
+                for window_start, window_end in sorted(self.windows.get((counselor_id, day.weekday()), ())):
+                    start = window_start
+                    while start + duration <= window_end:
+                        if start >= earliest and self.busy.is_free(counselor_id, day, start, start + duration):
+                            starts.append(_time(start))
+                        start += step
+                if starts:
+                    slots[day] = starts
+            day += timedelta(days=1)
+        return slots
+
+    def check(self, counselor_id, day, start_time, appointment_type):
+        """Why this booking is not possible, or None if it is"""
+        start = _minutes(start_time)
+        end = start + self.duration(appointment_type)
+        if self.is_blacked_out(counselor_id, day):
+            return 'The counselor is not available on this date.'
+        # Counselors without configured hours can be booked at any time
+        if counselor_id in self.has_hours and not any(
+            window_start <= start and end <= window_end
+            for window_start, window_end in self.windows.get((counselor_id, day.weekday()), ())
+        ):
+            return "This time is outside the counselor's working hours."
+        if not self.busy.is_free(counselor_id, day, start, end):
+            return 'The counselor is already booked at this time. Please choose another slot.'
+        return None
+
+
+def free_slots(counselor_ids, start_date, end_date, appointment_type='individual', step=None):
+    """{counselor_id: {date: [time, ...]}} for every counselor, in four queries"""
+    schedule = Schedule(counselor_ids, start_date, end_date)
+    return {
+        counselor_id: schedule.free_slots(counselor_id, appointment_type, step)
+        for counselor_id in schedule.counselor_ids
+    }
+
+
+def check_slot(counselor, day, start_time, appointment_type, exclude_appointment=None):
+    """Error message if the counselor can't take this booking, else None"""
+    schedule = Schedule([counselor.pk], day, day, exclude_appointment)
+    return schedule.check(counselor.pk, day, start_time, appointment_type)
+
+
+def lock_and_check_slot(counselor, day, start_time, appointment_type, exclude_appointment=None):
+    """
+    ``check_slot`` for use inside the transaction that saves the booking.
+    The counselor's row stays locked (SELECT ... FOR UPDATE) until it
+    commits, so a concurrent booking waits and then sees this one. SQLite
+    has no row locks, but its IMMEDIATE transactions already take the
+    write lock at BEGIN.
+    """
+    list(Counselor.objects.select_for_update().filter(pk=counselor.pk).values_list('pk'))
+    return check_slot(counselor, day, start_time, appointment_type, exclude_appointment)
@@ -0,0 +1,136 @@
+"""
+Cache helpers for the website app.
+
+The SiteSetting singleton is read on every page but almost never changes,
+so it is kept in process memory and in the Django cache under a version
+key. Saving or deleting the SiteSetting bumps the version (see signals.py),
+which makes every worker reload it on its next request. Use a shared cache
+backend (e.g. Redis) in production so the version is seen by all workers.
+
+Read-mostly public pages are cached whole for anonymous visitors by
+``cache_public_page``. Page keys include a content version that signals
+bump whenever public content is edited, so admin changes show up at once.
+"""
+import hashlib
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+
+from . import metrics
+from .models import SiteSetting
+
+SITE_SETTINGS_VERSION_KEY = 'website:site_settings:version'
+SITE_SETTINGS_KEY = 'website:site_settings:%s'
+
+CONTENT_VERSION_KEY = 'website:content_version'
+PAGE_KEY = 'website:page:%s:%s'
+PAGE_STATS_KEY = 'website:page_cache:%s'
+
+_MISSING = object()
+
+# (version, SiteSetting or None) for this process. Replaced as a whole so
+# readers never see a half-updated pair.
+_local_site_settings = (None, None)
+
+
+def _version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def get_site_settings():
+    """Return the SiteSetting singleton (or None) without hitting the database"""
+    global _local_site_settings
+    version = _version(SITE_SETTINGS_VERSION_KEY)
+    local_version, site_settings = _local_site_settings
+    if version is not None and local_version == version:
+        return site_settings
+
+    site_settings = cache.get(SITE_SETTINGS_KEY % version, _MISSING)
+    if site_settings is _MISSING:
+        site_settings = SiteSetting.objects.first()
+        cache.set(SITE_SETTINGS_KEY % version, site_settings, None)
+    _local_site_settings = (version, site_settings)
+    return site_settings
+
+
+def invalidate_site_settings():
+    """Force every worker to reload the SiteSetting on its next request"""
+    global _local_site_settings
+    cache.set(SITE_SETTINGS_VERSION_KEY, uuid.uuid4().hex, None)
+    _local_site_settings = (None, None)
+
+
+def bump_content_version():
+    """Invalidate every cached public page"""
+    cache.set(CONTENT_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def _count(stat):
+    key = PAGE_STATS_KEY % stat
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def page_cache_stats():
+    hits = cache.get(PAGE_STATS_KEY % 'hits', 0)
+    misses = cache.get(PAGE_STATS_KEY % 'misses', 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / total if total else 0.0,
+    }
+
+
+def _is_cacheable_request(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    # Only look the user up when there is a session to find them in
+    if settings.SESSION_COOKIE_NAME in request.COOKIES and request.user.is_authenticated:
+        return False
+    # Pending flash messages are rendered into the page
+    return not len(get_messages(request))
+
+
+def _is_cacheable_response(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        # A page with a CSRF token in it is specific to one visitor
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    )
+
+
+def cache_public_page(view):
+    """Cache a view's full response for anonymous GETs, keyed by URL and content version"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not _is_cacheable_request(request):
+            return view(request, *args, **kwargs)
+
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        key = PAGE_KEY % (_version(CONTENT_VERSION_KEY), path)
+        response = cache.get(key)
+        if response is not None:
+            _count('hits')
+            metrics.count_page_cache(True)
+            return response
+
+        _count('misses')
+        metrics.count_page_cache(False)
+        response = view(request, *args, **kwargs)
+        if _is_cacheable_response(request, response):
+            cache.set(key, response, getattr(settings, 'PAGE_CACHE_TIMEOUT', 600))
+        return response
+    return wrapper
@@ -0,0 +1,212 @@
+"""
+Admin changelists that stay fast on large tables.
+
+``PerformanceMixin`` is mixed into the ModelAdmins in admin.py:
+
+* related objects shown in ``list_display`` are joined in: explicit
+  ``list_select_related`` wins, otherwise every foreign key listed is used
+  (Django's default skips nullable ones, hence N+1 queries);
+* the paginator counts exactly only up to ADMIN_COUNT_THRESHOLD rows. Above
+  that an unfiltered list shows the table size estimate (pg_class on
+  PostgreSQL, the highest primary key elsewhere) and a filtered one shows
+  the threshold, so page 1 of a million-row table needs no COUNT(*);
+  ``show_full_result_count`` is off for the same reason. As that count is
+  approximate, any page with rows on it is served, and the page links
+  reach the page after the current one while there is one;
+* with ``search_index_kind`` set, the search box also matches the SearchEntry
+  full-text index (search.py) instead of LIKE-scanning rich text;
+* the date hierarchy offers every year/month/day between the first and last
+  date, read from the two ends of the column's index, instead of a
+  DISTINCT over the whole table (see templatetags/changelists.py);
+* distinct-value list filters are cached for ADMIN_FILTER_CACHE_TTL.
+"""
+import hashlib
+from datetime import date, datetime
+from math import ceil
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connections, models
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from . import search
+
+FILTER_CHOICES_KEY = 'website:admin_filter:%s'
+
+
+def estimated_rows(queryset):
+    """Cheap upper estimate of the number of rows in the queryset's table"""
+    model = queryset.model
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+            row = cursor.fetchone()
+        if row and row[0] > 0:
+            return row[0]
+    return model._default_manager.using(queryset.db).aggregate(last=models.Max('pk'))['last'] or 0
+
+
+class ThresholdCountPaginator(Paginator):
+    """Paginator that never counts more than ``threshold`` rows"""
+
+    def __init__(self, *args, threshold=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threshold = settings.ADMIN_COUNT_THRESHOLD if threshold is None else threshold
+        # Set when the count is approximate: rows known to exist, and the
+        # furthest page known to have rows
+        self.rows_at_least = None
+        self.furthest_page = 0
+
+    @cached_property
+    def count(self):
+        # COUNT over a LIMITed subquery stops after threshold + 1 rows
+        bounded = self.object_list.order_by()[:self.threshold + 1].count()
+        if bounded <= self.threshold:
+            return bounded
+        self.rows_at_least = bounded
+        if not self.object_list.query.where:
+            return max(estimated_rows(self.object_list), bounded)
+        return self.threshold
+
+    @property
+    def approximate(self):
+        self.count  # sets rows_at_least
+        return self.rows_at_least is not None
+
+    @property
+    def num_pages(self):
+        if not self.approximate:
+            return super().num_pages
+        return max(ceil(self.rows_at_least / self.per_page), self.furthest_page)
+
+    def validate_number(self, number):
+        if not self.approximate:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        if not self.approximate:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = self.object_list[bottom:bottom + self.per_page]
+        # len() runs the slice once and keeps its rows; it stays a queryset
+        # for list_editable
+        size = len(rows)
+        if not size and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        top = bottom + self.per_page
+        more = size == self.per_page and self.object_list[top:top + 1].exists()
+        self.furthest_page = max(self.furthest_page, number + 1 if more else number)
+        return self._get_page(rows, number, self)
+
+
+class CachedAllValuesFieldListFilter(admin.AllValuesFieldListFilter):
+    """AllValuesFieldListFilter whose SELECT DISTINCT is cached for a while"""
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        key = FILTER_CHOICES_KEY % hashlib.md5(f'{model._meta.label}.{field_path}'.encode()).hexdigest()
+        choices = cache.get(key)
+        if choices is None:
+            # The parent leaves a lazy DISTINCT queryset here
+            choices = list(self.lookup_choices)
+            cache.set(key, choices, settings.ADMIN_FILTER_CACHE_TTL)
+        self.lookup_choices = choices
+
+
+class IndexedDates:
+    """
+    Stands in for ``cl.queryset`` in Django's date_hierarchy tag, which only
+    calls ``aggregate(first=Min, last=Max)`` and ``dates()``/``datetimes()``.
+    Both are answered from the first and last value of the field.
+    """
+
+    def __init__(self, queryset, field_name, is_datetime):
+        self.queryset = queryset.filter(**{f'{field_name}__isnull': False})
+        self.field_name = field_name
+        self.is_datetime = is_datetime
+
+    @cached_property
+    def edges(self):
+        ordered = self.queryset.values_list(self.field_name, flat=True)
+        first = ordered.order_by(self.field_name).first()
+        last = ordered.order_by(f'-{self.field_name}').first()
+        if self.is_datetime and first is not None and settings.USE_TZ:
+            first, last = timezone.localtime(first), timezone.localtime(last)
+        return first, last
+
+    def aggregate(self, **kwargs):
+        first, last = self.edges
+        return {'first': first, 'last': last}
+
+    def dates(self, field_name, kind):
+        first, last = self.edges
+        if first is None:
+            return []
+        if kind == 'year':
+            values = [date(year, 1, 1) for year in range(first.year, last.year + 1)]
+        elif kind == 'month':
+            months = range(first.year * 12 + first.month - 1, last.year * 12 + last.month)
+            values = [date(month // 12, month % 12 + 1, 1) for month in months]
+        else:
+            start = date(first.year, first.month, first.day)
+            values = [date.fromordinal(day) for day in range(start.toordinal(), last.toordinal() + 1)]
+        if self.is_datetime:
+            values = [datetime(value.year, value.month, value.day) for value in values]
+            if settings.USE_TZ:
+                values = [timezone.make_aware(value) for value in values]
+        return values
+
+    datetimes = dates
+
+
+class PerformanceMixin:
+    """ModelAdmin mixin for tables that may grow large (see module docstring)"""
+    change_list_template = 'admin/website/performance_change_list.html'
+    show_full_result_count = False
+    paginator = ThresholdCountPaginator
+    # SearchEntry kind searched alongside search_fields
+    search_index_kind = None
+
+    def get_list_select_related(self, request):
+        if self.list_select_related:
+            return self.list_select_related
+        related = []
+        for name in self.get_list_display(request):
+            try:
+                field = self.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.many_to_one or field.one_to_one:
+                related.append(name)
+        return related or False
+
+    def get_list_filter(self, request):
+        list_filter = []
+        for item in super().get_list_filter(request):
+            if isinstance(item, str) and '__' not in item:
+                field = self.model._meta.get_field(item)
+                if isinstance(field, (models.CharField, models.IntegerField)) and not field.choices:
+                    item = (item, CachedAllValuesFieldListFilter)
+            list_filter.append(item)
+        return list_filter
+
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if self.search_index_kind and search_term.strip():
+            results = results | queryset.filter(pk__in=search.matching_ids(self.search_index_kind, search_term))
+        return results, may_have_duplicates
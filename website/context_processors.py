@@ -0,0 +1,6 @@
+from .caching import get_site_settings
+
+
+def site_settings(request):
+    """Expose the cached SiteSetting singleton to every template"""
+    return {'site_settings': get_site_settings()}
@@ -0,0 +1,137 @@
+"""
+Buffered counters for BlogPost.views_count and Resource.downloads_count.
+
+Incrementing a counter on every page view used to cost a write
+transaction per read request. Increments are now added up in process
+memory and written in batches with atomic ``F()`` updates, either by a
+background timer, when the buffer grows past COUNTER_MAX_PENDING keys,
+or when the worker shuts down.
+"""
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+
+class CounterBuffer:
+    """Thread-safe buffer of pending counter increments"""
+
+    def __init__(self, max_pending=1000, flush_interval=10):
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+        self._stopped = threading.Event()
+
+    def increment(self, model, pk, field, amount=1):
+        """Queue an increment and return the amount pending for this key"""
+        key = (model, field, pk)
+        with self._lock:
+            pending = self._pending.get(key, 0) + amount
+            self._pending[key] = pending
+            full = len(self._pending) >= self.max_pending
+        if full:
+            # On the request path: a failed flush keeps the increments for
+            # the next one instead of failing the page
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Failed to flush buffered counters')
+        else:
+            self._ensure_timer()
+        return pending
+
+    def pending(self, model, pk, field):
+        with self._lock:
+            return self._pending.get((model, field, pk), 0)
+
+    def flush(self):
+        """Write every pending increment to the database, return the rows touched"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            # One UPDATE per (model, field, amount) instead of one per row
+            batches = defaultdict(list)
+            for (model, field, pk), amount in pending.items():
+                batches[(model, field, amount)].append(pk)
+
+            try:
+                with transaction.atomic():
+                    for (model, field, amount), pks in batches.items():
+                        model._default_manager.filter(pk__in=pks).update(
+                            **{field: F(field) + amount}
+                        )
+            except Exception:
+                # Put the increments back so the next flush retries them
+                with self._lock:
+                    for key, amount in pending.items():
+                        self._pending[key] = self._pending.get(key, 0) + amount
+                raise
+            return len(pending)
+
+    def _ensure_timer(self):
+        if not self.flush_interval:
+            return
+        timer = self._timer
+        if timer is not None and timer.is_alive():
+            return
+        with self._lock:
+            if self._timer is not None and self._timer.is_alive():
+                return
+            self._timer = threading.Thread(
+                target=self._run, name='counter-flush', daemon=True
+            )
+            self._timer.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Failed to flush buffered counters')
+
+    def shutdown(self):
+        """Stop the timer and write whatever is still pending"""
+        self._stopped.set()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Failed to flush buffered counters on shutdown')
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_counter_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = CounterBuffer(
+                    max_pending=getattr(settings, 'COUNTER_MAX_PENDING', 1000),
+                    flush_interval=getattr(settings, 'COUNTER_FLUSH_INTERVAL', 10),
+                )
+                atexit.register(_buffer.shutdown)
+    return _buffer
+
+
+def increment(instance, field, amount=1):
+    """Buffer ``instance.<field> += amount``; returns the amount still pending"""
+    return get_counter_buffer().increment(type(instance), instance.pk, field, amount)
+
+
+def flush_counters():
+    return get_counter_buffer().flush()
@@ -0,0 +1,156 @@
+"""
+File downloads.
+
+Files are streamed from storage in blocks instead of being read into
+worker memory. Responses carry ETag/Last-Modified validators, answer
+conditional requests with 304, and support single HTTP byte ranges so
+interrupted downloads and video seeking can resume.
+
+Set DOWNLOAD_OFFLOAD to 'x-sendfile' (Apache/lighttpd) or
+'x-accel-redirect' (nginx, with DOWNLOAD_ACCEL_PREFIX mapped to
+MEDIA_ROOT as an internal location) to let the front proxy send the bytes.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) for a single-range "Range: bytes=..." header, or
+    None to send the whole file. Multiple ranges are not supported and
+    fall back to the whole file, which RFC 9110 allows.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if start == '':
+        if end == '':
+            return None
+        suffix = int(end)
+        if suffix == 0:
+            raise RangeNotSatisfiable
+        return max(size - suffix, 0), size - 1
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size:
+        raise RangeNotSatisfiable
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _validators(fieldfile):
+    """(etag, last_modified timestamp or None) for a stored file"""
+    size = fieldfile.size
+    try:
+        modified = int(fieldfile.storage.get_modified_time(fieldfile.name).timestamp())
+    except (NotImplementedError, AttributeError):
+        modified = None
+    etag = '"%x-%x"' % (size, modified or 0)
+    return etag, modified
+
+
+def _if_range_matches(request, etag, last_modified):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range is None:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    since = parse_http_date_safe(if_range)
+    return since is not None and last_modified is not None and last_modified <= since
+
+
+def _read_range(fieldfile, start, length):
+    with fieldfile.storage.open(fieldfile.name, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _content_type(filename):
+    content_type, _ = mimetypes.guess_type(filename)
+    return content_type or 'application/octet-stream'
+
+
+def _offload_response(fieldfile, mode, filename, as_attachment):
+    response = HttpResponse(content_type=_content_type(filename))
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    if mode == 'x-sendfile':
+        response['X-Sendfile'] = fieldfile.path
+    else:
+        prefix = getattr(settings, 'DOWNLOAD_ACCEL_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(fieldfile.name)
+    return response
+
+
+def serve_file(request, fieldfile, as_attachment=True):
+    """
+    Stream a FieldFile, honouring conditional and Range requests.
+    Returns (response, counted): counted is False for 304s and for ranges
+    that continue an earlier download, so they are not counted twice.
+    """
+    etag, last_modified = _validators(fieldfile)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        return not_modified, False
+
+    filename = os.path.basename(fieldfile.name)
+    size = fieldfile.size
+    counted = True
+    offload = getattr(settings, 'DOWNLOAD_OFFLOAD', None)
+
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if range_header and not offload and _if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response, False
+
+    if offload:
+        response = _offload_response(fieldfile, offload, filename, as_attachment)
+    elif byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(_read_range(fieldfile, start, length), status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = length
+        response['Content-Type'] = _content_type(filename)
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+        counted = start == 0
+    else:
+        response = FileResponse(
+            fieldfile.storage.open(fieldfile.name, 'rb'),
+            as_attachment=as_attachment,
+            filename=filename,
+        )
+        response.block_size = CHUNK_SIZE
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response, counted
@@ -1,6 +1,7 @@
 from django import forms
 from django.core.validators import EmailValidator
 from .models import *
+from .availability import check_slot
 from django.utils import timezone
 
 class ContactForm(forms.ModelForm):
@@ -100,6 +101,21 @@ class AppointmentForm(forms.ModelForm):
         if phone and not (phone.startswith('07') or phone.startswith('+2547')):
             raise forms.ValidationError('Please enter a valid Kenyan phone number (e.g., 0712345678 or +254712345678)')
         return phone
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        counselor = cleaned_data.get('counselor')
+        preferred_date = cleaned_data.get('preferred_date')
+        preferred_time = cleaned_data.get('preferred_time')
+        if counselor and preferred_date and preferred_time:
+            error = check_slot(
+                counselor, preferred_date, preferred_time,
+                cleaned_data.get('appointment_type'),
+                exclude_appointment=self.instance.pk,
+            )
+            if error:
+                self.add_error('preferred_time', error)
+        return cleaned_data
 
 class NewsletterForm(forms.Form):
     email = forms.EmailField(
@@ -126,27 +142,24 @@ class BlogSearchForm(forms.Form):
         })
     )
 
-class EventRegistrationForm(forms.Form):
-    name = forms.CharField(
-        max_length=200,
-        widget=forms.TextInput(attrs={
-            'class': 'form-control',
-            'placeholder': 'Your full name'
-        })
-    )
-    email = forms.EmailField(
-        widget=forms.EmailInput(attrs={
-            'class': 'form-control',
-            'placeholder': 'your.email@example.com'
-        })
-    )
-    phone = forms.CharField(
-        max_length=15,
-        widget=forms.TextInput(attrs={
-            'class': 'form-control',
-            'placeholder': '0712345678'
-        })
-    )
+class EventRegistrationForm(forms.ModelForm):
+    class Meta:
+        model = EventRegistration
+        fields = ['name', 'email', 'phone']
+        widgets = {
+            'name': forms.TextInput(attrs={
+                'class': 'form-control',
+                'placeholder': 'Your full name'
+            }),
+            'email': forms.EmailInput(attrs={
+                'class': 'form-control',
+                'placeholder': 'your.email@example.com'
+            }),
+            'phone': forms.TextInput(attrs={
+                'class': 'form-control',
+                'placeholder': '0712345678'
+            }),
+        }
     
     def clean_phone(self):
         phone = self.cleaned_data.get('phone')
@@ -0,0 +1,227 @@
+"""
+Responsive image derivatives.
+
+Counselor.image, BlogPost.featured_image, Event.featured_image and
+SiteSetting.logo are plain FileFields, so templates used to link the
+original multi-megabyte uploads. Saving one of them queues a ProcessedImage
+row (see signals.py); the ``process_images`` command claims queued rows and
+writes WebP and JPEG copies at IMAGE_DERIVATIVE_WIDTHS next to the original
+(``blog/photo.jpg`` -> ``blog/photo.640w.webp``). Nothing is re-encoded
+when the original's SHA-256 matches the one the derivatives were built from.
+
+``{% picture %}`` and ``{% srcset %}`` (templatetags/images.py) read the
+variants through the cache and fall back to the original URL for files
+that are not images or have not been processed yet. Listings call
+``prefetch_variants`` first so a cold cache costs one query, not one per
+image.
+"""
+import hashlib
+import io
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import BlogPost, Counselor, Event, ProcessedImage, SiteSetting
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FIELDS = {
+    Counselor: ['image'],
+    BlogPost: ['featured_image'],
+    Event: ['featured_image'],
+    SiteSetting: ['logo'],
+}
+
+# format -> (Pillow format, file extension, MIME type)
+FORMATS = {
+    'webp': ('WEBP', 'webp', 'image/webp'),
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg'),
+}
+
+# A claimed image still 'processing' after this long belongs to a worker
+# that died, and may be picked up again.
+CLAIM_LEASE = timedelta(minutes=10)
+
+VARIANTS_KEY = 'website:image:%s'
+READY_TTL = 24 * 60 * 60
+PENDING_TTL = 60
+
+
+def queue_image(name):
+    """Make sure derivatives of the upload at storage path ``name`` get built"""
+    ProcessedImage.objects.get_or_create(name=name)
+
+
+def queue_instance_images(instance):
+    for field in IMAGE_FIELDS.get(type(instance), ()):
+        fieldfile = getattr(instance, field)
+        if fieldfile:
+            queue_image(fieldfile.name)
+
+
+def file_hash(name):
+    digest = hashlib.sha256()
+    with default_storage.open(name) as handle:
+        for chunk in handle.chunks():
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def derivative_name(name, width, fmt):
+    stem, _ = os.path.splitext(name)
+    return f'{stem}.{width}w.{FORMATS[fmt][1]}'
+
+
+def _target_widths(width):
+    widths = settings.IMAGE_DERIVATIVE_WIDTHS
+    return sorted({w for w in widths if w < width} | {min(width, max(widths))})
+
+
+def _encode(image, fmt):
+    pil_format = FORMATS[fmt][0]
+    if fmt == 'jpeg' and image.mode != 'RGB':
+        # JPEG has no alpha channel: flatten onto white
+        background = Image.new('RGB', image.size, 'white')
+        rgba = image.convert('RGBA')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        image = background
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    buffer = io.BytesIO()
+    options = {'quality': settings.IMAGE_DERIVATIVE_QUALITY}
+    if fmt == 'jpeg':
+        options.update(optimize=True, progressive=True)
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def _store(name, data):
+    # Fixed names so a changed original replaces its old derivatives
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    return default_storage.save(name, ContentFile(data))
+
+
+def render_derivatives(name, known_hash=''):
+    """
+    Build the derivatives of ``name`` and return the ProcessedImage fields
+    to store, or None when the original still hashes to ``known_hash``.
+
+    Only touches storage, never the database, so the backfill command can
+    run it in a process pool.
+    """
+    try:
+        source_hash = file_hash(name)
+    except OSError as exc:
+        return {'status': 'failed', 'last_error': str(exc)}
+    if known_hash and source_hash == known_hash:
+        return None
+
+    try:
+        with default_storage.open(name) as handle, Image.open(handle) as original:
+            width, height = original.size
+            # Let the JPEG decoder downscale while reading; a square box keeps
+            # enough pixels whichever way EXIF rotates the image
+            largest = _target_widths(width)[-1]
+            original.draft('RGB', (largest, largest))
+            image = ImageOps.exif_transpose(original)
+            image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, SyntaxError, ValueError):
+        return {'status': 'not_image', 'source_hash': source_hash, 'variants': [], 'last_error': ''}
+
+    if (image.width < image.height) != (width < height):
+        width, height = height, width
+    try:
+        variants = []
+        for target in _target_widths(image.width):
+            target_height = max(1, round(image.height * target / image.width))
+            resized = image if target == image.width else image.resize(
+                (target, target_height), Image.Resampling.LANCZOS, reducing_gap=3.0
+            )
+            for fmt in FORMATS:
+                stored = _store(derivative_name(name, target, fmt), _encode(resized, fmt))
+                variants.append({'name': stored, 'width': target, 'height': target_height, 'format': fmt})
+    except OSError as exc:
+        return {'status': 'failed', 'last_error': str(exc)}
+    return {
+        'status': 'ready', 'source_hash': source_hash, 'width': width, 'height': height,
+        'variants': variants, 'last_error': '',
+    }
+
+
+def save_result(record, result):
+    """Store a ``render_derivatives`` result on its ProcessedImage row"""
+    if result is None:
+        record.status = 'ready' if record.variants else 'not_image'
+    else:
+        for field, value in result.items():
+            setattr(record, field, value)
+        if record.status == 'failed':
+            logger.warning('Could not build derivatives of %s: %s', record.name, record.last_error)
+    record.claimed_at = None
+    record.save()
+    cache.set(VARIANTS_KEY % _key(record.name), record.variants if record.status == 'ready' else [],
+              READY_TTL if record.status == 'ready' else PENDING_TTL)
+
+
+def claim_batch(batch_size):
+    """Mark up to batch_size queued images as 'processing' and return them"""
+    now = timezone.now()
+    stale = now - CLAIM_LEASE
+    queued = ProcessedImage.objects.filter(status='pending') | ProcessedImage.objects.filter(
+        status='processing', claimed_at__lt=stale,
+    )
+    candidates = list(queued.values_list('pk', 'status', 'claimed_at')[:batch_size])
+
+    claimed = []
+    for pk, status, claimed_at in candidates:
+        # Conditional UPDATE so two workers never claim the same image
+        won = ProcessedImage.objects.filter(pk=pk, status=status, claimed_at=claimed_at).update(
+            status='processing', claimed_at=now,
+        )
+        if won:
+            claimed.append(pk)
+    return list(ProcessedImage.objects.filter(pk__in=claimed))
+
+
+def process_batch(batch_size=20):
+    """Claim and process one batch of queued images, return the number handled"""
+    records = claim_batch(batch_size)
+    for record in records:
+        save_result(record, render_derivatives(record.name, record.source_hash))
+    return len(records)
+
+
+def _key(name):
+    return hashlib.md5(name.encode()).hexdigest()
+
+
+def image_variants(fieldfile):
+    """Derivatives of a FileField value, [] until processed or for non-images"""
+    if not fieldfile:
+        return []
+    key = VARIANTS_KEY % _key(fieldfile.name)
+    variants = cache.get(key)
+    if variants is None:
+        record = ProcessedImage.objects.filter(name=fieldfile.name, status='ready').first()
+        variants = record.variants if record else []
+        cache.set(key, variants, READY_TTL if record else PENDING_TTL)
+    return variants
+
+
+def prefetch_variants(fieldfiles):
+    """Cache the derivatives of many FileField values with at most one query"""
+    keys = {VARIANTS_KEY % _key(f.name): f.name for f in fieldfiles if f}
+    missing = {name: key for key, name in keys.items() if key not in cache.get_many(keys)}
+    if not missing:
+        return
+    ready = dict(ProcessedImage.objects.filter(name__in=missing, status='ready').values_list('name', 'variants'))
+    cache.set_many({missing[name]: variants for name, variants in ready.items()}, READY_TTL)
+    cache.set_many({key: [] for name, key in missing.items() if name not in ready}, PENDING_TTL)
@@ -0,0 +1,111 @@
+"""
+Outbound email queue.
+
+Views call ``queue_mail`` instead of ``send_mail`` so a slow SMTP server
+never blocks a request. The ``send_queued_mail`` management command sends
+queued messages over one reused connection per worker thread, retrying
+failures with exponential backoff until MAIL_QUEUE_MAX_ATTEMPTS, after
+which the message is dead-lettered for review in the admin.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+# A claimed message that is still 'sending' after this long belongs to a
+# worker that died, and may be picked up again.
+SENDING_LEASE = timedelta(minutes=10)
+
+
+def queue_mail(subject, message, from_email, recipient_list):
+    """Queue an email for the mail worker; same arguments as send_mail"""
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=','.join(recipient_list),
+    )
+
+
+def claim_batch(batch_size):
+    """Mark up to batch_size due messages as 'sending' and return them"""
+    now = timezone.now()
+    due = OutboundEmail.objects.filter(
+        status__in=['queued', 'sending'],
+        next_attempt_at__lte=now,
+    ).order_by('next_attempt_at')
+    candidates = list(due.values_list('pk', 'status', 'next_attempt_at')[:batch_size])
+
+    claimed = []
+    for pk, status, next_attempt_at in candidates:
+        # Conditional UPDATE so two workers never claim the same message
+        won = OutboundEmail.objects.filter(
+            pk=pk, status=status, next_attempt_at=next_attempt_at,
+        ).update(status='sending', next_attempt_at=now + SENDING_LEASE)
+        if won:
+            claimed.append(pk)
+    return list(OutboundEmail.objects.filter(pk__in=claimed).order_by('pk'))
+
+
+def _retry_delay(attempts):
+    base = getattr(settings, 'MAIL_QUEUE_RETRY_DELAY', 60)
+    return timedelta(seconds=base * 2 ** (attempts - 1))
+
+
+def _mark_failed(email, error):
+    max_attempts = getattr(settings, 'MAIL_QUEUE_MAX_ATTEMPTS', 5)
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= max_attempts:
+        email.status = 'dead'
+        logger.error('Giving up on email %s after %s attempts: %s', email.pk, email.attempts, error)
+    else:
+        email.status = 'queued'
+        email.next_attempt_at = timezone.now() + _retry_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def send_batch(batch_size=50):
+    """Claim and send one batch over a single connection, return the number sent"""
+    emails = claim_batch(batch_size)
+    if not emails:
+        return 0
+
+    sent = 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        for email in emails:
+            _mark_failed(email, exc)
+        return 0
+
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                email.from_email,
+                email.get_recipients_list(),
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as exc:
+                _mark_failed(email, exc)
+                continue
+            email.status = 'sent'
+            email.sent_at = timezone.now()
+            email.attempts += 1
+            email.last_error = ''
+            email.save(update_fields=['status', 'sent_at', 'attempts', 'last_error'])
+            sent += 1
+    finally:
+        connection.close()
+    return sent
@@ -0,0 +1,53 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from website.images import IMAGE_FIELDS, render_derivatives, save_result
+from website.models import ProcessedImage
+
+
+def _render(job):
+    name, known_hash = job
+    return name, render_derivatives(name, known_hash)
+
+
+class Command(BaseCommand):
+    help = 'Build derivatives for every existing upload, skipping originals whose hash is unchanged'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count(), help='Worker processes')
+        parser.add_argument('--force', action='store_true', help='Rebuild even when the original is unchanged')
+
+    def handle(self, *args, **options):
+        names = set()
+        for model, fields in IMAGE_FIELDS.items():
+            for field in fields:
+                names.update(model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                             .values_list(field, flat=True))
+        ProcessedImage.objects.bulk_create([ProcessedImage(name=name) for name in names], ignore_conflicts=True)
+        records = {record.name: record for record in ProcessedImage.objects.filter(name__in=names)}
+        jobs = [(name, '' if options['force'] else record.source_hash) for name, record in records.items()]
+
+        counts = {}
+        if options['processes'] > 1:
+            # Workers only touch storage; results are saved here. Forked
+            # children must not inherit open database connections.
+            connections.close_all()
+            with ProcessPoolExecutor(options['processes'], initializer=django.setup) as pool:
+                results = pool.map(_render, jobs, chunksize=4)
+                for name, result in results:
+                    self._save(records[name], result, counts)
+        else:
+            for job in jobs:
+                self._save(records[job[0]], render_derivatives(*job), counts)
+
+        summary = ', '.join(f'{count} {status}' for status, count in sorted(counts.items())) or 'nothing to do'
+        self.stdout.write(self.style.SUCCESS(f'{len(jobs)} upload(s): {summary}'))
+
+    def _save(self, record, result, counts):
+        status = 'unchanged' if result is None else result['status']
+        counts[status] = counts.get(status, 0) + 1
+        save_result(record, result)
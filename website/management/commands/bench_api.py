@@ -0,0 +1,91 @@
+import json
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.forms.models import model_to_dict
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+
+from website import api
+from website.models import BlogPost
+from website.richtext import render
+
+BODY = '<p>' + ' '.join(['Counselling helps people talk through what is on their mind.'] * 120) + '</p>'
+
+
+class Command(BaseCommand):
+    help = 'Time serializing the blog list as model instances vs values(), and the API 304 path (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--objects', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._generate(options['objects'])
+            published = BlogPost.objects.filter(is_published=True)
+            fields = list(api.ENDPOINTS['blog'].list_fields)
+            url = reverse('website:api_list', args=['blog'])
+            factory = RequestFactory(SERVER_NAME='localhost')
+
+            file_urls = api._file_urls(api.ENDPOINTS['blog'], fields)
+
+            def instances():
+                return json.dumps(
+                    [{**model_to_dict(post), 'featured_image': post.featured_image.name} for post in published],
+                    cls=DjangoJSONEncoder,
+                )
+
+            def projected():
+                return json.dumps(api.serialize(published.values(*fields), fields, file_urls), cls=DjangoJSONEncoder)
+
+            def page():
+                return api.list_view(factory.get(url, {'limit': api.MAX_LIMIT}), 'blog')
+
+            etag = page()['ETag']
+
+            def not_modified():
+                response = api.list_view(factory.get(url, {'limit': api.MAX_LIMIT}, HTTP_IF_NONE_MATCH=etag), 'blog')
+                assert response.status_code == 304
+                return response
+
+            rows = [
+                (f'all {options["objects"]} as instances', instances),
+                (f'all {options["objects"]} via values()', projected),
+                (f'API page of {api.MAX_LIMIT}', page),
+                ('API page, If-None-Match', not_modified),
+            ]
+            for name, fetch in rows:
+                timings = []
+                for _ in range(options['repeat']):
+                    began = time.perf_counter()
+                    result = fetch()
+                    timings.append((time.perf_counter() - began) * 1000)
+                size = len(result) if isinstance(result, str) else len(result.content)
+                self.stdout.write(
+                    f'{name:28}: p50 {statistics.median(timings):8.2f} ms  '
+                    f'max {max(timings):8.2f} ms  {size / 1024:9.1f} KB'
+                )
+            transaction.set_rollback(True)
+
+    def _generate(self, count):
+        now = timezone.now()
+        # bulk_create skips pre_save, so fill the rendered columns here
+        rendered = render(BODY)
+        BlogPost.objects.bulk_create(
+            (
+                BlogPost(
+                    title=f'Post {i}', slug=f'bench-api-{i}', excerpt='Excerpt', content=BODY,
+                    content_html=rendered.html, content_text=rendered.text, word_count=rendered.word_count,
+                    reading_time=rendered.reading_time, category='general',
+                    published_date=now - timedelta(minutes=i),
+                )
+                for i in range(count)
+            ),
+            batch_size=1000,
+        )
@@ -0,0 +1,59 @@
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.utils import ConnectionHandler
+
+from suzstar_website import database
+
+
+class Command(BaseCommand):
+    help = 'Requests per second with connect-per-request, persistent and pooled database connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default=os.environ.get('DATABASE_URL', f"sqlite:///{settings.BASE_DIR / 'db.sqlite3'}"))
+        parser.add_argument('--threads', type=int, default=8, help='concurrent requests, as in a gthread worker')
+        parser.add_argument('--requests', type=int, default=200, help='per thread')
+        parser.add_argument('--queries', type=int, default=5, help='per request')
+        parser.add_argument('--pool-size', type=int, help='defaults to --threads')
+
+    def handle(self, *args, **options):
+        url = options['url']
+        # alias -> (label, settings)
+        modes = {
+            'per_request': ('connect per request', database.config(url, conn_max_age=0)),
+            'persistent': ('persistent + health checks', database.config(url)),
+        }
+        if not url.startswith('sqlite'):
+            pool_size = options['pool_size'] or options['threads']
+            modes['pooled'] = (f'pool of {pool_size}', database.config(url, pool_size=pool_size))
+        # Aliases of their own, so the pools are not the project's
+        handler = ConnectionHandler({'default': {}, **{alias: config for alias, (_, config) in modes.items()}})
+
+        def simulate(alias):
+            connection = handler[alias]
+            for _ in range(options['requests']):
+                # What close_old_connections does on request_started/finished
+                connection.close_if_unusable_or_obsolete()
+                with connection.cursor() as cursor:
+                    for _ in range(options['queries']):
+                        cursor.execute('SELECT 1')
+                        cursor.fetchone()
+                connection.close_if_unusable_or_obsolete()
+            connection.close()
+
+        total = options['threads'] * options['requests']
+        self.stdout.write(f"{total} requests of {options['queries']} queries on {options['threads']} threads")
+        for alias, (label, config) in modes.items():
+            threads = [threading.Thread(target=simulate, args=[alias]) for _ in range(options['threads'])]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            if 'pool' in config['OPTIONS']:
+                handler[alias].close_pool()
+            self.stdout.write(f'{label:<30} {total / elapsed:8.0f} req/s  {elapsed / options["requests"] * 1000:6.2f} ms/request')
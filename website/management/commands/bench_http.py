@@ -0,0 +1,96 @@
+import asyncio
+import statistics
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Load a running server with keep-alive clients and report requests/s and latency percentiles, '
+        'e.g. against `gunicorn suzstar_website.wsgi` and `gunicorn suzstar_website.asgi -k uvicorn_worker.UvicornWorker`'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='e.g. http://127.0.0.1:8000/')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[50, 500])
+        parser.add_argument('--duration', type=float, default=10, help='seconds per concurrency level')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        path = url.path or '/'
+        if url.query:
+            path += '?' + url.query
+        for concurrency in options['concurrency']:
+            latencies, statuses = asyncio.run(
+                load(url.hostname, url.port or 80, path, concurrency, options['duration'])
+            )
+            ok = sum(count for status, count in statuses.items() if status == 200)
+            if len(latencies) < 2:
+                self.stdout.write(f'{concurrency:>4} clients: no responses {dict(statuses)}')
+                continue
+            percentiles = statistics.quantiles(latencies, n=100)
+            self.stdout.write(
+                f'{concurrency:>4} clients: {len(latencies) / options["duration"]:7.0f} req/s  '
+                f'p50 {percentiles[49] * 1000:7.1f} ms  p99 {percentiles[98] * 1000:7.1f} ms  '
+                f'{ok} ok {dict(statuses)}'
+            )
+
+
+async def load(host, port, path, concurrency, duration):
+    latencies = []
+    statuses = Counter()
+    deadline = time.perf_counter() + duration
+    request = f'GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: identity\r\n\r\n'.encode()
+    await asyncio.gather(*[
+        _client(host, port, request, deadline, latencies, statuses) for _ in range(concurrency)
+    ])
+    return latencies, statuses
+
+
+async def _client(host, port, request, deadline, latencies, statuses):
+    writer = None
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(request)
+            status, headers = await _read_head(reader)
+            await _read_body(reader, headers)
+        except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+            statuses[type(exc).__name__] += 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            continue
+        latencies.append(time.perf_counter() - start)
+        statuses[status] += 1
+        # gunicorn's sync workers close the connection after every response
+        if headers.get('connection', '').lower() == 'close':
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def _read_head(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise asyncio.IncompleteReadError(b'', None)
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return int(status_line.split()[1]), headers
+
+
+async def _read_body(reader, headers):
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while size := int((await reader.readline()).split(b';')[0], 16):
+            await reader.readexactly(size + 2)
+        await reader.readline()
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+
+class Command(BaseCommand):
+    help = 'Per-request cost of the metrics middleware and timed templates, measured through the test client'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=['/', '/about/', '/api/v1/services/'])
+        parser.add_argument('--requests', type=int, default=500, help='per path and round')
+        parser.add_argument('--rounds', type=int, default=3, help='the fastest round is reported')
+
+    def handle(self, *args, **options):
+        plain = {
+            'MIDDLEWARE': [name for name in settings.MIDDLEWARE if name != 'website.metrics.MetricsMiddleware'],
+            'TEMPLATES': [{**settings.TEMPLATES[0], 'BACKEND': 'django.template.backends.django.DjangoTemplates'}],
+        }
+        modes = {'without metrics': plain, 'with metrics': {}}
+        for path in options['paths']:
+            best = dict.fromkeys(modes, float('inf'))
+            # Interleaved so both modes see the same machine load
+            for _ in range(options['rounds']):
+                for label, overrides in modes.items():
+                    with override_settings(ALLOWED_HOSTS=['testserver'], **overrides):
+                        best[label] = min(best[label], self._time(path, options['requests']))
+            without, with_ = best['without metrics'], best['with metrics']
+            self.stdout.write(
+                f'{path:<24} {without * 1e6:8.0f} µs  {with_ * 1e6:8.0f} µs with metrics  '
+                f'{(with_ - without) * 1e6:+6.0f} µs ({(with_ / without - 1) * 100:+.1f}%)'
+            )
+
+    def _time(self, path, requests):
+        client = Client()
+        for _ in range(20):
+            client.get(path)
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get(path)
+        return (time.perf_counter() - start) / requests
@@ -0,0 +1,64 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.utils import timezone
+
+from website.models import BlogPost
+from website.pagination import CursorPaginator
+
+PER_PAGE = 6
+
+
+class Command(BaseCommand):
+    help = 'Compare OFFSET and keyset pagination of the blog at page 1 and a deep page (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=5000, help='Deepest page to fetch')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        deep = options['pages']
+        with transaction.atomic():
+            self._generate(deep * PER_PAGE)
+            published = BlogPost.objects.filter(is_published=True)
+
+            keyset = CursorPaginator(published, PER_PAGE)
+            # The cursor a crawler would hold after following "next" deep - 1 times
+            before = published.order_by(*keyset.ordering)[(deep - 1) * PER_PAGE - 1]
+            deep_cursor = keyset.encode_cursor(before, deep, 'n')
+
+            rows = [
+                ('offset', 1, lambda: Paginator(published, PER_PAGE).get_page(1)),
+                ('offset', deep, lambda: Paginator(published, PER_PAGE).get_page(deep)),
+                ('keyset', 1, lambda: CursorPaginator(published, PER_PAGE).get_page()),
+                ('keyset', deep, lambda: CursorPaginator(published, PER_PAGE).get_page(deep_cursor)),
+            ]
+            for name, number, fetch in rows:
+                timings = []
+                for _ in range(options['repeat']):
+                    began = time.perf_counter()
+                    page = fetch()
+                    list(page)
+                    timings.append((time.perf_counter() - began) * 1000)
+                self.stdout.write(
+                    f'{name:6} page {number:>5}: p50 {statistics.median(timings):7.2f} ms  '
+                    f'max {max(timings):7.2f} ms  ({len(page)} rows)'
+                )
+            transaction.set_rollback(True)
+
+    def _generate(self, count):
+        now = timezone.now()
+        BlogPost.objects.bulk_create(
+            (
+                BlogPost(
+                    title=f'Post {i}', slug=f'bench-post-{i}', excerpt='Excerpt', content='<p>Body</p>',
+                    category='general', published_date=now - timedelta(minutes=i // 2),
+                )
+                for i in range(count)
+            ),
+            batch_size=1000,
+        )
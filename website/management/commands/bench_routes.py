@@ -0,0 +1,246 @@
+import json
+import platform
+import re
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from http.cookies import SimpleCookie
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from website.metrics import RequestStats
+from website.models import Appointment, BlogPost, Counselor, Event, Resource, Service
+
+# URL parameter -> how to find a typical value for it
+PARAMETERS = {
+    'service_id': lambda: Service.objects.filter(is_active=True).order_by('order', 'pk').values_list('pk', flat=True).first(),
+    'slug': lambda: BlogPost.objects.filter(is_published=True).values_list('slug', flat=True).first(),
+    'category': lambda: BlogPost.objects.filter(is_published=True).values_list('category', flat=True).first(),
+    'appointment_id': lambda: Appointment.objects.order_by('-pk').values_list('pk', flat=True).first(),
+    'resource_id': lambda: Resource.objects.order_by('-created_at').values_list('pk', flat=True).first(),
+    'event_id': lambda: Event.objects.filter(is_published=True).order_by('-start_date').values_list('pk', flat=True).first(),
+    'counselor_id': lambda: Counselor.objects.filter(is_active=True).values_list('pk', flat=True).first(),
+    'email': lambda: 'nobody@example.invalid',  # so unsubscribing changes nothing
+    'endpoint': lambda: 'blog',
+    'pk': lambda: BlogPost.objects.filter(is_published=True).values_list('pk', flat=True).first(),
+    'app_label': lambda: 'website',
+}
+QUERIES = {
+    'website:search': {'q': 'anxiety sleep'},
+    'website:blog_list': {'page': 2},
+}
+# Not safe or not meaningful as a GET
+SKIP = {'logout', 'admin:logout', 'admin:view_on_site', 'admin:autocomplete', 'password_reset_confirm'}
+
+
+def named_routes(patterns=None, namespace='', route=''):
+    """(name, route, parameter names) of every named URL, admin included"""
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            prefix = f'{namespace}{pattern.namespace}:' if pattern.namespace else namespace
+            yield from named_routes(pattern.url_patterns, prefix, route + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            full = route + str(pattern.pattern)
+            yield f'{namespace}{pattern.name}', full, re.findall(r'<(?:\w+:)?(\w+)>|\(\?P<(\w+)>', full)
+
+
+def _admin_object_id(route_name):
+    """The first pk of the model of an admin:<app>_<model>_change/history/delete route"""
+    match = re.fullmatch(r'admin:(\w+?)_(\w+)_(?:change|history|delete)', route_name)
+    model = match and apps.all_models.get(match[1], {}).get(match[2])
+    if model is None:
+        return None
+    return model._default_manager.order_by('pk').values_list('pk', flat=True).first()
+
+
+def _parameters(route_name, names):
+    kwargs = {}
+    for groups in names:
+        name = next(group for group in groups if group)
+        if name == 'object_id':
+            kwargs[name] = _admin_object_id(route_name)
+            if kwargs[name] is None:
+                return None, 'no row to edit'
+            continue
+        if name not in PARAMETERS:
+            return None, f'no sample for <{name}>'
+        kwargs[name] = PARAMETERS[name]()
+        if kwargs[name] is None:
+            return None, f'no row for <{name}>'
+    return kwargs, None
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every named URL (website and admin) and write latency percentiles, query counts and '
+        'allocated memory per route as JSON, comparable between runs with --compare'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20, help='timed requests per route')
+        parser.add_argument('--match', default='', help='only route names matching this regex')
+        parser.add_argument('--server', help='base URL of a running server sharing this database, e.g. http://127.0.0.1:8000')
+        parser.add_argument('--clear-cache', action='store_true', help='clear the cache before every request (cold pages)')
+        parser.add_argument('--output', help='write results to this JSON file')
+        parser.add_argument('--compare', help='JSON file of an earlier run to compare against')
+
+    def handle(self, *args, **options):
+        staff = get_user_model().objects.filter(is_staff=True, is_active=True).order_by('pk').first()
+        if staff is None:
+            staff = get_user_model().objects.create_user('bench-staff', is_staff=True, is_superuser=True)
+        results, skipped = {}, {}
+
+        with override_settings(ALLOWED_HOSTS=['*']):
+            anonymous = Client(raise_request_exception=False)
+            admin = Client(raise_request_exception=False)
+            admin.force_login(staff)
+            for name, route, parameter_names in named_routes():
+                if name in SKIP or not re.search(options['match'], name):
+                    continue
+                kwargs, reason = _parameters(name, parameter_names)
+                if kwargs is None:
+                    skipped[name] = reason
+                    continue
+                path = reverse(name, kwargs=kwargs)
+                query = QUERIES.get(name, {})
+                client = admin if name.split(':')[0] in ('admin', 'profiling') else anonymous
+                if options['server']:
+                    result = self._measure_server(options, path, query, client.cookies)
+                else:
+                    result = self._measure(options, client, path, query)
+                results[name] = {'path': path, **result}
+                self.stdout.write(
+                    f"{name:<45} {result['status']}  p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms"
+                    + (f"  {result['queries']:4} queries  {result['alloc_peak_kib']:8.0f} KiB" if not options['server'] else '')
+                )
+
+        for name, reason in skipped.items():
+            self.stdout.write(f'{name:<45} skipped, {reason}')
+        run = {
+            'meta': {
+                'created': datetime.now(timezone.utc).isoformat(),
+                'commit': _git_commit(),
+                'mode': 'server' if options['server'] else 'test client',
+                'requests': options['requests'],
+                'clear_cache': options['clear_cache'],
+                'database': connection.vendor,
+                'rows': {model._meta.label: model.objects.count() for model in apps.get_app_config('website').get_models()},
+                'python': platform.python_version(),
+                'django': django.get_version(),
+            },
+            'routes': results,
+            'skipped': skipped,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(run, f, indent=2)
+        if options['compare']:
+            self._compare(options['compare'], run)
+
+    def _measure(self, options, client, path, query):
+        def get():
+            if options['clear_cache']:
+                cache.clear()
+            return client.get(path, query)
+
+        get()  # warm up
+        # Counted and traced on a request of its own, apart from the timed ones
+        stats = RequestStats()
+        wrapped = connections.all()
+        for db in wrapped:
+            db.execute_wrappers.append(stats)
+        tracemalloc.start()
+        try:
+            get()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            for db in wrapped:
+                db.execute_wrappers.remove(stats)
+
+        latencies = []
+        for _ in range(options['requests']):
+            start = time.perf_counter()
+            response = get()
+            if response.streaming:
+                b''.join(response.streaming_content)
+            latencies.append(time.perf_counter() - start)
+        return {
+            'status': response.status_code,
+            'bytes': len(response.content) if not response.streaming else None,
+            **self._latency(latencies),
+            'queries': stats.queries,
+            'sql_ms': round(stats.query_seconds * 1000, 3),
+            'alloc_peak_kib': round(peak / 1024, 1),
+        }
+
+    def _measure_server(self, options, path, query, cookies):
+        url = options['server'].rstrip('/') + path + (f'?{urlencode(query)}' if query else '')
+        headers = {'Cookie': '; '.join(f'{key}={morsel.value}' for key, morsel in SimpleCookie(cookies).items())}
+
+        def get():
+            try:
+                with urlopen(Request(url, headers=headers)) as response:
+                    return response.status, len(response.read())
+            except HTTPError as error:
+                return error.code, len(error.read())
+
+        get()
+        latencies = []
+        for _ in range(options['requests']):
+            start = time.perf_counter()
+            status, size = get()
+            latencies.append(time.perf_counter() - start)
+        return {'status': status, 'bytes': size, **self._latency(latencies)}
+
+    def _latency(self, latencies):
+        return {
+            'p50_ms': round(_percentile(latencies, 0.5) * 1000, 3),
+            'p90_ms': round(_percentile(latencies, 0.9) * 1000, 3),
+            'p99_ms': round(_percentile(latencies, 0.99) * 1000, 3),
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+        }
+
+    def _compare(self, filename, run):
+        try:
+            with open(filename) as f:
+                before = json.load(f)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Cannot read {filename}: {exc}')
+        self.stdout.write(f"\nCompared with {filename} ({before['meta'].get('commit')}, {before['meta']['created']}):")
+        for name, result in run['routes'].items():
+            old = before['routes'].get(name)
+            if old is None:
+                self.stdout.write(f'{name:<45} new')
+                continue
+            change = (result['p50_ms'] / old['p50_ms'] - 1) * 100 if old['p50_ms'] else 0
+            line = f"{name:<45} p50 {old['p50_ms']:8.2f} -> {result['p50_ms']:8.2f} ms ({change:+6.1f}%)"
+            if result.get('queries') is not None and old.get('queries') is not None:
+                line += f"  queries {old['queries']} -> {result['queries']}"
+            self.stdout.write(line)
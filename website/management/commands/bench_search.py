@@ -0,0 +1,108 @@
+import itertools
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from website.models import FAQ, BlogPost, Event, Resource, Service
+from website.search import rebuild_index, search
+
+WORDS = (
+    'anxiety stress depression mood relationships family grief trauma recovery youth teen '
+    'sleep mindfulness breathing resilience therapy counseling support group workshop '
+    'wellness boundaries confidence panic burnout loneliness parenting school work'
+).split()
+
+SYLLABLES = 'ba ko mi ra tu se li no pa ve du ha zi mo ke'.split()
+
+
+def _filler_words(rng, count=5000):
+    return [''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(count)]
+
+
+def _paragraphs(rng, count, filler):
+    # Mostly filler so topic words are selective, like real prose
+    def word():
+        return rng.choice(WORDS) if rng.random() < 0.05 else rng.choice(filler)
+    return ''.join('<p>%s.</p>' % ' '.join(word() for _ in range(60)) for _ in range(count))
+
+
+def icontains_search(query):
+    """The previous search view: five Q(...icontains) scans"""
+    now = timezone.now()
+    return [
+        list(Service.objects.filter(Q(name__icontains=query) | Q(short_description__icontains=query) | Q(description__icontains=query), is_active=True)[:5]),
+        list(BlogPost.objects.filter(Q(title__icontains=query) | Q(content__icontains=query) | Q(excerpt__icontains=query), is_published=True)[:5]),
+        list(Resource.objects.filter(Q(title__icontains=query) | Q(description__icontains=query))[:5]),
+        list(Event.objects.filter(Q(title__icontains=query) | Q(description__icontains=query), is_published=True, start_date__gte=now)[:5]),
+        list(FAQ.objects.filter(Q(question__icontains=query) | Q(answer__icontains=query), is_active=True)[:5]),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Compare the full-text index with icontains search on a generated corpus (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--docs', type=int, default=5000, help='Blog posts to generate')
+        parser.add_argument('--queries', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        docs = options['docs']
+        with transaction.atomic():
+            filler = self._generate(rng, docs)
+            rebuild_index()
+            # Common topic words (many matches) and rare words (few matches)
+            workloads = {
+                'common': [rng.choice(WORDS) for _ in range(options['queries'])],
+                'rare': [rng.choice(filler) for _ in range(options['queries'])],
+            }
+            for (workload, queries), (name, func) in itertools.product(
+                workloads.items(), [('icontains', icontains_search), ('fulltext', search)]
+            ):
+                timings = []
+                for query in queries:
+                    start = time.perf_counter()
+                    func(query)
+                    timings.append(time.perf_counter() - start)
+                timings.sort()
+                self.stdout.write(
+                    f'{workload:>6} {name:>10}: p50 {timings[len(timings) // 2] * 1000:.2f} ms, '
+                    f'p95 {timings[int(len(timings) * 0.95)] * 1000:.2f} ms'
+                )
+            transaction.set_rollback(True)
+
+    def _generate(self, rng, docs):
+        now = timezone.now()
+        filler = _filler_words(rng)
+        BlogPost.objects.bulk_create(
+            BlogPost(
+                title=' '.join(rng.choice(WORDS) for _ in range(5)),
+                slug=f'bench-{i}', excerpt=' '.join(rng.choice(WORDS) for _ in range(20)),
+                content=_paragraphs(rng, 8, filler), category='general',
+            )
+            for i in range(docs)
+        )
+        Service.objects.bulk_create(
+            Service(name=rng.choice(WORDS), service_type='individual', short_description=rng.choice(WORDS),
+                    description=_paragraphs(rng, 3, filler), icon_name='heart')
+            for _ in range(docs // 100 or 1)
+        )
+        Resource.objects.bulk_create(
+            Resource(title=rng.choice(WORDS), resource_type='article', description=_paragraphs(rng, 2, filler))
+            for _ in range(docs // 10 or 1)
+        )
+        Event.objects.bulk_create(
+            Event(title=rng.choice(WORDS), event_type='workshop', description=_paragraphs(rng, 3, filler),
+                  start_date=now, end_date=now, location='Mombasa')
+            for _ in range(docs // 50 or 1)
+        )
+        FAQ.objects.bulk_create(
+            FAQ(question=rng.choice(WORDS), answer=_paragraphs(rng, 1, filler), category='general')
+            for _ in range(docs // 50 or 1)
+        )
+        return filler
@@ -0,0 +1,65 @@
+import random
+import time as clock
+from datetime import time, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from website.availability import free_slots
+from website.models import Appointment, Counselor, CounselorAvailability, CounselorBlackout
+
+
+class Command(BaseCommand):
+    help = 'Time free-slot computation on generated counselors and bookings (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--counselors', type=int, default=50)
+        parser.add_argument('--days', type=int, default=90)
+        parser.add_argument('--bookings-per-day', type=int, default=4, help='Per counselor')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        days = options['days']
+        start = timezone.localdate() + timedelta(days=1)
+        end = start + timedelta(days=days - 1)
+        with transaction.atomic():
+            counselor_ids = self._generate(rng, options['counselors'], start, days, options['bookings_per_day'])
+            with CaptureQueriesContext(connection) as queries:
+                began = clock.perf_counter()
+                slots = free_slots(counselor_ids, start, end)
+                elapsed = clock.perf_counter() - began
+            total = sum(len(times) for per_day in slots.values() for times in per_day.values())
+            self.stdout.write(
+                f'{len(counselor_ids)} counselors x {days} days: {total} free slots '
+                f'in {elapsed * 1000:.1f} ms, {len(queries)} queries'
+            )
+            transaction.set_rollback(True)
+
+    def _generate(self, rng, count, start, days, per_day):
+        counselors = Counselor.objects.bulk_create(
+            Counselor(name=f'Counselor {i}', title='Counselor', bio='<p>Bio</p>', specialties='Stress')
+            for i in range(count)
+        )
+        CounselorAvailability.objects.bulk_create(
+            CounselorAvailability(counselor=c, weekday=weekday, start_time=time(8), end_time=time(17))
+            for c in counselors for weekday in range(5)
+        )
+        CounselorBlackout.objects.bulk_create(
+            CounselorBlackout(counselor=c, start_date=start + timedelta(days=rng.randrange(days)),
+                              end_date=start + timedelta(days=rng.randrange(days)) + timedelta(days=3))
+            for c in counselors
+        )
+        appointments = []
+        for c in counselors:
+            for offset in range(days):
+                for hour in rng.sample(range(8, 17), per_day):
+                    appointments.append(Appointment(
+                        name='Client', email='client@example.com', phone='0712345678',
+                        preferred_date=start + timedelta(days=offset), preferred_time=time(hour),
+                        appointment_type='individual', concerns='Stress', counselor=c,
+                    ))
+        Appointment.objects.bulk_create(appointments, batch_size=1000)
+        return [c.pk for c in counselors]
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from website.synthetic import COUNTS, generate
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with realistic synthetic data at production scale (see website/synthetic.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='the same seed gives the same data')
+        parser.add_argument('--scale', type=float, default=1.0, help='multiplies every default count, e.g. 0.01')
+        parser.add_argument('--batch-size', type=int, default=2000, help='rows per INSERT transaction')
+        for name, count in COUNTS.items():
+            parser.add_argument(f'--{name}', type=int, help=f'default {count}')
+
+    def handle(self, *args, **options):
+        counts = {
+            # Small tables stay realistic when scaled down
+            name: options[name] if options[name] is not None else max(min(count, 10), round(count * options['scale']))
+            for name, count in COUNTS.items()
+        }
+        created = generate(counts, seed=options['seed'], batch_size=options['batch_size'], log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS(f"Done, {sum(created.values())} rows"))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from website.caching import page_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show full-page cache hit/miss counts'
+
+    def handle(self, *args, **options):
+        stats = page_cache_stats()
+        self.stdout.write(
+            f"hits: {stats['hits']}  misses: {stats['misses']}  hit rate: {stats['hit_rate']:.1%}"
+        )
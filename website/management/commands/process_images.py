@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from website.images import process_batch
+
+
+class Command(BaseCommand):
+    help = 'Build resized derivatives of newly uploaded images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=20, help='Images claimed at a time')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new uploads')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            processed = process_batch(options['batch_size'])
+            total += processed
+            if processed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f'Processed {total} image(s)'))
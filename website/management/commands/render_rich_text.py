@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from website.richtext import RICH_TEXT_FIELDS, render_all
+
+
+class Command(BaseCommand):
+    help = 'Re-render the sanitized HTML, plain text and reading time of every rich text field'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        for model, field in RICH_TEXT_FIELDS.items():
+            count = render_all(model, field, options['batch_size'])
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {count} rendered')
+        self.stdout.write(self.style.SUCCESS('Done'))
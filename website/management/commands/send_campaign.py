@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from website.models import Campaign
+from website.newsletter import send_pending, snapshot_recipients
+
+
+class Command(BaseCommand):
+    help = 'Send a newsletter campaign to every active subscriber; run it again to resume an interrupted send'
+
+    def add_arguments(self, parser):
+        parser.add_argument('campaign_id', type=int)
+        parser.add_argument('--rate', type=float, default=None,
+                            help=f'Messages per second, 0 for no limit (default {settings.NEWSLETTER_RATE_LIMIT})')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help=f'Messages per SMTP connection (default {settings.NEWSLETTER_BATCH_SIZE})')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Subscribers read per query')
+
+    def handle(self, *args, **options):
+        try:
+            campaign = Campaign.objects.get(pk=options['campaign_id'])
+        except Campaign.DoesNotExist:
+            raise CommandError(f"No campaign with id {options['campaign_id']}")
+        if campaign.status == 'sent':
+            self.stdout.write(f'"{campaign}" has already been sent')
+            return
+
+        if campaign.status == 'draft':
+            created = snapshot_recipients(campaign, chunk_size=options['chunk_size'])
+            self.stdout.write(f'"{campaign}": {created} recipient(s)')
+
+        stats = send_pending(
+            campaign, batch_size=options['batch_size'], rate=options['rate'], chunk_size=options['chunk_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {stats['sent']}, failed {stats['failed']}, skipped {stats['skipped']} (unsubscribed)"
+        ))
+        if stats['unreachable']:
+            self.stdout.write(self.style.WARNING('Could not reach the mail server; run the command again to resume'))
+        elif campaign.status != 'sent':
+            self.stdout.write(self.style.WARNING('Some deliveries failed; run the command again to retry them'))
@@ -0,0 +1,47 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from website.mail import send_batch
+
+
+def _send_batch(batch_size):
+    try:
+        return send_batch(batch_size)
+    finally:
+        # Each pool thread has its own database connection
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbound emails'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Number of sender threads')
+        parser.add_argument('--batch-size', type=int, default=50, help='Messages sent per SMTP connection')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new messages')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        batch_size = options['batch_size']
+        pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        total = 0
+        try:
+            while True:
+                if pool:
+                    sent = sum(pool.map(_send_batch, [batch_size] * workers))
+                else:
+                    sent = send_batch(batch_size)
+                total += sent
+                if sent:
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        finally:
+            if pool:
+                pool.shutdown()
+        self.stdout.write(self.style.SUCCESS(f'Sent {total} email(s)'))
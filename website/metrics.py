@@ -0,0 +1,446 @@
+"""
+Request metrics in Prometheus text format at /metrics.
+
+``MetricsMiddleware`` records, per resolved URL name: a latency histogram,
+requests by method and status, database queries and their time (through
+``connection.execute_wrapper``), template render time (``TimedTemplates``,
+the template backend), page cache hits and misses (caching.py) and
+response bytes. Render time includes any queries run from templates. The middleware is
+async-capable, so under ASGI it does not push the rest of the stack into
+a thread.
+
+Queries reach the current request through ``run_query_hooks``, the one
+execute wrapper every connection gets when it opens (signals.py), and a
+ContextVar of hooks that ``query_hook`` adds to. Unlike wrappers added
+per request to ``connections.all()``, that also sees the connections of
+the threads sync code runs in under ASGI.
+
+Each thread adds to its own dict of totals, so recording takes no lock;
+the shards are summed when metrics are read. Shards of exited threads are
+folded together then and every SHARD_FOLD_EVERY new shards, as under ASGI
+sync code runs in a new thread per request. With METRICS_DIR set, every
+worker writes its totals to a file there at most every
+METRICS_FLUSH_INTERVAL seconds and /metrics adds up all the files, so one
+scrape covers every gunicorn worker on the host. Files of workers that
+have exited are folded into one, so counters never go backwards.
+
+/metrics is open to staff and to ``Authorization: Bearer <METRICS_TOKEN>``
+for the Prometheus scraper. Requests slower than METRICS_SLOW_REQUEST
+seconds are also logged.
+"""
+import atexit
+import fcntl
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.backends.django import DjangoTemplates, Template
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'website_'
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+# name -> (type, help)
+METRICS = {
+    'http_requests_total': ('counter', 'Requests by URL name, method and status'),
+    'http_request_duration_seconds': ('histogram', 'Request latency by URL name'),
+    'db_queries_total': ('counter', 'Database queries by URL name'),
+    'db_query_seconds_total': ('counter', 'Time spent in database queries by URL name'),
+    'template_render_seconds_total': ('counter', 'Time spent rendering templates by URL name'),
+    'page_cache_requests_total': ('counter', 'Page cache lookups by URL name and result'),
+    'http_response_bytes_total': ('counter', 'Response body bytes by URL name'),
+}
+
+WORKER_ID = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+RETIRED_FILE = 'retired.json'
+SHARD_FOLD_EVERY = 64
+
+# Totals of the request being handled, see RequestStats
+_current = ContextVar('website_metrics_request', default=None)
+# execute_wrapper hooks of the request being handled, outermost first
+_query_hooks = ContextVar('website_query_hooks', default=())
+
+
+def run_query_hooks(execute, sql, params, many, context):
+    """``execute_wrapper`` of every connection, running the current ``query_hook``s"""
+    hooks = _query_hooks.get()
+    for hook in reversed(hooks):
+        execute = partial(hook, execute)
+    return execute(sql, params, many, context)
+
+
+def install_query_hooks(connection):
+    if run_query_hooks not in connection.execute_wrappers:
+        connection.execute_wrappers.append(run_query_hooks)
+
+
+@contextmanager
+def query_hook(hook):
+    """Run ``hook`` like an ``execute_wrapper`` around every query in the block"""
+    token = _query_hooks.set(_query_hooks.get() + (hook,))
+    try:
+        yield hook
+    finally:
+        _query_hooks.reset(token)
+
+
+class RequestStats:
+    __slots__ = ('queries', 'query_seconds', 'render_seconds', 'cache_hits', 'cache_misses')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.render_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """``execute_wrapper`` hook"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_seconds += time.perf_counter() - start
+            self.queries += 1
+
+
+# Per-thread totals: {(metric, labels): value}, labels a tuple of pairs
+_local = threading.local()
+_shards = []  # (thread, totals) of every thread that has recorded something
+_retired = defaultdict(float)  # totals of threads that have exited
+_shards_lock = threading.Lock()  # taken once per thread and when reading
+
+
+def _totals():
+    try:
+        return _local.totals
+    except AttributeError:
+        totals = _local.totals = defaultdict(float)
+        with _shards_lock:
+            _shards.append((threading.current_thread(), totals))
+            if len(_shards) % SHARD_FOLD_EVERY == 0:
+                _fold_exited()
+        return totals
+
+
+def _fold_exited():
+    """Move the shards of exited threads into _retired, with _shards_lock held"""
+    alive = []
+    for thread, totals in _shards:
+        if thread.is_alive():
+            alive.append((thread, totals))
+        else:
+            _add(_retired, totals)
+    _shards[:] = alive
+
+
+def record(view, method, status, seconds, stats, response_bytes):
+    totals = _totals()
+    keys = _keys.get(view) or _view_keys(view)
+    totals[('http_requests_total', keys.view + (('method', method), ('status', str(status))))] += 1
+    # Every bucket is written so a series has all of them from the start
+    for bound, key in keys.buckets:
+        totals[key] += seconds <= bound
+    totals[keys.duration_sum] += seconds
+    totals[keys.duration_count] += 1
+    totals[keys.queries] += stats.queries
+    totals[keys.query_seconds] += stats.query_seconds
+    totals[keys.render_seconds] += stats.render_seconds
+    if stats.cache_hits:
+        totals[keys.cache_hit] += stats.cache_hits
+    if stats.cache_misses:
+        totals[keys.cache_miss] += stats.cache_misses
+    if response_bytes is not None:
+        totals[keys.response_bytes] += response_bytes
+
+
+class _ViewKeys:
+    """The totals keys of one view, built once"""
+
+    def __init__(self, view):
+        self.view = view = (('view', view),)
+        self.buckets = [
+            (bound, ('http_request_duration_seconds_bucket', view + (('le', _format(bound)),)))
+            for bound in BUCKETS
+        ]
+        self.duration_sum = ('http_request_duration_seconds_sum', view)
+        self.duration_count = ('http_request_duration_seconds_count', view)
+        self.queries = ('db_queries_total', view)
+        self.query_seconds = ('db_query_seconds_total', view)
+        self.render_seconds = ('template_render_seconds_total', view)
+        self.cache_hit = ('page_cache_requests_total', view + (('result', 'hit'),))
+        self.cache_miss = ('page_cache_requests_total', view + (('result', 'miss'),))
+        self.response_bytes = ('http_response_bytes_total', view)
+
+
+_keys = {}  # view -> _ViewKeys, URL names are a small fixed set
+
+
+def _view_keys(view):
+    return _keys.setdefault(view, _ViewKeys(view))
+
+
+def count_page_cache(hit):
+    """Count a page cache lookup against the current request"""
+    stats = _current.get()
+    if stats is not None:
+        if hit:
+            stats.cache_hits += 1
+        else:
+            stats.cache_misses += 1
+
+
+def snapshot():
+    """This process's totals"""
+    with _shards_lock:
+        _fold_exited()
+        result = defaultdict(float, _retired)
+        for thread, totals in _shards:
+            # dict.copy() is atomic, the owning thread may be writing
+            _add(result, totals.copy())
+    return result
+
+
+def _add(into, values):
+    for key, value in values.items():
+        into[key] += value
+
+
+class TimedTemplates(DjangoTemplates):
+    """The Django template backend, timing every render for the current request"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.render_seconds += time.perf_counter() - start
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is not None:
+        return match.view_name
+    if request.path.startswith(settings.STATIC_URL):
+        return '<static>'
+    return '<unresolved>'
+
+
+def _response_bytes(response):
+    if not response.streaming:
+        return len(response.content)
+    if response.has_header('Content-Length'):
+        return int(response['Content-Length'])
+    return None
+
+
+@contextmanager
+def _measuring(stats):
+    token = _current.set(stats)
+    try:
+        with query_hook(stats):
+            yield
+    finally:
+        _current.reset(token)
+
+
+class MetricsMiddleware:
+    """Put first in MIDDLEWARE so the timing covers the whole stack"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.flush_interval = settings.METRICS_FLUSH_INTERVAL
+        self.next_flush = time.monotonic() + self.flush_interval
+        self.slow_request = settings.METRICS_SLOW_REQUEST
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        start = time.perf_counter()
+        with _measuring(stats):
+            response = self.get_response(request)
+        if self._finish(request, response, stats, time.perf_counter() - start):
+            flush()
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        start = time.perf_counter()
+        with _measuring(stats):
+            response = await self.get_response(request)
+        if self._finish(request, response, stats, time.perf_counter() - start):
+            await sync_to_async(flush, thread_sensitive=False)()
+        return response
+
+    def _finish(self, request, response, stats, seconds):
+        """Record the request, returning whether it is time to flush"""
+        view = _view_name(request)
+        record(view, request.method, response.status_code, seconds, stats, _response_bytes(response))
+
+        if self.slow_request and seconds >= self.slow_request:
+            logger.warning(
+                'Slow request %s %s (%s): %.0f ms, %d queries in %.0f ms, render %.0f ms',
+                request.method, request.path, view, seconds * 1000,
+                stats.queries, stats.query_seconds * 1000, stats.render_seconds * 1000,
+            )
+        if settings.METRICS_DIR and time.monotonic() >= self.next_flush:
+            self.next_flush = time.monotonic() + self.flush_interval
+            return True
+        return False
+
+
+_flush_lock = threading.Lock()
+
+
+def flush(directory=None):
+    """Write this process's totals to METRICS_DIR"""
+    directory = directory or settings.METRICS_DIR
+    if not directory or not _flush_lock.acquire(blocking=False):
+        return
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{WORKER_ID}.json')
+        _write(path, snapshot())
+    finally:
+        _flush_lock.release()
+
+
+def _write(path, totals):
+    tmp = f'{path}.{threading.get_ident()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump([[name, labels, value] for (name, labels), value in totals.items()], f)
+    os.replace(tmp, path)
+
+
+def _read(path):
+    totals = defaultdict(float)
+    try:
+        with open(path) as f:
+            for name, labels, value in json.load(f):
+                totals[(name, tuple(map(tuple, labels)))] = value
+    except (OSError, ValueError):
+        pass
+    return totals
+
+
+def _is_running(worker_id):
+    try:
+        os.kill(int(worker_id.split('-')[0]), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        pass
+    return True
+
+
+def collect(directory=None):
+    """Totals of every worker: this one live, the others from METRICS_DIR"""
+    directory = directory or settings.METRICS_DIR
+    totals = snapshot()
+    if not directory or not os.path.isdir(directory):
+        return totals
+    with open(os.path.join(directory, '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        retired_path = os.path.join(directory, RETIRED_FILE)
+        retired = _read(retired_path)
+        exited = []
+        for path in glob.glob(os.path.join(directory, '*-*.json')):
+            worker_id = os.path.basename(path)[:-len('.json')]
+            if worker_id == WORKER_ID:
+                continue
+            if _is_running(worker_id):
+                _add(totals, _read(path))
+            else:
+                _add(retired, _read(path))
+                exited.append(path)
+        if exited:
+            _write(retired_path, retired)
+            for path in exited:
+                os.remove(path)
+    _add(totals, retired)
+    return totals
+
+
+def _format(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def exposition(totals):
+    """Prometheus text format"""
+    series = defaultdict(list)
+    for (name, labels), value in totals.items():
+        base = name
+        for suffix in ('_bucket', '_sum', '_count'):
+            if name.endswith(suffix) and name[:-len(suffix)] in METRICS:
+                base = name[:-len(suffix)]
+        series[base].append((name, labels, value))
+
+    lines = []
+    for base in sorted(series):
+        kind, help_text = METRICS[base]
+        lines.append(f'# HELP {PREFIX}{base} {help_text}')
+        lines.append(f'# TYPE {PREFIX}{base} {kind}')
+        for name, labels, value in sorted(series[base], key=_sort_key):
+            label_text = ','.join(f'{key}="{_escape(label)}"' for key, label in labels)
+            lines.append(f'{PREFIX}{name}{{{label_text}}} {_format(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def _sort_key(item):
+    name, labels, _ = item
+    # Buckets in bound order, then _sum and _count
+    bound = dict(labels).get('le')
+    other = tuple(pair for pair in labels if pair[0] != 'le')
+    return (other, name, float('inf') if bound == '+Inf' else float(bound or 0))
+
+
+def _authorized(request):
+    token = settings.METRICS_TOKEN
+    header = request.headers.get('Authorization', '')
+    if token and header.startswith('Bearer ') and constant_time_compare(header[7:], token):
+        return True
+    return request.user.is_active and request.user.is_staff
+
+
+def metrics_view(request):
+    if not _authorized(request):
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    return HttpResponse(exposition(collect()), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+atexit.register(flush)
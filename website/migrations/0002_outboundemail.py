@@ -0,0 +1,59 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:37
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blogpost',
+            name='featured_image',
+            field=models.FileField(blank=True, null=True, upload_to='blog/'),
+        ),
+        migrations.AlterField(
+            model_name='counselor',
+            name='image',
+            field=models.FileField(blank=True, null=True, upload_to='counselors/'),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='featured_image',
+            field=models.FileField(blank=True, null=True, upload_to='events/'),
+        ),
+        migrations.AlterField(
+            model_name='sitesetting',
+            name='favicon',
+            field=models.FileField(blank=True, null=True, upload_to='site/'),
+        ),
+        migrations.AlterField(
+            model_name='sitesetting',
+            name='logo',
+            field=models.FileField(blank=True, null=True, upload_to='site/'),
+        ),
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=300)),
+                ('body', models.TextField()),
+                ('from_email', models.CharField(max_length=300)),
+                ('recipients', models.TextField(help_text='Comma-separated email addresses')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('sending', 'Sending'), ('sent', 'Sent'), ('dead', 'Failed permanently')], default='queued', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='website_out_status_9307d9_idx')],
+            },
+        ),
+    ]
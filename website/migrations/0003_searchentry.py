@@ -0,0 +1,128 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:38
+
+import re
+from html import unescape
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+
+SQLITE_FORWARD = [
+    """CREATE VIRTUAL TABLE website_searchentry_fts USING fts5(
+        title, body,
+        content='website_searchentry', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER website_searchentry_ai AFTER INSERT ON website_searchentry BEGIN
+        INSERT INTO website_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+    """CREATE TRIGGER website_searchentry_ad AFTER DELETE ON website_searchentry BEGIN
+        INSERT INTO website_searchentry_fts(website_searchentry_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END""",
+    """CREATE TRIGGER website_searchentry_au AFTER UPDATE ON website_searchentry BEGIN
+        INSERT INTO website_searchentry_fts(website_searchentry_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO website_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS website_searchentry_au",
+    "DROP TRIGGER IF EXISTS website_searchentry_ad",
+    "DROP TRIGGER IF EXISTS website_searchentry_ai",
+    "DROP TABLE IF EXISTS website_searchentry_fts",
+]
+
+POSTGRES_FORWARD = [
+    """ALTER TABLE website_searchentry ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(body, '')), 'B')
+        ) STORED""",
+    "CREATE INDEX website_searchentry_vector_idx ON website_searchentry USING GIN (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS website_searchentry_vector_idx",
+    "ALTER TABLE website_searchentry DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+create_fulltext_index = _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD})
+drop_fulltext_index = _run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD})
+
+
+def _text(*parts):
+    # Frozen copy of the search document text as of this migration
+    texts = (re.sub(r'\s+', ' ', unescape(strip_tags(part or ''))).strip() for part in parts)
+    return '\n'.join(text for text in texts if text)
+
+
+def backfill_index(apps, schema_editor):
+    """Index the rows saved before SearchEntry existed"""
+    SearchEntry = apps.get_model('website', 'SearchEntry')
+    documents = {
+        'Service': lambda obj: dict(
+            kind='services', title=obj.name, body=_text(obj.short_description, obj.description),
+            url=f'/services/{obj.pk}/', is_public=obj.is_active,
+        ),
+        'BlogPost': lambda obj: dict(
+            kind='blog', title=obj.title, body=_text(obj.excerpt, obj.content),
+            url=f'/blog/{obj.slug}/', is_public=obj.is_published,
+        ),
+        'Resource': lambda obj: dict(
+            kind='resources', title=obj.title, body=_text(obj.description),
+            url=f'/resources/{obj.pk}/', is_public=True,
+        ),
+        'Event': lambda obj: dict(
+            kind='events', title=obj.title, body=_text(obj.description),
+            url=f'/events/{obj.pk}/', is_public=obj.is_published, expires_at=obj.start_date,
+        ),
+        'FAQ': lambda obj: dict(
+            kind='faqs', title=obj.question, body=_text(obj.answer),
+            url=f'/faq/#faq-{obj.pk}', is_public=obj.is_active,
+        ),
+    }
+    for model_name, document in documents.items():
+        model = apps.get_model('website', model_name)
+        SearchEntry.objects.bulk_create(
+            (SearchEntry(object_id=obj.pk, **document(obj)) for obj in model.objects.order_by('pk').iterator()),
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0002_outboundemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('services', 'Service'), ('blog', 'Blog Post'), ('resources', 'Resource'), ('events', 'Event'), ('faqs', 'FAQ')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('title', models.CharField(max_length=500)),
+                ('body', models.TextField(blank=True)),
+                ('url', models.CharField(max_length=500)),
+                ('is_public', models.BooleanField(default=True)),
+                ('expires_at', models.DateTimeField(blank=True, help_text='Hide from search after this time', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Search Entries',
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(backfill_index, migrations.RunPython.noop),
+    ]
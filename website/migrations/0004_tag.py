@@ -0,0 +1,48 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:41
+
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def backfill_tags(apps, schema_editor):
+    """Create Tag rows from the comma-separated BlogPost.tags"""
+    BlogPost = apps.get_model('website', 'BlogPost')
+    Tag = apps.get_model('website', 'Tag')
+    tags = {}
+    for post in BlogPost.objects.exclude(tags='').iterator():
+        post_tags = []
+        for name in post.tags.split(','):
+            slug = slugify(name.strip())[:100]
+            if not slug:
+                continue
+            if slug not in tags:
+                tags[slug] = Tag.objects.create(name=name.strip(), slug=slug)
+            post_tags.append(tags[slug])
+        post.normalized_tags.set(post_tags)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0003_searchentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(max_length=100, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='normalized_tags',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='posts', to='website.tag'),
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0004_tag'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['status'], name='appointment_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['preferred_date', 'preferred_time'], name='appointment_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['-created_at'], name='appointment_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-published_date'], name='blogpost_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['category', '-published_date'], name='blogpost_pub_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('is_featured', True), ('is_published', True)), fields=['-published_date'], name='blogpost_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['-created_at'], name='contact_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='counselor',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'name'], name='counselor_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['start_date'], name='event_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='faq',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', 'order'], name='faq_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newslettersubscriber',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-subscribed_date'], name='subscriber_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'name'], name='service_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testimonial',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['-created_at'], name='testimonial_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testimonial',
+            index=models.Index(condition=models.Q(('is_approved', True), ('is_featured', True)), fields=['-created_at'], name='testimonial_featured_idx'),
+        ),
+    ]
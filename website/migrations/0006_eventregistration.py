@@ -0,0 +1,32 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:45
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0005_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventRegistration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('email', models.EmailField(max_length=254)),
+                ('phone', models.CharField(max_length=15, validators=[django.core.validators.RegexValidator(message='Enter a valid Kenyan phone number (e.g., 0712345678 or +254712345678)', regex='^(\\+254|0)[7][0-9]{8}$')])),
+                ('status', models.CharField(choices=[('confirmed', 'Confirmed'), ('waitlisted', 'Waitlisted'), ('cancelled', 'Cancelled')], default='confirmed', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='registrations', to='website.event')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['event', 'status', 'created_at'], name='registration_status_idx')],
+                'unique_together': {('event', 'email')},
+            },
+        ),
+    ]
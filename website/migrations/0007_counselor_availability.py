@@ -0,0 +1,53 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0006_eventregistration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CounselorAvailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.IntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+            ],
+            options={
+                'verbose_name_plural': 'Counselor availability',
+                'ordering': ['counselor', 'weekday', 'start_time'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CounselorBlackout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('reason', models.CharField(blank=True, max_length=200)),
+            ],
+            options={
+                'ordering': ['start_date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'cancelled'), _negated=True), fields=('counselor', 'preferred_date', 'preferred_time'), name='appointment_counselor_slot_unique'),
+        ),
+        migrations.AddField(
+            model_name='counseloravailability',
+            name='counselor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability', to='website.counselor'),
+        ),
+        migrations.AddField(
+            model_name='counselorblackout',
+            name='counselor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blackouts', to='website.counselor'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0007_counselor_availability'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='blogpost',
+            name='blogpost_published_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='blogpost',
+            name='blogpost_pub_category_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='testimonial',
+            name='testimonial_approved_idx',
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-published_date', '-id'], name='blogpost_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['category', '-published_date', '-id'], name='blogpost_pub_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(fields=['-created_at', '-id'], name='resource_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testimonial',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['-created_at', '-id'], name='testimonial_approved_idx'),
+        ),
+    ]
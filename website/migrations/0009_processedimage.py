@@ -0,0 +1,32 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0008_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessedImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Storage path of the original upload', max_length=500, unique=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('not_image', 'Not an image'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('source_hash', models.CharField(blank=True, help_text='SHA-256 of the original the derivatives were built from', max_length=64)),
+                ('width', models.PositiveIntegerField(blank=True, null=True)),
+                ('height', models.PositiveIntegerField(blank=True, null=True)),
+                ('variants', models.JSONField(blank=True, default=list, help_text='[{name, width, height, format}]')),
+                ('last_error', models.TextField(blank=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['name'],
+                'indexes': [models.Index(condition=models.Q(('status__in', ['pending', 'processing'])), fields=['claimed_at'], name='processedimage_queue_idx')],
+            },
+        ),
+    ]
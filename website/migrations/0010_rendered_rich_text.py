@@ -0,0 +1,301 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:58
+
+import re
+from html.parser import HTMLParser
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+from django.utils.html import escape
+from PIL import Image, UnidentifiedImageError
+
+RICH_TEXT_FIELDS = {
+    'Service': 'description',
+    'BlogPost': 'content',
+    'Event': 'description',
+    'FAQ': 'answer',
+    'Counselor': 'bio',
+}
+
+# Frozen copy of website/richtext.py as of this migration, so later
+# changes to the live renderer cannot change what it does
+
+WORDS_PER_MINUTE = 200
+
+ALLOWED_TAGS = {
+    'a', 'abbr', 'b', 'blockquote', 'br', 'caption', 'code', 'div', 'em', 'figcaption', 'figure',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'img', 'li', 'ol', 'p', 'pre', 's', 'span',
+    'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'u', 'ul',
+}
+ALLOWED_ATTRIBUTES = {
+    '*': {'class', 'title'},
+    'a': {'href', 'target'},
+    'img': {'src', 'alt', 'width', 'height'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan', 'scope'},
+    'ol': {'start'},
+}
+URL_ATTRIBUTES = {'href', 'src'}
+ALLOWED_SCHEMES = {'', 'http', 'https', 'mailto', 'tel'}
+# Dropped together with everything inside them. Only elements with an end
+# tag: a void one such as <embed> would drop the rest of the document
+DROP_CONTENT_TAGS = {'script', 'style', 'template', 'iframe', 'object', 'noscript', 'svg', 'math'}
+VOID_TAGS = {'br', 'hr', 'img'}
+# Tags that separate words in the plain-text version
+BLOCK_TAGS = {
+    'blockquote', 'br', 'caption', 'div', 'figcaption', 'figure', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'hr', 'li', 'p', 'pre', 'td', 'th', 'tr',
+}
+
+_CONTROL = re.compile(r'[\x00-\x20\x7f]+')
+_STYLE_SIZE = re.compile(r'\b(width|height)\s*:\s*(\d+)px', re.I)
+
+
+def _safe_url(value):
+    # Browsers ignore whitespace and control characters inside a scheme
+    # ("java\tscript:"), so strip them before looking at it
+    scheme = urlsplit(_CONTROL.sub('', value)).scheme.lower()
+    return scheme in ALLOWED_SCHEMES
+
+
+def image_size(src):
+    """(width, height) of an uploaded image referenced by URL, or None"""
+    if not src.startswith(settings.MEDIA_URL):
+        return None
+    name = unquote(urlsplit(src).path[len(settings.MEDIA_URL):])
+    try:
+        with default_storage.open(name) as handle, Image.open(handle) as image:
+            # Only the header is read
+            return image.size
+    except (OSError, UnidentifiedImageError, ValueError, SyntaxError):
+        return None
+
+
+class _Renderer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.html = []
+        self.text = []
+        self.open_tags = []
+        self.dropping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append(' ')
+        if tag not in ALLOWED_TAGS:
+            return
+
+        allowed = ALLOWED_ATTRIBUTES['*'] | ALLOWED_ATTRIBUTES.get(tag, set())
+        kept = {}
+        for name, value in attrs:
+            value = value or ''
+            if name == 'style' and tag == 'img':
+                # CKEditor 4 sizes images with inline style
+                for dimension, pixels in _STYLE_SIZE.findall(value):
+                    kept.setdefault(dimension.lower(), pixels)
+            if name not in allowed or (name in URL_ATTRIBUTES and not _safe_url(value)):
+                continue
+            kept[name] = value
+        if tag == 'img':
+            if 'src' not in kept:
+                return
+            self._decorate_image(kept)
+        if tag == 'a' and kept.get('target') == '_blank':
+            kept['rel'] = 'noopener noreferrer'
+
+        attributes = ''.join(f' {name}="{escape(value)}"' for name, value in kept.items())
+        self.html.append(f'<{tag}{attributes}>')
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and self.open_tags and self.open_tags[-1] == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping = max(0, self.dropping - 1)
+            return
+        if self.dropping:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append(' ')
+        if tag not in self.open_tags:
+            return
+        # Close anything left open inside this element so stray markup can
+        # never leak into the page around it
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.html.append(f'</{open_tag}>')
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.dropping:
+            return
+        self.html.append(escape(data))
+        self.text.append(data)
+
+    def _decorate_image(self, attrs):
+        attrs.setdefault('alt', '')
+        attrs['loading'] = 'lazy'
+        attrs['decoding'] = 'async'
+        if 'width' not in attrs or 'height' not in attrs:
+            size = image_size(attrs['src'])
+            if size:
+                width, height = size
+                if 'width' in attrs and attrs['width'].isdigit() and width:
+                    # Keep the editor's width, scale the height to match
+                    height = round(height * int(attrs['width']) / width)
+                    width = int(attrs['width'])
+                attrs['width'], attrs['height'] = str(width), str(height)
+
+    def result(self):
+        self.close()
+        while self.open_tags:
+            self.html.append(f'</{self.open_tags.pop()}>')
+        return ''.join(self.html), ' '.join(''.join(self.text).split())
+
+
+def render(html):
+    """Sanitize rich text and derive its plain text and reading statistics"""
+    renderer = _Renderer()
+    renderer.feed(html or '')
+    clean_html, text = renderer.result()
+    words = len(text.split())
+    reading_time = max(1, round(words / WORDS_PER_MINUTE)) if words else 0
+    return clean_html, text, words, reading_time
+
+
+def render_existing(apps, schema_editor):
+    """Fill the rendered columns for rows saved before they existed"""
+    for model_name, field in RICH_TEXT_FIELDS.items():
+        model = apps.get_model('website', model_name)
+        columns = [f'{field}_html', f'{field}_text', 'word_count', 'reading_time']
+        batch = []
+        for obj in model.objects.only('pk', field).iterator(chunk_size=500):
+            html, text, obj.word_count, obj.reading_time = render(getattr(obj, field))
+            setattr(obj, columns[0], html)
+            setattr(obj, columns[1], text)
+            batch.append(obj)
+            if len(batch) == 500:
+                model.objects.bulk_update(batch, columns)
+                batch = []
+        model.objects.bulk_update(batch, columns)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0009_processedimage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Minutes'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='counselor',
+            name='bio_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='counselor',
+            name='bio_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='counselor',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Minutes'),
+        ),
+        migrations.AddField(
+            model_name='counselor',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='description_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='description_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Minutes'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='faq',
+            name='answer_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='faq',
+            name='answer_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='faq',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Minutes'),
+        ),
+        migrations.AddField(
+            model_name='faq',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='description_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='description_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Minutes'),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
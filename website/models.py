@@ -23,6 +23,11 @@ class Service(models.Model):
     service_type = models.CharField(max_length=50, choices=SERVICE_TYPES)
     short_description = models.CharField(max_length=255)
     description = RichTextField()
+    # Rendered from description on save (see richtext.py)
+    description_html = models.TextField(blank=True, editable=False)
+    description_text = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveIntegerField(default=0, editable=False, help_text="Minutes")
     icon_name = models.CharField(max_length=50, help_text="FontAwesome icon name (e.g., 'heart', 'users')")
     price_range = models.CharField(max_length=100, blank=True, null=True)
     duration = models.CharField(max_length=100, blank=True, help_text="e.g., 45-60 minutes")
@@ -33,6 +38,9 @@ class Service(models.Model):
     
     class Meta:
         ordering = ['order', 'name']
+        indexes = [
+            models.Index(fields=['order', 'name'], condition=models.Q(is_active=True), name='service_active_idx'),
+        ]
         
     def __str__(self):
         return self.name
@@ -45,6 +53,11 @@ class Counselor(models.Model):
     name = models.CharField(max_length=200)
     title = models.CharField(max_length=200, help_text="e.g., Licensed Professional Counselor")
     bio = RichTextField()
+    # Rendered from bio on save (see richtext.py)
+    bio_html = models.TextField(blank=True, editable=False)
+    bio_text = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveIntegerField(default=0, editable=False, help_text="Minutes")
     #image = models.ImageField(upload_to='counselors/', blank=True, null=True)
     image = models.FileField(upload_to='counselors/', blank=True, null=True)
     specialties = models.CharField(max_length=500, help_text="Comma-separated list of specialties")
@@ -54,9 +67,13 @@ class Counselor(models.Model):
     is_active = models.BooleanField(default=True)
     order = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['order', 'name']
+        indexes = [
+            models.Index(fields=['order', 'name'], condition=models.Q(is_active=True), name='counselor_active_idx'),
+        ]
         
     def __str__(self):
         return self.name
@@ -64,6 +81,54 @@ class Counselor(models.Model):
     def get_specialties_list(self):
         return [s.strip() for s in self.specialties.split(',')]
 
+class Tag(models.Model):
+    """Normalized blog tag, kept in sync with BlogPost.tags"""
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True)
+    
+    class Meta:
+        ordering = ['name']
+        
+    def __str__(self):
+        return self.name
+
+class CounselorAvailability(models.Model):
+    """Weekly working hours of a counselor (see availability.py)"""
+    WEEKDAYS = [
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    ]
+    
+    counselor = models.ForeignKey(Counselor, on_delete=models.CASCADE, related_name='availability')
+    weekday = models.IntegerField(choices=WEEKDAYS)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    
+    class Meta:
+        ordering = ['counselor', 'weekday', 'start_time']
+        verbose_name_plural = "Counselor availability"
+        
+    def __str__(self):
+        return f"{self.counselor} - {self.get_weekday_display()} {self.start_time}-{self.end_time}"
+
+class CounselorBlackout(models.Model):
+    """Dates a counselor is unavailable, e.g. leave or training"""
+    counselor = models.ForeignKey(Counselor, on_delete=models.CASCADE, related_name='blackouts')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    reason = models.CharField(max_length=200, blank=True)
+    
+    class Meta:
+        ordering = ['start_date']
+        
+    def __str__(self):
+        return f"{self.counselor} - {self.start_date} to {self.end_date}"
+
 class BlogPost(models.Model):
     """Model for blog articles and mental health resources"""
     title = models.CharField(max_length=300)
@@ -73,6 +138,11 @@ class BlogPost(models.Model):
     featured_image = models.FileField(upload_to='blog/', blank=True, null=True)
     excerpt = models.TextField(max_length=500, help_text="Brief summary for blog listings")
     content = RichTextField()
+    # Rendered from content on save (see richtext.py)
+    content_html = models.TextField(blank=True, editable=False)
+    content_text = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveIntegerField(default=0, editable=False, help_text="Minutes")
     category = models.CharField(max_length=100, choices=[
         ('anxiety', 'Anxiety & Stress'),
         ('depression', 'Depression & Mood'),
@@ -83,6 +153,7 @@ class BlogPost(models.Model):
         ('general', 'General Mental Health'),
     ])
     tags = models.CharField(max_length=500, blank=True, help_text="Comma-separated tags")
+    normalized_tags = models.ManyToManyField(Tag, blank=True, related_name='posts', editable=False)
     is_featured = models.BooleanField(default=False)
     views_count = models.IntegerField(default=0)
     published_date = models.DateTimeField(default=timezone.now)
@@ -92,6 +163,13 @@ class BlogPost(models.Model):
     
     class Meta:
         ordering = ['-published_date']
+        indexes = [
+            models.Index(fields=['-published_date', '-id'], condition=models.Q(is_published=True), name='blogpost_published_idx'),
+            models.Index(fields=['category', '-published_date', '-id'], condition=models.Q(is_published=True), name='blogpost_pub_category_idx'),
+            models.Index(fields=['-published_date'], condition=models.Q(is_published=True, is_featured=True), name='blogpost_featured_idx'),
+            # Covers the API's Max(updated_at)/Count validators without reading post bodies
+            models.Index(fields=['updated_at'], condition=models.Q(is_published=True), name='blogpost_updated_idx'),
+        ]
         
     def __str__(self):
         return self.title
@@ -100,7 +178,7 @@ class BlogPost(models.Model):
         return reverse('blog_detail', args=[self.slug])
     
     def get_tags_list(self):
-        return [tag.strip() for tag in self.tags.split(',')] if self.tags else []
+        return [tag.strip() for tag in self.tags.split(',') if tag.strip()] if self.tags else []
 
 class Appointment(models.Model):
     """Model for appointment bookings"""
@@ -144,6 +222,20 @@ class Appointment(models.Model):
     
     class Meta:
         ordering = ['-preferred_date', '-preferred_time']
+        indexes = [
+            # Status filter, ordered and bounded by date in the admin
+            models.Index(fields=['status', 'preferred_date'], name='appointment_status_date_idx'),
+            models.Index(fields=['preferred_date', 'preferred_time'], name='appointment_date_idx'),
+            models.Index(fields=['-created_at'], name='appointment_created_idx'),
+        ]
+        constraints = [
+            # A counselor can't have two live bookings starting at the same time
+            models.UniqueConstraint(
+                fields=['counselor', 'preferred_date', 'preferred_time'],
+                condition=~models.Q(status='cancelled'),
+                name='appointment_counselor_slot_unique',
+            ),
+        ]
         
     def __str__(self):
         return f"{self.name} - {self.preferred_date} {self.preferred_time}"
@@ -162,6 +254,11 @@ class ContactMessage(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], condition=models.Q(is_read=False), name='contact_unread_idx'),
+            # Admin date hierarchy (first/last date)
+            models.Index(fields=['created_at'], name='contact_created_idx'),
+        ]
         
     def __str__(self):
         return f"{self.subject} - {self.name}"
@@ -190,6 +287,9 @@ class Resource(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='resource_created_idx'),
+        ]
         
     def __str__(self):
         return self.title
@@ -205,9 +305,14 @@ class Testimonial(models.Model):
     is_featured = models.BooleanField(default=False)
     is_approved = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], condition=models.Q(is_approved=True), name='testimonial_approved_idx'),
+            models.Index(fields=['-created_at'], condition=models.Q(is_approved=True, is_featured=True), name='testimonial_featured_idx'),
+        ]
         
     def __str__(self):
         return f"{self.client_initials} - {self.rating} stars"
@@ -216,6 +321,11 @@ class FAQ(models.Model):
     """Model for frequently asked questions"""
     question = models.CharField(max_length=500)
     answer = RichTextField()
+    # Rendered from answer on save (see richtext.py)
+    answer_html = models.TextField(blank=True, editable=False)
+    answer_text = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveIntegerField(default=0, editable=False, help_text="Minutes")
     category = models.CharField(max_length=100, choices=[
         ('general', 'General'),
         ('services', 'Services'),
@@ -227,9 +337,13 @@ class FAQ(models.Model):
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['category', 'order']
+        indexes = [
+            models.Index(fields=['category', 'order'], condition=models.Q(is_active=True), name='faq_active_idx'),
+        ]
         
     def __str__(self):
         return self.question
@@ -244,6 +358,11 @@ class Event(models.Model):
         ('webinar', 'Webinar'),
     ])
     description = RichTextField()
+    # Rendered from description on save (see richtext.py)
+    description_html = models.TextField(blank=True, editable=False)
+    description_text = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveIntegerField(default=0, editable=False, help_text="Minutes")
     #featured_image = models.ImageField(upload_to='events/', blank=True, null=True)
     featured_image = models.FileField(upload_to='events/', blank=True, null=True)
     start_date = models.DateTimeField()
@@ -257,9 +376,13 @@ class Event(models.Model):
     is_featured = models.BooleanField(default=False)
     is_published = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['start_date']
+        indexes = [
+            models.Index(fields=['start_date'], condition=models.Q(is_published=True), name='event_published_idx'),
+        ]
         
     def __str__(self):
         return self.title
@@ -277,6 +400,31 @@ class Event(models.Model):
             return "Unlimited"
         return self.max_participants - self.current_participants
 
+class EventRegistration(models.Model):
+    """Model for event registrations (see registrations.py)"""
+    STATUS_CHOICES = [
+        ('confirmed', 'Confirmed'),
+        ('waitlisted', 'Waitlisted'),
+        ('cancelled', 'Cancelled'),
+    ]
+    
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='registrations')
+    name = models.CharField(max_length=200)
+    email = models.EmailField()
+    phone = models.CharField(max_length=15, validators=[kenyan_phone_validator])
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='confirmed')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        unique_together = ['event', 'email']
+        indexes = [
+            models.Index(fields=['event', 'status', 'created_at'], name='registration_status_idx'),
+        ]
+        
+    def __str__(self):
+        return f"{self.name} - {self.event}"
+
 class NewsletterSubscriber(models.Model):
     """Model for newsletter subscribers"""
     email = models.EmailField(unique=True)
@@ -287,6 +435,11 @@ class NewsletterSubscriber(models.Model):
     
     class Meta:
         ordering = ['-subscribed_date']
+        indexes = [
+            models.Index(fields=['-subscribed_date'], condition=models.Q(is_active=True), name='subscriber_active_idx'),
+            # Admin date hierarchy (first/last date)
+            models.Index(fields=['subscribed_date'], name='subscriber_date_idx'),
+        ]
         
     def __str__(self):
         return self.email
@@ -335,4 +488,139 @@ class SiteSetting(models.Model):
         # Ensure only one instance exists
         if not self.pk and SiteSetting.objects.exists():
             return
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class OutboundEmail(models.Model):
+    """Model for queued outgoing emails, sent by the send_queued_mail command"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('dead', 'Failed permanently'),
+    ]
+    
+    subject = models.CharField(max_length=300)
+    body = models.TextField()
+    from_email = models.CharField(max_length=300)
+    recipients = models.TextField(help_text="Comma-separated email addresses")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+        
+    def __str__(self):
+        return f"{self.subject} -> {self.recipients}"
+    
+    def get_recipients_list(self):
+        return [r.strip() for r in self.recipients.split(',') if r.strip()]
+
+class SearchEntry(models.Model):
+    """Denormalized search document for one searchable object (see search.py)"""
+    KINDS = [
+        ('services', 'Service'),
+        ('blog', 'Blog Post'),
+        ('resources', 'Resource'),
+        ('events', 'Event'),
+        ('faqs', 'FAQ'),
+    ]
+    
+    kind = models.CharField(max_length=20, choices=KINDS)
+    object_id = models.BigIntegerField()
+    title = models.CharField(max_length=500)
+    body = models.TextField(blank=True)
+    url = models.CharField(max_length=500)
+    is_public = models.BooleanField(default=True)
+    expires_at = models.DateTimeField(null=True, blank=True, help_text="Hide from search after this time")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['kind', 'object_id']
+        verbose_name_plural = "Search Entries"
+        
+    def __str__(self):
+        return f"{self.kind}: {self.title}"
+
+class ProcessedImage(models.Model):
+    """Resized derivatives of one uploaded image, built by the process_images command (see images.py)"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('ready', 'Ready'),
+        ('not_image', 'Not an image'),
+        ('failed', 'Failed'),
+    ]
+    
+    name = models.CharField(max_length=500, unique=True, help_text="Storage path of the original upload")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    source_hash = models.CharField(max_length=64, blank=True, help_text="SHA-256 of the original the derivatives were built from")
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    variants = models.JSONField(default=list, blank=True, help_text="[{name, width, height, format}]")
+    last_error = models.TextField(blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['name']
+        indexes = [
+            models.Index(fields=['claimed_at'], condition=models.Q(status__in=['pending', 'processing']), name='processedimage_queue_idx'),
+        ]
+        
+    def __str__(self):
+        return self.name
+
+class Campaign(models.Model):
+    """Model for newsletter campaigns, sent by the send_campaign command (see newsletter.py)"""
+    STATUS_CHOICES = [
+        ('draft', 'Draft'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+    ]
+    
+    subject = models.CharField(max_length=300)
+    body = models.TextField(help_text="Plain text. {{ first_name }} is filled in per subscriber; an unsubscribe link is added at the end.")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        
+    def __str__(self):
+        return self.subject
+
+class CampaignDelivery(models.Model):
+    """Delivery state of one campaign to one subscriber"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+        ('skipped', 'Skipped (unsubscribed)'),
+    ]
+    
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='deliveries')
+    subscriber = models.ForeignKey(NewsletterSubscriber, on_delete=models.CASCADE, related_name='deliveries')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['id']
+        unique_together = ['campaign', 'subscriber']
+        indexes = [
+            models.Index(fields=['campaign', 'status', 'id'], name='delivery_status_idx'),
+        ]
+        verbose_name_plural = "campaign deliveries"
+        
+    def __str__(self):
+        return f"{self.campaign} -> {self.subscriber}"
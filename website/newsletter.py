@@ -0,0 +1,196 @@
+"""
+Newsletter campaigns.
+
+``manage.py send_campaign <id>`` sends a Campaign in two steps:
+
+1. ``snapshot_recipients`` streams the active subscribers with
+   ``iterator(chunk_size=...)`` and bulk-creates one pending CampaignDelivery
+   per subscriber, which fixes the audience when sending starts.
+2. ``send_pending`` walks the pending deliveries in primary key order, one
+   chunk at a time. It sends up to NEWSLETTER_BATCH_SIZE messages per SMTP
+   connection, at no more than NEWSLETTER_RATE_LIMIT messages per second.
+   Each delivery is marked sent or failed as soon as the server answers.
+   Re-running the command after a crash therefore carries on with the first
+   unsent subscriber; at worst the message in flight is sent twice. Failed
+   deliveries are retried on the next run, up to MAIL_QUEUE_MAX_ATTEMPTS.
+
+Run one sender per campaign. Every message ends with a personal unsubscribe
+link to the newsletter_unsubscribe route, signed so that only the recipient
+can use it, and has List-Unsubscribe headers for one-click unsubscribe.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.signing import Signer
+from django.db.models import F, Q
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+from .models import Campaign, CampaignDelivery, NewsletterSubscriber
+
+logger = logging.getLogger(__name__)
+
+_signer = Signer(salt='website.newsletter.unsubscribe')
+
+
+def unsubscribe_token(email):
+    return _signer.signature(email.lower())
+
+
+def check_unsubscribe_token(email, token):
+    return bool(token) and constant_time_compare(token, unsubscribe_token(email))
+
+
+def unsubscribe_url(email):
+    path = reverse('website:newsletter_unsubscribe', args=[email])
+    return f"{settings.SITE_URL}{path}?{urlencode({'token': unsubscribe_token(email)})}"
+
+
+class Throttle:
+    """Spaces calls to ``wait`` at least 1/rate seconds apart; rate 0 means no limit"""
+
+    def __init__(self, rate, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1 / rate if rate else 0
+        self.clock = clock
+        self.sleep = sleep
+        self.next_at = None
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = self.clock()
+        if self.next_at is not None and now < self.next_at:
+            self.sleep(self.next_at - now)
+            now = self.next_at
+        self.next_at = now + self.interval
+
+
+def snapshot_recipients(campaign, chunk_size=2000):
+    """Create a pending delivery for every active subscriber, return the number created"""
+    subscribers = NewsletterSubscriber.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True)
+    created = 0
+    batch = []
+    for pk in subscribers.iterator(chunk_size=chunk_size):
+        batch.append(CampaignDelivery(campaign=campaign, subscriber_id=pk))
+        if len(batch) == chunk_size:
+            # ignore_conflicts makes an interrupted snapshot safe to repeat
+            created += len(CampaignDelivery.objects.bulk_create(batch, ignore_conflicts=True))
+            batch = []
+    created += len(CampaignDelivery.objects.bulk_create(batch, ignore_conflicts=True))
+    Campaign.objects.filter(pk=campaign.pk, status='draft').update(status='sending', started_at=timezone.now())
+    campaign.refresh_from_db(fields=['status', 'started_at'])
+    return created
+
+
+def _unsent(campaign):
+    max_attempts = getattr(settings, 'MAIL_QUEUE_MAX_ATTEMPTS', 5)
+    return campaign.deliveries.filter(Q(status='pending') | Q(status='failed', attempts__lt=max_attempts))
+
+
+_FIRST_NAME = re.compile(r'\{\{\s*first_name\s*\}\}')
+
+
+def personalize(body, subscriber):
+    """The campaign body with {{ first_name }} filled in; nothing else in it is interpreted"""
+    first_name = subscriber.first_name or 'there'
+    return _FIRST_NAME.sub(lambda match: first_name, body)
+
+
+def build_message(campaign, subscriber, connection=None):
+    url = unsubscribe_url(subscriber.email)
+    body = render_to_string('emails/newsletter_campaign.txt', {
+        'body': personalize(campaign.body, subscriber),
+        'unsubscribe_url': url,
+    })
+    return EmailMessage(
+        campaign.subject,
+        body,
+        settings.DEFAULT_FROM_EMAIL,
+        [subscriber.email],
+        connection=connection,
+        headers={
+            'List-Unsubscribe': f'<{url}>',
+            'List-Unsubscribe-Post': 'List-Unsubscribe=One-Click',
+        },
+    )
+
+
+def send_pending(campaign, batch_size=None, rate=None, chunk_size=500, throttle=None):
+    """
+    Send every unsent delivery of ``campaign`` and return a Counter of
+    'sent', 'failed' and 'skipped', with 'unreachable' set when the mail
+    server could not be reached and sending stopped. Marks the campaign
+    sent once nothing is left to retry.
+    """
+    batch_size = batch_size or settings.NEWSLETTER_BATCH_SIZE
+    throttle = throttle or Throttle(settings.NEWSLETTER_RATE_LIMIT if rate is None else rate)
+    deliveries = _unsent(campaign).select_related('subscriber').only(
+        'id', 'campaign', 'subscriber', 'subscriber__email', 'subscriber__first_name', 'subscriber__is_active',
+    ).order_by('pk')
+
+    stats = Counter()
+    connection = None
+    on_connection = 0
+    last_pk = 0
+    try:
+        while not stats['unreachable']:
+            # Keyset chunks rather than one long cursor: the rows read are
+            # updated as we go, which SQLite does not isolate from the read
+            chunk = list(deliveries.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            for delivery in chunk:
+                last_pk = delivery.pk
+                subscriber = delivery.subscriber
+                if not subscriber.is_active:
+                    CampaignDelivery.objects.filter(pk=delivery.pk).update(status='skipped')
+                    stats['skipped'] += 1
+                    continue
+                if connection is None:
+                    try:
+                        connection = get_connection()
+                        connection.open()
+                    except Exception as exc:
+                        # Nothing was sent; the deliveries stay pending for the next run
+                        logger.error('Could not connect to the mail server for campaign %s: %s', campaign.pk, exc)
+                        connection = None
+                        stats['unreachable'] = 1
+                        break
+                throttle.wait()
+                try:
+                    build_message(campaign, subscriber, connection).send()
+                except Exception as exc:
+                    logger.warning('Could not send campaign %s to %s: %s', campaign.pk, subscriber.email, exc)
+                    CampaignDelivery.objects.filter(pk=delivery.pk).update(
+                        status='failed', attempts=F('attempts') + 1, last_error=str(exc),
+                    )
+                    stats['failed'] += 1
+                    # The server may have dropped us; start a fresh connection
+                    connection.close()
+                    connection = None
+                    on_connection = 0
+                    continue
+                CampaignDelivery.objects.filter(pk=delivery.pk).update(
+                    status='sent', sent_at=timezone.now(), attempts=F('attempts') + 1, last_error='',
+                )
+                stats['sent'] += 1
+                on_connection += 1
+                if on_connection == batch_size:
+                    connection.close()
+                    connection = None
+                    on_connection = 0
+    finally:
+        if connection is not None:
+            connection.close()
+
+    if not _unsent(campaign).exists():
+        Campaign.objects.filter(pk=campaign.pk).update(status='sent', finished_at=timezone.now())
+        campaign.refresh_from_db(fields=['status', 'finished_at'])
+    return stats
@@ -0,0 +1,204 @@
+"""
+Keyset (cursor) pagination for the public listings.
+
+``Paginator`` pages with ``OFFSET`` and runs ``COUNT(*)`` on every request,
+so deep pages get slower the further a crawler goes. ``CursorPaginator``
+instead remembers the ordering values of the last row shown and asks for
+rows strictly after it, which an index on the ordering answers in the same
+time at page 5,000 as at page 1.
+
+Cursors are signed, so they are opaque to visitors and cannot be edited to
+probe arbitrary rows. They travel in the existing ``?page=`` parameter and
+``CursorPage`` keeps the ``page_obj`` interface templates already use;
+``next_page_number`` and ``previous_page_number`` return cursors instead of
+integers. Plain page numbers from old links still work through ``OFFSET``.
+
+The total count is only computed when a template asks for it (``count``,
+``num_pages``, ``page_range``) and is then cached per query under the
+content version, see caching.py.
+"""
+import hashlib
+from functools import cached_property
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+from .caching import CONTENT_VERSION_KEY, _version
+
+COUNT_KEY = 'website:count:%s:%s'
+
+
+class CursorPage:
+    """One page of a ``CursorPaginator``, shaped like ``django.core.paginator.Page``"""
+
+    def __init__(self, object_list, number, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage {self.number}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def next_page_number(self):
+        return self.next_cursor
+
+    def previous_page_number(self):
+        return self.previous_cursor
+
+    def start_index(self):
+        if not self.object_list:
+            return 0
+        return (self.number - 1) * self.paginator.per_page + 1
+
+    def end_index(self):
+        return self.start_index() + len(self.object_list) - 1 if self.object_list else 0
+
+
+class CursorPaginator:
+    """
+    Paginate ``queryset`` by its ordering with signed cursors.
+
+    The ordering (the queryset's own, or the model's ``Meta.ordering``) must
+    be plain non-null field names; the primary key is appended as a
+    tiebreaker so rows sharing a timestamp are neither skipped nor repeated.
+    A ``values()`` queryset must include the ordering fields and the pk.
+    """
+
+    def __init__(self, queryset, per_page, ordering=None):
+        self.per_page = int(per_page)
+        ordering = list(ordering or queryset.query.order_by or queryset.model._meta.ordering)
+        if not any(name.lstrip('-') in ('pk', 'id') for name in ordering):
+            ordering.append('-pk' if ordering and ordering[-1].startswith('-') else 'pk')
+        self.ordering = ordering
+        self.queryset = queryset.order_by(*ordering)
+        self.model = queryset.model
+        self.salt = f'website.pagination:{self.model._meta.label_lower}'
+
+    def _fields(self):
+        opts = self.model._meta
+        for name in self.ordering:
+            attname = name.lstrip('-')
+            field = opts.pk if attname == 'pk' else opts.get_field(attname)
+            yield attname, field, name.startswith('-')
+
+    def encode_cursor(self, obj, number, direction):
+        values = []
+        for _, field, _ in self._fields():
+            # Rows are model instances, or dicts from a values() queryset
+            value = obj[field.attname] if isinstance(obj, dict) else getattr(obj, field.attname)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else str(value))
+        return signing.dumps([direction, number, values], salt=self.salt, compress=True)
+
+    def decode_cursor(self, cursor):
+        """Return (direction, number, values) or None if the cursor is invalid"""
+        try:
+            direction, number, raw = signing.loads(cursor, salt=self.salt)
+            fields = list(self._fields())
+            if direction not in ('n', 'p') or len(raw) != len(fields) or int(number) < 1:
+                return None
+            values = [field.to_python(value) for (_, field, _), value in zip(fields, raw)]
+        except (signing.BadSignature, ValidationError, TypeError, ValueError):
+            return None
+        return direction, int(number), values
+
+    def _seek(self, values, forward):
+        """Q for rows strictly after (forward) or before the row with ``values``"""
+        condition = Q()
+        equal = Q()
+        for (attname, _, descending), value in zip(self._fields(), values):
+            # Walking forward through a descending field means smaller values
+            lookup = f'{attname}__lt' if descending == forward else f'{attname}__gt'
+            condition |= equal & Q(**{lookup: value})
+            equal &= Q(**{attname: value})
+        # Redundant bound on the leading column so the index is range-scanned
+        # from the cursor rather than from the top
+        attname, _, descending = next(self._fields())
+        bound = f'{attname}__lte' if descending == forward else f'{attname}__gte'
+        return Q(**{bound: values[0]}) & condition
+
+    def _reversed_ordering(self):
+        return [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+
+    def get_page(self, page=None):
+        """
+        Return the page for a cursor, a legacy page number, or the first
+        page when ``page`` is missing or invalid (mirrors ``Paginator.get_page``).
+        """
+        if page and str(page).isdigit():
+            return self._offset_page(max(int(page), 1))
+        decoded = self.decode_cursor(page) if page else None
+        if decoded is None or decoded[:2] == ('p', 1):
+            # Going back to page 1 also picks up rows added since
+            return self._build(list(self.queryset[:self.per_page + 1]), 1, has_previous=False)
+
+        direction, number, values = decoded
+        if direction == 'n':
+            rows = list(self.queryset.filter(self._seek(values, forward=True))[:self.per_page + 1])
+            return self._build(rows, number, has_previous=number > 1)
+
+        rows = list(
+            self.queryset.filter(self._seek(values, forward=False))
+            .order_by(*self._reversed_ordering())[:self.per_page + 1]
+        )
+        has_previous = len(rows) > self.per_page
+        return self._build(rows[:self.per_page][::-1], number, has_previous=has_previous, has_next=True)
+
+    def _offset_page(self, number):
+        offset = (number - 1) * self.per_page
+        rows = list(self.queryset[offset:offset + self.per_page + 1])
+        if not rows and number > 1:
+            return self.get_page()
+        return self._build(rows, number, has_previous=number > 1)
+
+    def _build(self, rows, number, has_previous, has_next=None):
+        if has_next is None:
+            has_next = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.encode_cursor(rows[-1], number + 1, 'n')
+        if rows and has_previous:
+            previous_cursor = self.encode_cursor(rows[0], number - 1, 'p')
+        return CursorPage(rows, number, self, next_cursor, previous_cursor)
+
+    @cached_property
+    def count(self):
+        sql, params = self.queryset.order_by().query.sql_with_params()
+        digest = hashlib.md5(f'{sql}|{params!r}'.encode()).hexdigest()
+        key = COUNT_KEY % (_version(CONTENT_VERSION_KEY), digest)
+        count = cache.get(key)
+        if count is None:
+            count = self.queryset.count()
+            cache.set(key, count, settings.PAGINATION_COUNT_TTL)
+        return count
+
+    @property
+    def num_pages(self):
+        return max(1, -(-self.count // self.per_page))
+
+    @property
+    def page_range(self):
+        return range(1, self.num_pages + 1)
@@ -0,0 +1,324 @@
+"""
+Request profiling for staff, with profiles reviewed at /admin/profiles/.
+
+A request is profiled when it carries a staff profiling token, either as
+``?_profile=<token>`` or in an ``X-Profile-Token`` header. The token is a
+signed staff user id valid for PROFILE_TOKEN_MAX_AGE seconds; the profiles
+page shows one for the signed-in user. Profiled responses get an
+``X-Profile`` header linking to the result. Use the query parameter on
+cached pages, since it gives the page a URL of its own and so skips the page cache.
+
+Apart from that, a PROFILE_SAMPLE_RATE share of all requests is profiled and
+kept only when it took PROFILE_SLOW_THRESHOLD seconds or more, so slow
+requests in production leave a profile behind.
+
+A profile has two parts:
+- collapsed stacks from a sampler thread reading the request thread's
+  stack every PROFILE_INTERVAL seconds, ready for flamegraph.pl or
+  speedscope. Under ASGI that is the thread the request's sync code runs
+  in, so time spent awaiting in async code shows up as idle;
+- a timeline of the request's SQL queries, with the project code that ran
+  each one.
+
+Profiles are JSON files in PROFILE_DIR; only the newest PROFILE_KEEP are
+kept.
+"""
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.http import Http404, HttpResponse
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+
+from . import metrics
+
+SALT = 'website.profiling'
+PARAM = '_profile'
+HEADER = 'X-Profile-Token'
+ID_RE = re.compile(r'\d{20}-[0-9a-f]{8}')
+SQL_MAX_LENGTH = 2000
+ORIGIN_FRAMES = 3
+
+PROJECT_DIR = str(settings.BASE_DIR)
+# Query hooks, not where a query comes from
+_HOOK_FILES = {os.path.abspath(__file__), os.path.abspath(metrics.__file__)}
+
+
+def token(user):
+    """A profiling token for a staff user"""
+    return signing.TimestampSigner(salt=SALT).sign(str(user.pk))
+
+
+def _token_value(request):
+    return request.GET.get(PARAM) or request.headers.get(HEADER)
+
+
+def _requested(request):
+    value = _token_value(request)
+    if not value:
+        return None
+    try:
+        pk = signing.TimestampSigner(salt=SALT).unsign(value, max_age=settings.PROFILE_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    return get_user_model().objects.filter(pk=pk, is_active=True, is_staff=True).first()
+
+
+def _frame_name(frame):
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+
+class Sampler(threading.Thread):
+    """Counts the collapsed stacks of one thread every ``interval`` seconds
+
+    The sampler only runs when it gets the GIL, so pure-Python stretches are
+    sampled about every sys.getswitchinterval() (5 ms) at best.
+    """
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='profiling-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def _origin():
+    """The innermost project frames that ran the current query"""
+    origin = []
+    frame = sys._getframe(2)
+    while frame is not None and len(origin) < ORIGIN_FRAMES:
+        filename = frame.f_code.co_filename
+        if filename.startswith(PROJECT_DIR) and 'site-packages' not in filename and filename not in _HOOK_FILES:
+            origin.append(f'{os.path.relpath(filename, PROJECT_DIR)}:{frame.f_lineno} in {frame.f_code.co_name}')
+        frame = frame.f_back
+    return origin
+
+
+class Profile:
+    """Samples a thread, by default the current one, and records the queries run while in use"""
+
+    def __init__(self, interval, thread_id=None):
+        self.interval = interval
+        self.thread_id = threading.get_ident() if thread_id is None else thread_id
+        self.queries = []
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """``execute_wrapper`` hook"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            end = time.perf_counter()
+            self.queries.append({
+                'start': start - self.start,
+                'duration': end - start,
+                'sql': sql[:SQL_MAX_LENGTH],
+                'many': many,
+                'origin': _origin(),
+            })
+
+    def __enter__(self):
+        self.hooked = metrics.query_hook(self)
+        self.hooked.__enter__()
+        self.sampler = Sampler(self.thread_id, self.interval)
+        self.start = time.perf_counter()
+        self.sampler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.duration = time.perf_counter() - self.start
+        self.sampler.stop()
+        self.hooked.__exit__(*exc_info)
+
+    def collapsed(self):
+        return self.sampler.stacks
+
+
+class ProfilingMiddleware:
+    """Put right after MetricsMiddleware so the profile covers the rest of the stack"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        user = _requested(request)
+        reason = _reason(user)
+        if reason is None:
+            return self.get_response(request)
+        with Profile(settings.PROFILE_INTERVAL) as profile:
+            response = self.get_response(request)
+        return _finish(request, response, profile, reason, user)
+
+    async def __acall__(self, request):
+        # Only a request carrying a token needs the user lookup
+        user = await sync_to_async(_requested)(request) if _token_value(request) else None
+        reason = _reason(user)
+        if reason is None:
+            return await self.get_response(request)
+        # Sync views, middleware and ORM calls of this request share one thread
+        thread_id = await sync_to_async(threading.get_ident)()
+        with Profile(settings.PROFILE_INTERVAL, thread_id) as profile:
+            response = await self.get_response(request)
+        return await sync_to_async(_finish, thread_sensitive=False)(request, response, profile, reason, user)
+
+
+def _reason(user):
+    """Why the request is profiled, or None"""
+    if user is not None:
+        return 'requested'
+    if settings.PROFILE_SAMPLE_RATE and random.random() < settings.PROFILE_SAMPLE_RATE:
+        return 'slow'
+    return None
+
+
+def _finish(request, response, profile, reason, user):
+    if reason == 'slow' and profile.duration < settings.PROFILE_SLOW_THRESHOLD:
+        return response
+
+    match = getattr(request, 'resolver_match', None)
+    profile_id = save({
+        'created': datetime.now(timezone.utc).isoformat(),
+        'reason': reason,
+        'user': user.get_username() if user is not None else None,
+        'method': request.method,
+        'path': request.get_full_path(),
+        'view': match.view_name if match is not None else None,
+        'status': response.status_code,
+        'duration': profile.duration,
+        'interval': profile.interval,
+        'queries': profile.queries,
+        'stacks': dict(profile.collapsed()),
+    })
+    if reason == 'requested':
+        response['X-Profile'] = request.build_absolute_uri(
+            reverse('profiling:detail', args=[profile_id])
+        )
+    return response
+
+
+def save(profile):
+    """Store a profile and drop the oldest beyond PROFILE_KEEP, returning its id"""
+    directory = settings.PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    # Sorts by age
+    profile_id = f"{datetime.now(timezone.utc):%Y%m%d%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+    path = os.path.join(directory, f'{profile_id}.json')
+    with open(f'{path}.tmp', 'w') as f:
+        json.dump({'id': profile_id, **profile}, f)
+    os.replace(f'{path}.tmp', path)
+
+    for old in stored_ids()[settings.PROFILE_KEEP:]:
+        try:
+            os.remove(os.path.join(directory, f'{old}.json'))
+        except FileNotFoundError:
+            pass
+    return profile_id
+
+
+def stored_ids():
+    """Profile ids, newest first"""
+    try:
+        names = os.listdir(settings.PROFILE_DIR)
+    except FileNotFoundError:
+        return []
+    return sorted((name[:-5] for name in names if name.endswith('.json') and ID_RE.fullmatch(name[:-5])), reverse=True)
+
+
+def load(profile_id):
+    if not ID_RE.fullmatch(profile_id):
+        raise Http404
+    try:
+        with open(os.path.join(settings.PROFILE_DIR, f'{profile_id}.json')) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        raise Http404
+
+
+def collapsed_text(profile):
+    """Brendan Gregg's collapsed-stack format, one ``frame;frame;frame count`` per line"""
+    return ''.join(f'{stack} {count}\n' for stack, count in sorted(profile['stacks'].items()))
+
+
+def _summary(profile):
+    profile['sql_duration'] = sum(query['duration'] for query in profile['queries'])
+    profile['samples'] = sum(profile['stacks'].values())
+    return profile
+
+
+def profile_list(request):
+    profiles = []
+    for profile_id in stored_ids():
+        try:
+            profiles.append(_summary(load(profile_id)))
+        except Http404:  # rotated away meanwhile
+            pass
+    return TemplateResponse(request, 'admin/profiling/list.html', {
+        **admin.site.each_context(request),
+        'title': 'Profiles',
+        'profiles': profiles,
+        'token': token(request.user),
+        'token_max_age': settings.PROFILE_TOKEN_MAX_AGE,
+        'param': PARAM,
+        'header': HEADER,
+    })
+
+
+def profile_detail(request, profile_id):
+    profile = _summary(load(profile_id))
+    hottest = Counter()
+    for stack, count in profile['stacks'].items():
+        hottest[stack.rsplit(';', 1)[-1]] += count
+    return TemplateResponse(request, 'admin/profiling/detail.html', {
+        **admin.site.each_context(request),
+        'title': f"Profile of {profile['method']} {profile['path']}",
+        'profile': profile,
+        'hottest': hottest.most_common(20),
+    })
+
+
+def profile_download(request, profile_id):
+    response = HttpResponse(collapsed_text(load(profile_id)), content_type='text/plain; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{profile_id}.folded"'
+    return response
+
+
+urls = ([
+    path('', admin.site.admin_view(profile_list), name='list'),
+    path('<str:profile_id>/', admin.site.admin_view(profile_detail), name='detail'),
+    path('<str:profile_id>/folded/', admin.site.admin_view(profile_download), name='download'),
+], 'profiling')
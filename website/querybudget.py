@@ -0,0 +1,165 @@
+"""
+Query budgets and repeated-query (N+1) detection.
+
+A view declares the most queries a request to it may run, with the
+``query_budget`` decorator or, for views this app does not own, by URL
+name in settings.QUERY_BUDGETS (which wins). With QUERY_BUDGET_CHECKS
+on, ``QueryBudgetMiddleware`` records every query of a request with the
+project code that ran it, and logs a warning when a view goes over budget
+or runs the same SQL shape (literals and IN lists aside)
+QUERY_REPEAT_THRESHOLD times or more, which is what an N+1 looks like.
+
+Tests use ``QueryBudgetTestMixin.assertWithinQueryBudget``, which fails
+on either, so CI catches a view that regresses.
+"""
+import logging
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.urls import resolve
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+PROJECT_DIR = str(settings.BASE_DIR)
+# Query hooks and middleware, not where a query comes from
+_SKIP_FILES = {
+    os.path.join(PROJECT_DIR, 'website', name)
+    for name in ('querybudget.py', 'metrics.py', 'profiling.py', 'assets.py')
+}
+
+_IN_LIST_RE = re.compile(r'\bIN \((?:%s|\?)(?:, (?:%s|\?))*\)')
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def query_budget(max_queries):
+    """Declare the most queries one request to the view may run"""
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def budget_for(match):
+    """The budget of a resolved URL, or None"""
+    if match is None:
+        return None
+    budgets = settings.QUERY_BUDGETS
+    if match.view_name in budgets:
+        return budgets[match.view_name]
+    return getattr(match.func, 'query_budget', None)
+
+
+def shape(sql):
+    """SQL with literals and IN lists replaced, so repeats of one query compare equal"""
+    return _LITERAL_RE.sub('?', _IN_LIST_RE.sub('IN (...)', sql))
+
+
+def _call_site():
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(PROJECT_DIR) and 'site-packages' not in filename and filename not in _SKIP_FILES:
+            return f'{os.path.relpath(filename, PROJECT_DIR)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return 'outside the project'
+
+
+class QueryLog:
+    """Records the queries run on every connection while in use"""
+
+    def __init__(self):
+        self.queries = []  # (sql, call site)
+
+    def __call__(self, execute, sql, params, many, context):
+        """``execute_wrapper`` hook"""
+        if not sql.startswith('PRAGMA'):  # connection setup (signals.py), not the view's
+            self.queries.append((sql, _call_site()))
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self.hooked = metrics.query_hook(self)
+        self.hooked.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.hooked.__exit__(*exc_info)
+
+    def repeated(self, threshold=None):
+        """[(shape, count, {call site: count})] of shapes run ``threshold`` times or more"""
+        threshold = threshold or settings.QUERY_REPEAT_THRESHOLD
+        counts = Counter()
+        sites = defaultdict(Counter)
+        for sql, site in self.queries:
+            key = shape(sql)
+            counts[key] += 1
+            sites[key][site] += 1
+        return [(key, count, dict(sites[key])) for key, count in counts.most_common() if count >= threshold]
+
+    def problems(self, budget):
+        """Human-readable descriptions of what is wrong with this request"""
+        problems = []
+        if budget is not None and len(self.queries) > budget:
+            problems.append(f'{len(self.queries)} queries, over the budget of {budget}')
+        for key, count, sites in self.repeated():
+            where = ', '.join(f'{site} ({n}x)' for site, n in sites.items())
+            problems.append(f'same query {count} times from {where}: {key[:300]}')
+        return problems
+
+
+class QueryBudgetMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.QUERY_BUDGET_CHECKS:
+            return self.get_response(request)
+        with QueryLog() as log:
+            response = self.get_response(request)
+        _report(request, log)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.QUERY_BUDGET_CHECKS:
+            return await self.get_response(request)
+        with QueryLog() as log:
+            response = await self.get_response(request)
+        _report(request, log)
+        return response
+
+
+def _report(request, log):
+    match = getattr(request, 'resolver_match', None)
+    problems = log.problems(budget_for(match))
+    if problems:
+        view = match.view_name if match is not None else request.path
+        logger.warning('Queries of %s %s (%s): %s', request.method, request.path, view, '; '.join(problems))
+
+
+class QueryBudgetTestMixin:
+    """For TestCases: fail when a view goes over its budget or repeats a query"""
+
+    def assertWithinQueryBudget(self, path, data=None, budget=None, client=None):
+        """GET ``path`` and check its queries; ``budget`` defaults to the view's own"""
+        if budget is None:
+            budget = budget_for(resolve(path))
+            if budget is None:
+                self.fail(f'{path} has no query budget, add @query_budget or a QUERY_BUDGETS entry')
+        with QueryLog() as log:
+            response = (client or self.client).get(path, data)
+        problems = log.problems(budget)
+        if problems:
+            self.fail(f'GET {path}: ' + '\n'.join(problems))
+        return response
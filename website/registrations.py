@@ -0,0 +1,62 @@
+"""
+Event registration with race-free capacity reservation.
+
+A seat is claimed with a single conditional UPDATE
+(current_participants + 1 WHERE current_participants < max_participants),
+so concurrent registrations can never overbook an event. When the UPDATE
+claims nothing the registration goes on the waitlist, and cancelling a
+confirmed registration hands its seat to the oldest waitlisted one.
+"""
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Event, EventRegistration
+
+
+def claim_seat(event_id):
+    """Take one seat if one is free; True on success"""
+    return bool(
+        Event.objects.filter(pk=event_id)
+        .filter(Q(max_participants=0) | Q(current_participants__lt=F('max_participants')))
+        .update(current_participants=F('current_participants') + 1, updated_at=timezone.now())
+    )
+
+
+def register_for_event(event, name, email, phone):
+    """
+    Register for an event, returning the EventRegistration (status
+    'confirmed' or 'waitlisted'). Raises IntegrityError if the email is
+    already registered, in which case no seat is taken.
+    """
+    with transaction.atomic():
+        status = 'confirmed' if claim_seat(event.pk) else 'waitlisted'
+        return EventRegistration.objects.create(
+            event=event, name=name, email=email, phone=phone, status=status,
+        )
+
+
+def cancel_registration(registration):
+    """Cancel a registration; a confirmed seat passes to the waitlist. Returns the promoted registration, if any"""
+    with transaction.atomic():
+        was_confirmed = EventRegistration.objects.filter(
+            pk=registration.pk, status='confirmed',
+        ).update(status='cancelled')
+        EventRegistration.objects.filter(pk=registration.pk, status='waitlisted').update(status='cancelled')
+        registration.status = 'cancelled'
+        if not was_confirmed:
+            return None
+
+        waitlist = EventRegistration.objects.filter(
+            event_id=registration.event_id, status='waitlisted',
+        ).order_by('created_at', 'pk')
+        for candidate in waitlist:
+            # Conditional so two cancellations never promote the same person
+            if EventRegistration.objects.filter(pk=candidate.pk, status='waitlisted').update(status='confirmed'):
+                candidate.status = 'confirmed'
+                return candidate
+
+        Event.objects.filter(pk=registration.event_id, current_participants__gt=0).update(
+            current_participants=F('current_participants') - 1, updated_at=timezone.now(),
+        )
+        return None
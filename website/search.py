@@ -0,0 +1,236 @@
+"""
+Full-text search over services, blog posts, resources, events and FAQs.
+
+Every searchable object has one SearchEntry row holding its plain text.
+On SQLite the rows are indexed by an FTS5 table, on PostgreSQL by a
+generated tsvector column with a GIN index (see migration 0003). Both
+return ranked results with highlighted snippets from a single query.
+Other databases fall back to ``icontains`` matching on SearchEntry.
+
+Entries are kept in sync by the signals in signals.py; run
+``manage.py rebuild_search_index`` to (re)build them from scratch.
+"""
+import re
+from dataclasses import dataclass
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import escape
+
+from .models import FAQ, BlogPost, Event, Resource, SearchEntry, Service
+from .richtext import RICH_TEXT_FIELDS
+
+RESULT_KINDS = [kind for kind, _ in SearchEntry.KINDS]
+
+# Placeholder markers wrapped around matches by the database, swapped for
+# <mark> tags once the snippet has been escaped.
+_START, _STOP = '\x02', '\x03'
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    object_id: int
+    title: str
+    url: str
+    snippet: str
+    rank: float
+
+
+def _join(*parts):
+    # Rich text is indexed from the plain text rendered on save (richtext.py)
+    return '\n'.join(part.strip() for part in parts if part and part.strip())
+
+
+# model -> function returning the SearchEntry fields for an instance
+DOCUMENTS = {
+    Service: lambda obj: {
+        'kind': 'services',
+        'title': obj.name,
+        'body': _join(obj.short_description, obj.description_text),
+        'url': reverse('website:service_detail', args=[obj.pk]),
+        'is_public': obj.is_active,
+    },
+    BlogPost: lambda obj: {
+        'kind': 'blog',
+        'title': obj.title,
+        'body': _join(obj.excerpt, obj.content_text),
+        'url': reverse('website:blog_detail', args=[obj.slug]),
+        'is_public': obj.is_published,
+    },
+    Resource: lambda obj: {
+        'kind': 'resources',
+        'title': obj.title,
+        'body': _join(obj.description),
+        'url': reverse('website:resource_detail', args=[obj.pk]),
+        'is_public': True,
+    },
+    Event: lambda obj: {
+        'kind': 'events',
+        'title': obj.title,
+        'body': _join(obj.description_text),
+        'url': reverse('website:event_detail', args=[obj.pk]),
+        'is_public': obj.is_published,
+        'expires_at': obj.start_date,
+    },
+    FAQ: lambda obj: {
+        'kind': 'faqs',
+        'title': obj.question,
+        'body': _join(obj.answer_text),
+        'url': reverse('website:faq') + f'#faq-{obj.pk}',
+        'is_public': obj.is_active,
+    },
+}
+
+
+def index_instance(instance):
+    document = DOCUMENTS[type(instance)](instance)
+    kind = document.pop('kind')
+    document.setdefault('expires_at', None)
+    SearchEntry.objects.update_or_create(kind=kind, object_id=instance.pk, defaults=document)
+
+
+def unindex_instance(instance):
+    kind = DOCUMENTS[type(instance)](instance)['kind']
+    SearchEntry.objects.filter(kind=kind, object_id=instance.pk).delete()
+
+
+def rebuild_index(batch_size=500):
+    """Recreate every SearchEntry from the source models, return the number indexed"""
+    SearchEntry.objects.all().delete()
+    total = 0
+    for model, document in DOCUMENTS.items():
+        batch = []
+        objects = model.objects.order_by('pk')
+        if model in RICH_TEXT_FIELDS:
+            # Indexed from the rendered plain text; skip loading the HTML
+            field = RICH_TEXT_FIELDS[model]
+            objects = objects.defer(field, f'{field}_html')
+        for obj in objects.iterator(chunk_size=batch_size):
+            batch.append(SearchEntry(object_id=obj.pk, **document(obj)))
+            if len(batch) >= batch_size:
+                SearchEntry.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        SearchEntry.objects.bulk_create(batch)
+        total += len(batch)
+    return total
+
+
+def _fts5_query(query):
+    """Turn user input into an FTS5 query of prefix-matched terms"""
+    terms = re.findall(r'\w+', query)
+    return ' '.join('"%s"*' % term for term in terms)
+
+
+# Matches are ranked and cut down to per_kind rows per kind first, so the
+# (comparatively expensive) snippets are only built for rows returned.
+SQLITE_SEARCH = f"""
+    WITH ranked AS (
+        SELECT rowid AS id, bm25(website_searchentry_fts, 10.0, 1.0) AS rank
+        FROM website_searchentry_fts
+        WHERE website_searchentry_fts MATCH %s
+    ), top AS (
+        SELECT * FROM (
+            SELECT e.id, ranked.rank,
+                   ROW_NUMBER() OVER (PARTITION BY e.kind ORDER BY ranked.rank) AS position
+            FROM ranked JOIN website_searchentry e ON e.id = ranked.id
+            WHERE e.is_public AND (e.expires_at IS NULL OR e.expires_at >= %s)
+        ) WHERE position <= %s
+    )
+    SELECT e.kind, e.object_id, e.title, e.url,
+           snippet(website_searchentry_fts, 1, '{_START}', '{_STOP}', '...', 24), top.rank
+    FROM top
+    JOIN website_searchentry e ON e.id = top.id
+    JOIN website_searchentry_fts ON website_searchentry_fts.rowid = top.id
+    WHERE website_searchentry_fts MATCH %s
+    ORDER BY top.rank
+"""
+
+POSTGRES_SEARCH = f"""
+    WITH q AS (
+        SELECT websearch_to_tsquery('english', %s) AS query
+    ), top AS (
+        SELECT * FROM (
+            SELECT e.id, -ts_rank(e.search_vector, q.query) AS rank,
+                   ROW_NUMBER() OVER (PARTITION BY e.kind ORDER BY ts_rank(e.search_vector, q.query) DESC) AS position
+            FROM website_searchentry e, q
+            WHERE e.search_vector @@ q.query
+              AND e.is_public AND (e.expires_at IS NULL OR e.expires_at >= %s)
+        ) matches WHERE position <= %s
+    )
+    SELECT e.kind, e.object_id, e.title, e.url,
+           ts_headline('english', e.body, q.query,
+                       'StartSel={_START}, StopSel={_STOP}, MaxWords=35, MinWords=15'),
+           top.rank
+    FROM top JOIN website_searchentry e ON e.id = top.id, q
+    ORDER BY top.rank
+"""
+
+
+def _highlight(snippet):
+    return escape(snippet).replace(_START, '<mark>').replace(_STOP, '</mark>')
+
+
+def _fallback_search(query, now, per_kind):
+    from django.db.models import Q
+    entries = SearchEntry.objects.filter(
+        Q(title__icontains=query) | Q(body__icontains=query),
+        Q(expires_at__isnull=True) | Q(expires_at__gte=now),
+        is_public=True,
+    )
+    rows = []
+    for kind in RESULT_KINDS:
+        for entry in entries.filter(kind=kind)[:per_kind]:
+            rows.append((entry.kind, entry.object_id, entry.title, entry.url, entry.body[:200], 0))
+    return rows
+
+
+def search(query, per_kind=5):
+    """Return up to per_kind ranked SearchHits of each kind, best first"""
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    if connection.vendor == 'sqlite':
+        match = _fts5_query(query)
+        if not match:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(SQLITE_SEARCH, [match, now, per_kind, match])
+            rows = cursor.fetchall()
+    elif connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRES_SEARCH, [query, now, per_kind])
+            rows = cursor.fetchall()
+    else:
+        rows = _fallback_search(query, timezone.now(), per_kind)
+
+    return [
+        SearchHit(kind, object_id, title, url, _highlight(snippet), rank)
+        for kind, object_id, title, url, snippet, rank in rows
+    ]
+
+
+def matching_ids(kind, query):
+    """
+    Subquery of the object ids of every ``kind`` entry matching ``query``,
+    public or not, for ``filter(pk__in=...)`` in the admin.
+    """
+    if connection.vendor == 'sqlite':
+        match = _fts5_query(query) or '""'
+        return RawSQL(
+            'SELECT e.object_id FROM website_searchentry_fts f '
+            'JOIN website_searchentry e ON e.id = f.rowid '
+            'WHERE website_searchentry_fts MATCH %s AND e.kind = %s',
+            [match, kind],
+        )
+    if connection.vendor == 'postgresql':
+        return RawSQL(
+            "SELECT object_id FROM website_searchentry "
+            "WHERE kind = %s AND search_vector @@ websearch_to_tsquery('english', %s)",
+            [kind, query],
+        )
+    from django.db.models import Q
+    return SearchEntry.objects.filter(
+        Q(title__icontains=query) | Q(body__icontains=query), kind=kind,
+    ).values('object_id')
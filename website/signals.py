@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import images, metrics, richtext, search, tags
+from .caching import bump_content_version, invalidate_site_settings
+from .models import FAQ, BlogPost, Counselor, Event, Service, SiteSetting, Testimonial
+
+# Models whose changes show up on cached public pages
+PAGE_CONTENT_MODELS = (Service, BlogPost, Testimonial, Event, Counselor, FAQ, SiteSetting)
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS to every new SQLite connection"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def install_query_hooks(sender, connection, **kwargs):
+    """Run the connection's queries through the current metrics.query_hook()s"""
+    metrics.install_query_hooks(connection)
+
+
+@receiver([post_save, post_delete], sender=SiteSetting)
+def site_settings_changed(sender, **kwargs):
+    """Drop the cached SiteSetting whenever it is edited in the admin"""
+    invalidate_site_settings()
+
+
+@receiver([post_save, post_delete])
+def page_content_changed(sender, **kwargs):
+    """Expire cached public pages when content shown on them changes"""
+    if sender in PAGE_CONTENT_MODELS:
+        bump_content_version()
+
+
+@receiver(pre_save)
+def render_rich_text(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Sanitize rich text and fill its rendered columns before saving"""
+    if sender not in richtext.RICH_TEXT_FIELDS or raw:
+        return
+    if update_fields is not None and richtext.RICH_TEXT_FIELDS[sender] not in update_fields:
+        return
+    richtext.apply(instance)
+
+
+@receiver(post_save)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    """Keep the SearchEntry of a searchable object in sync"""
+    if sender in search.DOCUMENTS and not raw:
+        search.index_instance(instance)
+
+
+@receiver(post_delete)
+def remove_from_search_index(sender, instance, **kwargs):
+    if sender in search.DOCUMENTS:
+        search.unindex_instance(instance)
+
+
+@receiver(post_save, sender=BlogPost)
+def update_post_tags(sender, instance, raw=False, **kwargs):
+    """Mirror BlogPost.tags into the normalized Tag table"""
+    if not raw:
+        tags.sync_post_tags(instance)
+    tags.invalidate_top_tags()
+
+
+@receiver(post_delete, sender=BlogPost)
+def post_deleted(sender, instance, **kwargs):
+    tags.invalidate_top_tags()
+
+
+@receiver(post_save)
+def queue_image_derivatives(sender, instance, raw=False, **kwargs):
+    """Queue resized copies of newly uploaded images for process_images"""
+    if sender in images.IMAGE_FIELDS and not raw:
+        images.queue_instance_images(instance)
@@ -0,0 +1,71 @@
+"""
+Dashboard statistics.
+
+Counts that used to take one query each are folded into conditional
+aggregates, and the per-day appointment chart is a single GROUP BY over
+preferred_date. The result is cached for DASHBOARD_STATS_TTL seconds.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Appointment, BlogPost, ContactMessage, Event, NewsletterSubscriber
+
+DASHBOARD_STATS_KEY = 'website:dashboard_stats:%s:%s'
+MAX_CHART_DAYS = 90
+
+
+def appointment_series(days, today=None):
+    """Return (labels, counts) of appointments per preferred_date for the last `days` days"""
+    today = today or timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    per_day = dict(
+        Appointment.objects.filter(preferred_date__range=(start, today))
+        .order_by()
+        .values_list('preferred_date')
+        .annotate(count=Count('id'))
+    )
+    dates = [start + timedelta(days=i) for i in range(days)]
+    label = '%a' if days <= 7 else '%b %d'
+    return [d.strftime(label) for d in dates], [per_day.get(d, 0) for d in dates]
+
+
+def compute_dashboard_stats(days=7):
+    now = timezone.now()
+    appointment_counts = Appointment.objects.aggregate(
+        total_appointments=Count('id'),
+        pending_appointments=Count('id', filter=Q(status='pending')),
+        confirmed_appointments=Count('id', filter=Q(status='confirmed')),
+        completed_appointments=Count('id', filter=Q(status='completed')),
+    )
+    blog_counts = BlogPost.objects.aggregate(
+        total_blog_posts=Count('id'),
+        published_posts=Count('id', filter=Q(is_published=True)),
+    )
+    labels, data = appointment_series(days)
+    return {
+        **appointment_counts,
+        **blog_counts,
+        'unread_messages': ContactMessage.objects.filter(is_read=False).count(),
+        'total_subscribers': NewsletterSubscriber.objects.filter(is_active=True).count(),
+        'upcoming_events': Event.objects.filter(start_date__gte=now, is_published=True).count(),
+        'last_7_days': labels,
+        'appointments_data': data,
+        'service_types': list(
+            Appointment.objects.order_by().values('appointment_type').annotate(count=Count('id'))
+        ),
+    }
+
+
+def get_dashboard_stats(days=7):
+    """Cached dashboard statistics for the last `days` days (1 to MAX_CHART_DAYS)"""
+    days = max(1, min(days, MAX_CHART_DAYS))
+    key = DASHBOARD_STATS_KEY % (timezone.localdate().isoformat(), days)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_dashboard_stats(days)
+        cache.set(key, stats, getattr(settings, 'DASHBOARD_STATS_TTL', 60))
+    return stats
@@ -0,0 +1,404 @@
+"""
+Synthetic data at production scale, for capacity tests and benchmarks.
+
+``generate`` fills the database with realistic rows of every public model
+through bulk_create, a batch per transaction; the same seed on the same
+database gives the same rows. bulk_create skips save() and signals, so
+their work is done here instead: rich text is rendered (richtext.py), blog
+tags are linked (tags.py), the search index is rebuilt and cached pages
+expire. Run it with ``manage.py generate_data``.
+"""
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from datetime import time as clock
+from decimal import Decimal
+from itertools import islice
+
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from . import search
+from .caching import bump_content_version
+from .models import (
+    FAQ, Appointment, BlogPost, Counselor, CounselorAvailability, Event, NewsletterSubscriber, Resource,
+    Service, Tag, Testimonial,
+)
+from .richtext import render
+from .tags import invalidate_top_tags, tag_slug
+
+# Rows per model at full scale
+COUNTS = {
+    'services': 12,
+    'counselors': 25,
+    'posts': 50000,
+    'appointments': 1000000,
+    'subscribers': 200000,
+    'events': 2000,
+    'faqs': 300,
+    'testimonials': 5000,
+    'resources': 500,
+}
+
+WORDS = (
+    'anxiety stress sleep routine breathing support family friends school work grief loss healing '
+    'boundaries communication trust conflict resilience mindfulness journaling exercise balance '
+    'burnout motivation confidence self-esteem identity change recovery hope patience listening '
+    'emotions feelings thoughts habits goals progress setbacks coping skills session counselor '
+    'therapy group community youth parents couples relationship wellbeing health care rest calm '
+    'worry fear anger sadness joy gratitude kindness compassion acceptance growth reflection'
+).split()
+FIRST_NAMES = (
+    'Wanjiru Achieng Njeri Amina Grace Faith Mercy Joy Aisha Zawadi Brian Kevin Otieno Kamau '
+    'Mwangi Hassan Daniel Samuel Peter James Mary Ann Lucy Esther David Joseph Ruth Naomi Ian Tom'
+).split()
+LAST_NAMES = (
+    'Kariuki Odhiambo Mutua Wafula Kiprop Chebet Njoroge Omondi Ndungu Wambui Otieno Kimani '
+    'Mohamed Ali Waweru Mbugua Korir Onyango Muthoni Achieng Smith Brown Okello Nyambura'
+).split()
+TAGS = (
+    'Anxiety, Stress, Sleep, Grief, Parenting, Teens, Couples, Mindfulness, Burnout, Self-Care, '
+    'Trauma, Depression, Workplace, Students, Resilience, Boundaries, Communication, Family, '
+    'Addiction, Recovery, Loneliness, Self-Esteem, Anger, Panic, Wellbeing, Community'
+).split(', ')
+LOCATIONS = ['Nairobi', 'Mombasa', 'Kisumu', 'Nakuru', 'Eldoret', 'Thika', 'Online']
+ICONS = ['heart', 'users', 'comments', 'hands-helping', 'child', 'brain', 'leaf', 'sun']
+
+APPOINTMENT_SLOTS_PER_DAY = 16  # 30-minute slots from 08:00
+
+
+def _choices(model, field):
+    return [value for value, _ in model._meta.get_field(field).choices]
+
+
+@contextmanager
+def _explicit_dates(model):
+    """Let generated created_at/updated_at values through instead of now()"""
+    fields = [field for field in model._meta.concrete_fields if isinstance(field, models.DateField)]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def bulk_insert(model, objects, batch_size, ignore_conflicts=False, after_batch=None):
+    """Insert an iterable of unsaved instances a batch per transaction, return the number inserted"""
+    count = 0
+    # bulk_create() returns skipped conflicts too, so count the table instead
+    before = model.objects.count() if ignore_conflicts else None
+    objects = iter(objects)
+    with _explicit_dates(model):
+        while batch := list(islice(objects, batch_size)):
+            with transaction.atomic():
+                batch = model.objects.bulk_create(batch, ignore_conflicts=ignore_conflicts)
+                if after_batch:
+                    after_batch(batch)
+            count += len(batch)
+    if ignore_conflicts:
+        return model.objects.count() - before
+    return count
+
+
+class Generator:
+    """Unsaved instances of each model, drawn from one seeded random stream"""
+
+    def __init__(self, seed=0, now=None):
+        self.random = random.Random(seed)
+        self.now = now or timezone.now()
+
+    # Text
+
+    def words(self, low, high):
+        return ' '.join(self.random.choices(WORDS, k=self.random.randint(low, high)))
+
+    def sentence(self, low=6, high=18):
+        return self.words(low, high).capitalize() + '.'
+
+    def title(self, low=3, high=8):
+        return self.words(low, high).title()
+
+    def paragraph(self):
+        """A paragraph as CKEditor leaves it: some markup, some pasted inline styles"""
+        sentences = []
+        for _ in range(self.random.randint(3, 7)):
+            sentence = self.sentence()
+            roll = self.random.random()
+            if roll < 0.1:
+                sentence = f'<strong>{sentence}</strong>'
+            elif roll < 0.15:
+                sentence = f'<em>{sentence}</em>'
+            elif roll < 0.2:
+                sentence = f'<a href="https://example.com/{slugify(self.words(2, 4))}">{sentence}</a>'
+            elif roll < 0.23:
+                sentence = f'<span style="font-weight: 700;">{sentence}</span>'
+            sentences.append(sentence)
+        return ' '.join(sentences)
+
+    def rich_html(self, low, high):
+        parts = []
+        for index in range(self.random.randint(low, high)):
+            roll = self.random.random()
+            if index and roll < 0.15:
+                parts.append(f'<h2>{self.title()}</h2>')
+            elif roll < 0.25:
+                items = ''.join(f'<li>{self.sentence(3, 10)}</li>' for _ in range(self.random.randint(3, 6)))
+                parts.append(f'<ul>{items}</ul>')
+            elif roll < 0.3:
+                parts.append(f'<blockquote><p>{self.sentence()}</p></blockquote>')
+            elif roll < 0.33:
+                parts.append(f'<p style="margin: 0 0 1em;">{self.paragraph()}</p>')
+            else:
+                parts.append(f'<p>{self.paragraph()}</p>')
+        return '\n'.join(parts)
+
+    def rich_fields(self, field, low, high):
+        """``field`` and its rendered columns, as the pre_save signal would fill them"""
+        html = self.rich_html(low, high)
+        rendered = render(html)
+        return {
+            field: html,
+            f'{field}_html': rendered.html,
+            f'{field}_text': rendered.text,
+            'word_count': rendered.word_count,
+            'reading_time': rendered.reading_time,
+        }
+
+    def name(self):
+        return f'{self.random.choice(FIRST_NAMES)} {self.random.choice(LAST_NAMES)}'
+
+    def phone(self):
+        return f'07{self.random.randrange(10 ** 8):08d}'
+
+    def past(self, days):
+        return self.now - timedelta(seconds=self.random.randrange(days * 86400))
+
+    def dated(self, created):
+        return {'created_at': created, 'updated_at': created}
+
+    # Models
+
+    def services(self, count):
+        types = _choices(Service, 'service_type')
+        for index in range(count):
+            yield Service(
+                name=self.title(2, 4),
+                service_type=types[index % len(types)],
+                short_description=self.sentence(8, 20)[:255],
+                icon_name=self.random.choice(ICONS),
+                price_range=f'KES {self.random.randrange(1, 10) * 500} - {self.random.randrange(10, 30) * 500}',
+                duration=f'{self.random.choice([45, 60, 90])} minutes',
+                is_active=self.random.random() < 0.9,
+                order=index,
+                **self.rich_fields('description', 3, 8),
+                **self.dated(self.past(1500)),
+            )
+
+    def counselors(self, count):
+        for index in range(count):
+            name = self.name()
+            yield Counselor(
+                name=name,
+                title=self.random.choice(['Counseling Psychologist', 'Licensed Professional Counselor', 'Family Therapist']),
+                specialties=', '.join(self.random.sample(TAGS, 3)),
+                languages=self.random.choice(['English', 'English, Kiswahili', 'English, Kiswahili, French']),
+                experience_years=self.random.randint(1, 25),
+                email=f'{slugify(name)}.{index}@example.com',
+                is_active=self.random.random() < 0.95,
+                order=index,
+                **self.rich_fields('bio', 2, 4),
+                **self.dated(self.past(1500)),
+            )
+
+    def availability(self, counselors):
+        for counselor in counselors:
+            for weekday in range(5):
+                yield CounselorAvailability(counselor=counselor, weekday=weekday, start_time=clock(8), end_time=clock(17))
+
+    def posts(self, count, start=0):
+        categories = _choices(BlogPost, 'category')
+        for index in range(start, start + count):
+            title = self.title(4, 10)
+            published = self.past(5 * 365)
+            yield BlogPost(
+                title=title,
+                slug=f'{slugify(title)[:250]}-{index}',
+                author=self.name(),
+                excerpt=self.sentence(20, 40)[:500],
+                category=self.random.choice(categories),
+                tags=', '.join(self.random.sample(TAGS, self.random.randint(1, 4))),
+                is_featured=self.random.random() < 0.02,
+                views_count=int(self.random.paretovariate(1.2) * 50),
+                published_date=published,
+                is_published=self.random.random() < 0.95,
+                **self.rich_fields('content', 6, 20),
+                **self.dated(published),
+            )
+
+    def appointments(self, count, counselors, start=0):
+        """Bookings on distinct (counselor, slot) pairs, going back in time from 90 days ahead"""
+        types = _choices(Appointment, 'appointment_type')
+        modes = _choices(Appointment, 'session_mode')
+        per_day = max(len(counselors), 1) * APPOINTMENT_SLOTS_PER_DAY
+        last_day = self.now.date() + timedelta(days=90)
+        for index in range(start, start + count):
+            day, slot = divmod(index, per_day)
+            slot_of_day, counselor_index = divmod(slot, max(len(counselors), 1))
+            date = last_day - timedelta(days=day)
+            upcoming = date >= self.now.date()
+            status = self.random.choices(
+                ['pending', 'confirmed', 'cancelled'] if upcoming else ['completed', 'cancelled', 'rescheduled'],
+                weights=[3, 6, 1] if upcoming else [8, 1.5, 0.5],
+            )[0]
+            created = timezone.make_aware(datetime.combine(date, clock(7))) - timedelta(days=self.random.randint(1, 30))
+            name = self.name()
+            yield Appointment(
+                name=name,
+                email=f'{slugify(name)}.{index}@example.com',
+                phone=self.phone(),
+                preferred_date=date,
+                preferred_time=clock(8 + slot_of_day // 2, 30 * (slot_of_day % 2)),
+                appointment_type=self.random.choice(types),
+                session_mode=self.random.choice(modes),
+                counselor=counselors[counselor_index] if counselors and self.random.random() < 0.9 else None,
+                concerns=self.sentence(5, 30),
+                is_new_client=self.random.random() < 0.4,
+                hear_about_us=self.random.choice(['', 'Friend', 'Google', 'Instagram', 'Church', 'School']),
+                status=status,
+                **self.dated(min(created, self.now)),
+            )
+
+    def subscribers(self, count, start=0):
+        for index in range(start, start + count):
+            first = self.random.choice(FIRST_NAMES)
+            subscribed = self.past(4 * 365)
+            active = self.random.random() < 0.92
+            yield NewsletterSubscriber(
+                email=f'{first}.{self.random.choice(LAST_NAMES)}.{index}@example.com'.lower(),
+                first_name=first,
+                is_active=active,
+                subscribed_date=subscribed,
+                unsubscribed_date=None if active else subscribed + (self.now - subscribed) * self.random.random(),
+            )
+
+    def events(self, count):
+        types = _choices(Event, 'event_type')
+        for _ in range(count):
+            start = self.now + timedelta(hours=self.random.randint(-365 * 24, 180 * 24))
+            online = self.random.random() < 0.4
+            capacity = self.random.choice([0, 20, 30, 50, 100])
+            yield Event(
+                title=self.title(3, 7),
+                event_type=self.random.choice(types),
+                start_date=start,
+                end_date=start + timedelta(hours=self.random.choice([1, 2, 3, 6])),
+                location='Online' if online else self.random.choice(LOCATIONS[:-1]),
+                is_online=online,
+                online_link='https://meet.example.com/' + slugify(self.words(2, 3)) if online else None,
+                max_participants=capacity,
+                current_participants=self.random.randint(0, capacity) if capacity else self.random.randint(0, 200),
+                price=Decimal(self.random.choice([0, 0, 500, 1000, 2500])),
+                is_featured=self.random.random() < 0.05,
+                is_published=self.random.random() < 0.9,
+                **self.rich_fields('description', 2, 6),
+                **self.dated(start - timedelta(days=self.random.randint(7, 60))),
+            )
+
+    def faqs(self, count):
+        categories = _choices(FAQ, 'category')
+        for index in range(count):
+            yield FAQ(
+                question=self.sentence(6, 14)[:-1] + '?',
+                category=categories[index % len(categories)],
+                order=index,
+                is_active=self.random.random() < 0.95,
+                **self.rich_fields('answer', 1, 3),
+                **self.dated(self.past(1500)),
+            )
+
+    def testimonials(self, count, services):
+        for _ in range(count):
+            first, last = self.random.choice(FIRST_NAMES), self.random.choice(LAST_NAMES)
+            yield Testimonial(
+                client_name=f'{first} {last}',
+                client_initials=f'{first[0]}.{last[0]}.',
+                location=self.random.choice(LOCATIONS),
+                testimonial=' '.join(self.sentence() for _ in range(self.random.randint(2, 5))),
+                rating=self.random.choices([3, 4, 5], weights=[1, 3, 6])[0],
+                service_received=self.random.choice(services) if services else None,
+                is_featured=self.random.random() < 0.05,
+                is_approved=self.random.random() < 0.8,
+                **self.dated(self.past(1500)),
+            )
+
+    def resources(self, count):
+        types = _choices(Resource, 'resource_type')
+        for _ in range(count):
+            yield Resource(
+                title=self.title(3, 8),
+                resource_type=self.random.choice(types),
+                description=' '.join(self.sentence() for _ in range(self.random.randint(1, 3))),
+                content=self.rich_html(2, 6),
+                external_url='https://example.org/' + slugify(self.words(2, 4)),
+                category=self.random.choice(TAGS),
+                is_featured=self.random.random() < 0.1,
+                downloads_count=int(self.random.paretovariate(1.5) * 10),
+                **self.dated(self.past(1500)),
+            )
+
+
+def link_tags(posts):
+    """Fill BlogPost.normalized_tags of bulk-created posts, as tags.sync_post_tags does"""
+    post_slugs = {post.pk: {tag_slug(name): name for name in post.get_tags_list()} for post in posts}
+    names = {slug: name for slugs in post_slugs.values() for slug, name in slugs.items()}
+    Tag.objects.bulk_create([Tag(name=name, slug=slug) for slug, name in names.items()], ignore_conflicts=True)
+    tag_ids = dict(Tag.objects.filter(slug__in=names).values_list('slug', 'pk'))
+    through = BlogPost.normalized_tags.through
+    through.objects.bulk_create([
+        through(blogpost_id=pk, tag_id=tag_ids[slug]) for pk, slugs in post_slugs.items() for slug in slugs
+    ])
+
+
+def generate(counts=None, seed=0, batch_size=2000, log=None):
+    """Add ``counts`` rows (COUNTS by default) per model; returns {name: rows}"""
+    counts = {**COUNTS, **(counts or {})}
+    generator = Generator(seed)
+    created = {}
+
+    def step(name, insert):
+        started = time.perf_counter()
+        created[name] = insert()
+        if log:
+            log(f'{name}: {created[name]} in {time.perf_counter() - started:.1f}s')
+
+    step('services', lambda: bulk_insert(Service, generator.services(counts['services']), batch_size))
+    services = list(Service.objects.order_by('-pk')[:counts['services']])
+    step('counselors', lambda: bulk_insert(Counselor, generator.counselors(counts['counselors']), batch_size))
+    counselors = list(Counselor.objects.order_by('-pk')[:counts['counselors']])[::-1]
+    step('availability', lambda: bulk_insert(CounselorAvailability, generator.availability(counselors), batch_size))
+    step('posts', lambda: bulk_insert(
+        BlogPost, generator.posts(counts['posts'], BlogPost.objects.count()), batch_size, after_batch=link_tags,
+    ))
+    # Existing rows shift the generated emails and slots so reruns add rows
+    step('appointments', lambda: bulk_insert(
+        Appointment, generator.appointments(counts['appointments'], counselors, Appointment.objects.count()),
+        batch_size, ignore_conflicts=True,
+    ))
+    step('subscribers', lambda: bulk_insert(
+        NewsletterSubscriber, generator.subscribers(counts['subscribers'], NewsletterSubscriber.objects.count()),
+        batch_size, ignore_conflicts=True,
+    ))
+    step('events', lambda: bulk_insert(Event, generator.events(counts['events']), batch_size))
+    step('faqs', lambda: bulk_insert(FAQ, generator.faqs(counts['faqs']), batch_size))
+    step('testimonials', lambda: bulk_insert(Testimonial, generator.testimonials(counts['testimonials'], services), batch_size))
+    step('resources', lambda: bulk_insert(Resource, generator.resources(counts['resources']), batch_size))
+    step('search entries', lambda: search.rebuild_index(batch_size))
+
+    bump_content_version()
+    invalidate_top_tags()
+    return created
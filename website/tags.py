@@ -0,0 +1,60 @@
+"""
+Blog tags.
+
+BlogPost.tags stays the comma-separated field edited in the admin; on save
+it is mirrored into the normalized Tag table (BlogPost.normalized_tags) so
+tag filtering is an indexed join on Tag.slug rather than a LIKE scan. The
+top-tags aggregate is cached until a post or its tags change.
+"""
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils.text import slugify
+
+from .models import Tag
+
+TOP_TAGS_KEY = 'website:top_tags'
+TOP_TAGS_CACHED = 50  # cached once and sliced for every smaller limit
+
+
+def tag_slug(name):
+    return slugify(name.strip())[:100]
+
+
+def sync_post_tags(post):
+    """Point post.normalized_tags at the tags listed in post.tags"""
+    names = {}
+    for name in post.get_tags_list():
+        slug = tag_slug(name)
+        if slug:
+            names.setdefault(slug, name)
+
+    existing = {tag.slug: tag for tag in Tag.objects.filter(slug__in=names)}
+    missing = [Tag(name=name, slug=slug) for slug, name in names.items() if slug not in existing]
+    if missing:
+        Tag.objects.bulk_create(missing, ignore_conflicts=True)
+        existing = {tag.slug: tag for tag in Tag.objects.filter(slug__in=names)}
+    post.normalized_tags.set(existing.values())
+
+
+def _count_tags(limit):
+    return list(
+        Tag.objects.annotate(count=Count('posts', filter=Q(posts__is_published=True)))
+        .filter(count__gt=0)
+        .order_by('-count', 'name')
+        .values_list('name', 'count')[:limit]
+    )
+
+
+def top_tags(limit=10):
+    """[(name, count)] of the most used tags on published posts"""
+    if limit > TOP_TAGS_CACHED:
+        return _count_tags(limit)
+    tags = cache.get(TOP_TAGS_KEY)
+    if tags is None:
+        tags = _count_tags(TOP_TAGS_CACHED)
+        cache.set(TOP_TAGS_KEY, tags, None)
+    return tags[:limit]
+
+
+def invalidate_top_tags():
+    cache.delete(TOP_TAGS_KEY)
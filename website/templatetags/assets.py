@@ -0,0 +1,24 @@
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from ..assets import bundle_sources
+
+register = template.Library()
+
+TAGS = {
+    '.css': '<link rel="stylesheet" href="{}">',
+    '.js': '<script src="{}"></script>',
+}
+
+
+@register.simple_tag
+def bundle(name):
+    """Link a STATIC_BUNDLES bundle, or its sources until collectstatic has built it"""
+    tag = TAGS[name[name.rfind('.'):]]
+    has_bundle = getattr(staticfiles_storage, 'has_bundle', None)
+    if not settings.DEBUG and has_bundle and has_bundle(name):
+        return format_html(tag, static(name))
+    return format_html_join('\n', tag, ((static(source),) for source in bundle_sources(name)))
@@ -0,0 +1,52 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+from ..images import FORMATS, image_variants
+
+register = template.Library()
+
+
+def _srcset(variants, fmt):
+    return ', '.join(
+        f"{default_storage.url(v['name'])} {v['width']}w" for v in variants if v['format'] == fmt
+    )
+
+
+@register.simple_tag
+def srcset(fieldfile, fmt='jpeg'):
+    """``srcset`` value for an image field's derivatives, '' until they exist"""
+    return _srcset(image_variants(fieldfile), fmt)
+
+
+@register.simple_tag
+def picture(fieldfile, sizes='100vw', **attrs):
+    """
+    ``<picture>`` with WebP and JPEG derivatives of an image field, lazily
+    loaded. Extra keyword arguments become ``<img>`` attributes. Falls back
+    to a plain ``<img>`` of the original when there are no derivatives.
+    """
+    if not fieldfile:
+        return ''
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    variants = image_variants(fieldfile)
+    if not variants:
+        return format_html('<img src="{}"{}>', fieldfile.url, _attributes(attrs))
+
+    fallback = [v for v in variants if v['format'] == 'jpeg'][-1]
+    if 'width' not in attrs and 'height' not in attrs:
+        # Intrinsic size so the browser reserves space before loading
+        attrs.update(width=fallback['width'], height=fallback['height'])
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((FORMATS[fmt][2], _srcset(variants, fmt), sizes) for fmt in FORMATS if fmt != 'jpeg'),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        sources, default_storage.url(fallback['name']), _srcset(variants, 'jpeg'), sizes, _attributes(attrs),
+    )
+
+
+def _attributes(attrs):
+    return format_html_join('', ' {}="{}"', attrs.items())
@@ -1,6 +1,6 @@
 from django.urls import path
 from django.contrib.auth import views as auth_views  # Add this import
-from . import views
+from . import api, metrics, views
 
 app_name = 'website'
 
@@ -41,6 +41,7 @@ urlpatterns = [
     # Counselor
     path('counselors/', views.counselors, name='counselors'),
     path('counselors/<int:counselor_id>/', views.counselor_detail, name='counselor_detail'),
+    path('counselors/<int:counselor_id>/slots/', views.counselor_slots, name='counselor_slots'),
     
     # Testimonials
     path('testimonials/', views.testimonials, name='testimonials'),
@@ -48,6 +49,14 @@ urlpatterns = [
     # Search
     path('search/', views.search, name='search'),
     
+    # Read-only JSON API (see api.py)
+    path('api/v1/', api.api_root, name='api_root'),
+    path('api/v1/<str:endpoint>/', api.list_view, name='api_list'),
+    path('api/v1/<str:endpoint>/<int:pk>/', api.detail_view, name='api_detail'),
+
+    # Prometheus scrape target, no trailing slash by convention (see metrics.py)
+    path('metrics', metrics.metrics_view, name='metrics'),
+    
     # Dashboard
     path('dashboard/', views.dashboard, name='dashboard'),
     path('dashboard-test/', views.simple_dashboard, name='dashboard_test'),
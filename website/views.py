@@ -1,23 +1,48 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.db.models import Q, Count
 from django.utils import timezone
-from django.http import HttpResponse, JsonResponse
-from django.core.mail import send_mail, EmailMessage
+from django.http import JsonResponse
 from django.template.loader import render_to_string
 from django.conf import settings
+from django.views.decorators.csrf import csrf_exempt
+from django.db import IntegrityError, transaction
 from .models import *
 from .forms import *
+from .availability import Schedule, lock_and_check_slot
+from .caching import cache_public_page, get_site_settings
+from .downloads import serve_file
+from .images import prefetch_variants
+from . import counters
+from .mail import queue_mail
+from .newsletter import check_unsubscribe_token
+from .pagination import CursorPaginator
+from .querybudget import query_budget
+from .registrations import register_for_event
+from . import search as search_index
+from .stats import get_dashboard_stats
+from .tags import tag_slug, top_tags
 import json
+from datetime import date, timedelta
 
+# Listings show excerpts and reading time, never the article body
+POST_BODY_FIELDS = ('content', 'content_html', 'content_text')
+# Service cards show the short description only
+SERVICE_BODY_FIELDS = ('description', 'description_html', 'description_text')
+
+def _staff_recipients():
+    """Address that receives staff notifications"""
+    site_settings = get_site_settings()
+    return [site_settings.email] if site_settings else [settings.CONTACT_EMAIL]
+
+@query_budget(6)
+@cache_public_page
 def home(request):
     """Home page view"""
-    site_settings = SiteSetting.objects.first()
-    
     # Get featured content
-    featured_services = Service.objects.filter(is_active=True)[:3]
-    featured_blog = BlogPost.objects.filter(is_featured=True, is_published=True)[:3]
+    featured_services = Service.objects.filter(is_active=True).defer(*SERVICE_BODY_FIELDS)[:3]
+    featured_blog = list(BlogPost.objects.filter(is_featured=True, is_published=True).defer(*POST_BODY_FIELDS)[:3])
+    prefetch_variants(post.featured_image for post in featured_blog)
     testimonials = Testimonial.objects.filter(is_approved=True, is_featured=True)[:5]
     upcoming_events = Event.objects.filter(
         is_published=True,
@@ -29,7 +54,6 @@ def home(request):
     faqs = FAQ.objects.filter(is_active=True)[:4]
     
     context = {
-        'site_settings': site_settings,
         'featured_services': featured_services,
         'featured_blog': featured_blog,
         'testimonials': testimonials,
@@ -39,9 +63,9 @@ def home(request):
     }
     return render(request, 'home.html', context)
 
+@cache_public_page
 def about(request):
     """About us page"""
-    site_settings = SiteSetting.objects.first()
     counselors = Counselor.objects.filter(is_active=True)
     testimonials = Testimonial.objects.filter(is_approved=True)[:6]
     
@@ -56,34 +80,20 @@ def about(request):
     ]
     
     context = {
-        'site_settings': site_settings,
         'counselors': counselors,
         'testimonials': testimonials,
         'values': values,
     }
     return render(request, 'about.html', context)
 
+@query_budget(2)  # with the site settings, on a cold cache
+@cache_public_page
 def services(request):
     """Services listing page"""
-    site_settings = SiteSetting.objects.first()
-    
-    # Group services by type
-    individual_services = Service.objects.filter(
-        service_type='individual',
-        is_active=True
-    )
-    group_services = Service.objects.filter(
-        service_type='group',
-        is_active=True
-    )
-    workshop_services = Service.objects.filter(
-        service_type='workshop',
-        is_active=True
-    )
-    outreach_services = Service.objects.filter(
-        service_type='outreach',
-        is_active=True
-    )
+    # Group services by type, from one query
+    services_by_type = {service_type: [] for service_type, _ in Service.SERVICE_TYPES}
+    for service in Service.objects.filter(is_active=True).defer(*SERVICE_BODY_FIELDS):
+        services_by_type.setdefault(service.service_type, []).append(service)
     
     # Approaches from your overview
     approaches = [
@@ -96,11 +106,10 @@ def services(request):
     ]
     
     context = {
-        'site_settings': site_settings,
-        'individual_services': individual_services,
-        'group_services': group_services,
-        'workshop_services': workshop_services,
-        'outreach_services': outreach_services,
+        'individual_services': services_by_type['individual'],
+        'group_services': services_by_type['group'],
+        'workshop_services': services_by_type['workshop'],
+        'outreach_services': services_by_type['outreach'],
         'approaches': approaches,
     }
     return render(request, 'services.html', context)
@@ -108,14 +117,13 @@ def services(request):
 def service_detail(request, service_id):
     """Individual service detail page"""
     service = get_object_or_404(Service, id=service_id, is_active=True)
-    site_settings = SiteSetting.objects.first()
+    
     related_services = Service.objects.filter(
         service_type=service.service_type,
         is_active=True
     ).exclude(id=service.id)[:3]
     
     context = {
-        'site_settings': site_settings,
         'service': service,
         'related_services': related_services,
     }
@@ -123,32 +131,30 @@ def service_detail(request, service_id):
 
 def blog_list(request):
     """Blog listing page with pagination and filters"""
-    site_settings = SiteSetting.objects.first()
-    
     # Get all published blog posts
-    blog_posts = BlogPost.objects.filter(is_published=True)
+    blog_posts = BlogPost.objects.filter(is_published=True).defer(*POST_BODY_FIELDS)
     
     # Filter by category if specified
     category = request.GET.get('category')
     if category:
         blog_posts = blog_posts.filter(category=category)
     
-    # Filter by tag if specified
+    # Filter by tag if specified (exact match through the Tag table)
     tag = request.GET.get('tag')
     if tag:
-        blog_posts = blog_posts.filter(tags__icontains=tag)
+        blog_posts = blog_posts.filter(normalized_tags__slug=tag_slug(tag))
     
     # Search functionality
     query = request.GET.get('q')
     if query:
         blog_posts = blog_posts.filter(
             Q(title__icontains=query) |
-            Q(content__icontains=query) |
+            Q(content_text__icontains=query) |
             Q(excerpt__icontains=query)
         )
     
     # Pagination
-    paginator = Paginator(blog_posts, 6)  # 6 posts per page
+    paginator = CursorPaginator(blog_posts, 6)  # 6 posts per page, keyset on -published_date
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
@@ -157,19 +163,10 @@ def blog_list(request):
         count=Count('category')
     ).order_by('-count')
     
-    # Get popular tags
-    all_tags = BlogPost.objects.filter(is_published=True).values_list('tags', flat=True)
-    tag_list = []
-    for tags in all_tags:
-        if tags:
-            tag_list.extend([tag.strip() for tag in tags.split(',')])
-    
-    # Count tag frequency
-    from collections import Counter
-    tag_frequency = Counter(tag_list).most_common(10)
+    # Get popular tags (cached aggregate, see tags.py)
+    tag_frequency = top_tags(10)
     
     context = {
-        'site_settings': site_settings,
         'page_obj': page_obj,
         'categories': categories,
         'tag_frequency': tag_frequency,
@@ -182,20 +179,17 @@ def blog_list(request):
 def blog_detail(request, slug):
     """Individual blog post page"""
     blog_post = get_object_or_404(BlogPost, slug=slug, is_published=True)
-    site_settings = SiteSetting.objects.first()
     
-    # Increment view count
-    blog_post.views_count += 1
-    blog_post.save(update_fields=['views_count'])
+    # Increment view count (buffered, see counters.py)
+    blog_post.views_count += counters.increment(blog_post, 'views_count')
     
     # Get related posts
     related_posts = BlogPost.objects.filter(
         category=blog_post.category,
         is_published=True
-    ).exclude(id=blog_post.id)[:3]
+    ).exclude(id=blog_post.id).defer(*POST_BODY_FIELDS)[:3]
     
     context = {
-        'site_settings': site_settings,
         'blog_post': blog_post,
         'related_posts': related_posts,
     }
@@ -203,18 +197,16 @@ def blog_detail(request, slug):
 
 def blog_category(request, category):
     """Filter blog posts by category"""
-    site_settings = SiteSetting.objects.first()
     blog_posts = BlogPost.objects.filter(
         category=category,
         is_published=True
-    )
+    ).defer(*POST_BODY_FIELDS)
     
-    paginator = Paginator(blog_posts, 6)
+    paginator = CursorPaginator(blog_posts, 6)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
     context = {
-        'site_settings': site_settings,
         'page_obj': page_obj,
         'category': category,
     }
@@ -222,15 +214,13 @@ def blog_category(request, category):
 
 def contact(request):
     """Contact page with form"""
-    site_settings = SiteSetting.objects.first()
-    
     if request.method == 'POST':
         form = ContactForm(request.POST)
         if form.is_valid():
             # Save to database
             contact_message = form.save()
             
-            # Send email notification
+            # Queue email notification (sent by the send_queued_mail command)
             try:
                 subject = f"New Contact Message: {contact_message.subject}"
                 message = render_to_string('emails/contact_notification.txt', {
@@ -240,12 +230,11 @@ def contact(request):
                     'subject': contact_message.subject,
                     'message': contact_message.message,
                 })
-                send_mail(
+                queue_mail(
                     subject,
                     message,
                     settings.DEFAULT_FROM_EMAIL,
-                    [site_settings.email] if site_settings else [settings.CONTACT_EMAIL],
-                    fail_silently=False,
+                    _staff_recipients(),
                 )
                 
                 # Send auto-reply to user
@@ -253,12 +242,11 @@ def contact(request):
                 auto_reply_message = render_to_string('emails/contact_autoreply.txt', {
                     'name': contact_message.name,
                 })
-                send_mail(
+                queue_mail(
                     auto_reply_subject,
                     auto_reply_message,
                     settings.DEFAULT_FROM_EMAIL,
                     [contact_message.email],
-                    fail_silently=False,
                 )
             except:
                 # Log error but don't break the user experience
@@ -270,60 +258,69 @@ def contact(request):
         form = ContactForm()
     
     context = {
-        'site_settings': site_settings,
         'form': form,
     }
     return render(request, 'contact.html', context)
 
 def book_appointment(request):
     """Appointment booking page"""
-    site_settings = SiteSetting.objects.first()
     counselors = Counselor.objects.filter(is_active=True)
     
     if request.method == 'POST':
         form = AppointmentForm(request.POST)
         if form.is_valid():
-            appointment = form.save()
-            
-            # Send confirmation email
+            data = form.cleaned_data
             try:
-                subject = "Appointment Request Received - Suzstar Counseling"
-                message = render_to_string('emails/appointment_confirmation.txt', {
-                    'name': appointment.name,
-                    'date': appointment.preferred_date,
-                    'time': appointment.preferred_time,
-                    'appointment_type': appointment.get_appointment_type_display(),
-                })
-                send_mail(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [appointment.email],
-                    fail_silently=False,
-                )
+                with transaction.atomic():
+                    # Checked again with the counselor locked: an overlapping
+                    # booking may have been saved since validation
+                    error = data['counselor'] and lock_and_check_slot(
+                        data['counselor'], data['preferred_date'], data['preferred_time'], data['appointment_type'],
+                    )
+                    if not error:
+                        appointment = form.save()
+            except IntegrityError:
+                # The same start time was taken between validation and saving
+                error = 'This slot was just booked. Please choose another time.'
+            if error:
+                form.add_error('preferred_time', error)
+            else:
+                # Send confirmation email
+                try:
+                    subject = "Appointment Request Received - Suzstar Counseling"
+                    message = render_to_string('emails/appointment_confirmation.txt', {
+                        'name': appointment.name,
+                        'date': appointment.preferred_date,
+                        'time': appointment.preferred_time,
+                        'appointment_type': appointment.get_appointment_type_display(),
+                    })
+                    queue_mail(
+                        subject,
+                        message,
+                        settings.DEFAULT_FROM_EMAIL,
+                        [appointment.email],
+                    )
                 
-                # Notify admin
-                admin_subject = f"New Appointment Booking: {appointment.name}"
-                admin_message = render_to_string('emails/admin_appointment_notification.txt', {
-                    'appointment': appointment,
-                })
-                send_mail(
-                    admin_subject,
-                    admin_message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [site_settings.email] if site_settings else [settings.CONTACT_EMAIL],
-                    fail_silently=False,
-                )
-            except:
-                pass
-            
-            messages.success(request, 'Your appointment request has been submitted successfully!')
-            return redirect('website:appointment_success', appointment_id=appointment.id)
+                    # Notify admin
+                    admin_subject = f"New Appointment Booking: {appointment.name}"
+                    admin_message = render_to_string('emails/admin_appointment_notification.txt', {
+                        'appointment': appointment,
+                    })
+                    queue_mail(
+                        admin_subject,
+                        admin_message,
+                        settings.DEFAULT_FROM_EMAIL,
+                        _staff_recipients(),
+                    )
+                except:
+                    pass
+                
+                messages.success(request, 'Your appointment request has been submitted successfully!')
+                return redirect('website:appointment_success', appointment_id=appointment.id)
     else:
         form = AppointmentForm()
     
     context = {
-        'site_settings': site_settings,
         'form': form,
         'counselors': counselors,
     }
@@ -332,18 +329,14 @@ def book_appointment(request):
 def appointment_success(request, appointment_id):
     """Appointment booking success page"""
     appointment = get_object_or_404(Appointment, id=appointment_id)
-    site_settings = SiteSetting.objects.first()
     
     context = {
-        'site_settings': site_settings,
         'appointment': appointment,
     }
     return render(request, 'appointment_success.html', context)
 
 def resources(request):
     """Resources listing page"""
-    site_settings = SiteSetting.objects.first()
-    
     # Get all resources
     resources_list = Resource.objects.all()
     
@@ -365,7 +358,7 @@ def resources(request):
             Q(description__icontains=query)
         )
     
-    paginator = Paginator(resources_list, 9)
+    paginator = CursorPaginator(resources_list, 9)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
@@ -373,7 +366,6 @@ def resources(request):
     categories = Resource.objects.values_list('category', flat=True).distinct()
     
     context = {
-        'site_settings': site_settings,
         'page_obj': page_obj,
         'categories': categories,
         'current_type': resource_type,
@@ -385,10 +377,8 @@ def resources(request):
 def resource_detail(request, resource_id):
     """Individual resource detail page"""
     resource = get_object_or_404(Resource, id=resource_id)
-    site_settings = SiteSetting.objects.first()
     
     context = {
-        'site_settings': site_settings,
         'resource': resource,
     }
     return render(request, 'resource_detail.html', context)
@@ -398,13 +388,12 @@ def download_resource(request, resource_id):
     resource = get_object_or_404(Resource, id=resource_id)
     
     if resource.file_upload:
-        # Increment download count
-        resource.downloads_count += 1
-        resource.save(update_fields=['downloads_count'])
+        # Stream the file (supports Range, ETag and proxy offload)
+        response, counted = serve_file(request, resource.file_upload)
         
-        # Serve the file
-        response = HttpResponse(resource.file_upload, content_type='application/force-download')
-        response['Content-Disposition'] = f'attachment; filename="{resource.file_upload.name}"'
+        # Increment download count (buffered, see counters.py)
+        if counted:
+            counters.increment(resource, 'downloads_count')
         return response
     
     messages.error(request, 'This resource is not available for download.')
@@ -412,8 +401,6 @@ def download_resource(request, resource_id):
 
 def events(request):
     """Events listing page"""
-    site_settings = SiteSetting.objects.first()
-    
     # Get upcoming events
     upcoming_events = Event.objects.filter(
         is_published=True,
@@ -432,7 +419,6 @@ def events(request):
         upcoming_events = upcoming_events.filter(event_type=event_type)
     
     context = {
-        'site_settings': site_settings,
         'upcoming_events': upcoming_events,
         'past_events': past_events,
         'current_type': event_type,
@@ -442,10 +428,8 @@ def events(request):
 def event_detail(request, event_id):
     """Individual event detail page"""
     event = get_object_or_404(Event, id=event_id, is_published=True)
-    site_settings = SiteSetting.objects.first()
     
     context = {
-        'site_settings': site_settings,
         'event': event,
     }
     return render(request, 'event_detail.html', context)
@@ -457,19 +441,13 @@ def event_register(request, event_id):
     if request.method == 'POST':
         form = EventRegistrationForm(request.POST)
         if form.is_valid():
-            # Check if event is full
-            if event.is_full:
-                messages.error(request, 'Sorry, this event is already full.')
+            # Claim a seat atomically, or join the waitlist when full
+            try:
+                registration = register_for_event(event, **form.cleaned_data)
+            except IntegrityError:
+                messages.info(request, 'You are already registered for this event.')
                 return redirect('website:event_detail', event_id=event.id)
-            
-            # Create registration
-            registration = form.save(commit=False)
-            registration.event = event
-            registration.save()
-            
-            # Update participant count
-            event.current_participants += 1
-            event.save(update_fields=['current_participants'])
+            waitlisted = registration.status == 'waitlisted'
             
             # Send confirmation email
             try:
@@ -477,18 +455,21 @@ def event_register(request, event_id):
                 message = render_to_string('emails/event_registration.txt', {
                     'name': registration.name,
                     'event': event,
+                    'waitlisted': waitlisted,
                 })
-                send_mail(
+                queue_mail(
                     subject,
                     message,
                     settings.DEFAULT_FROM_EMAIL,
                     [registration.email],
-                    fail_silently=False,
                 )
             except:
                 pass
             
-            messages.success(request, 'You have successfully registered for this event!')
+            if waitlisted:
+                messages.info(request, 'This event is full. You have been added to the waitlist.')
+            else:
+                messages.success(request, 'You have successfully registered for this event!')
             return redirect('website:event_detail', event_id=event.id)
     else:
         form = EventRegistrationForm()
@@ -499,22 +480,16 @@ def event_register(request, event_id):
     }
     return render(request, 'event_register.html', context)
 
+@query_budget(2)
+@cache_public_page
 def faq(request):
     """Frequently Asked Questions page"""
-    site_settings = SiteSetting.objects.first()
-    
-    # Group FAQs by category
-    categories = FAQ.objects.filter(is_active=True).values_list('category', flat=True).distinct()
-    
+    # Group FAQs by category, from one query ordered by category
     faqs_by_category = {}
-    for category in categories:
-        faqs_by_category[category] = FAQ.objects.filter(
-            category=category,
-            is_active=True
-        )
+    for question in FAQ.objects.filter(is_active=True):
+        faqs_by_category.setdefault(question.category, []).append(question)
     
     context = {
-        'site_settings': site_settings,
         'faqs_by_category': faqs_by_category,
     }
     return render(request, 'faq.html', context)
@@ -544,12 +519,11 @@ def newsletter_subscribe(request):
                 message = render_to_string('emails/newsletter_welcome.txt', {
                     'first_name': first_name or 'there',
                 })
-                send_mail(
+                queue_mail(
                     subject,
                     message,
                     settings.DEFAULT_FROM_EMAIL,
                     [email],
-                    fail_silently=False,
                 )
             except:
                 pass
@@ -560,10 +534,17 @@ def newsletter_subscribe(request):
     
     return redirect(request.META.get('HTTP_REFERER', 'website:home'))
 
+@csrf_exempt
 def newsletter_unsubscribe(request, email):
-    """Handle newsletter unsubscription"""
+    """Handle newsletter unsubscription from the signed link in campaign emails"""
+    # POST is the one-click unsubscribe of RFC 8058 (List-Unsubscribe-Post);
+    # the token, not a CSRF cookie, proves the request came from the email
+    token = request.POST.get('token') or request.GET.get('token')
+    if not check_unsubscribe_token(email, token):
+        messages.error(request, 'This unsubscribe link is not valid.')
+        return redirect('website:home')
     try:
-        subscriber = NewsletterSubscriber.objects.get(email=email)
+        subscriber = NewsletterSubscriber.objects.get(email__iexact=email)
         subscriber.is_active = False
         subscriber.unsubscribed_date = timezone.now()
         subscriber.save()
@@ -573,96 +554,72 @@ def newsletter_unsubscribe(request, email):
     
     return redirect('website:home')
 
+@cache_public_page
 def counselors(request):
     """Counselors listing page"""
-    site_settings = SiteSetting.objects.first()
     counselors_list = Counselor.objects.filter(is_active=True)
     
     context = {
-        'site_settings': site_settings,
         'counselors': counselors_list,
     }
     return render(request, 'counselors.html', context)
 
+def counselor_slots(request, counselor_id):
+    """JSON list of free appointment slots, used by the booking form"""
+    counselor = get_object_or_404(Counselor, id=counselor_id, is_active=True)
+    appointment_type = request.GET.get('type', 'individual')
+    try:
+        start = date.fromisoformat(request.GET['start']) if request.GET.get('start') else timezone.localdate()
+        days = max(1, min(int(request.GET.get('days', 14)), 90))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid start or days'}, status=400)
+    
+    schedule = Schedule([counselor.id], start, start + timedelta(days=days - 1))
+    slots = schedule.free_slots(counselor.id, appointment_type)
+    return JsonResponse({
+        'counselor': counselor.id,
+        'duration': schedule.duration(appointment_type),
+        'slots': {
+            day.isoformat(): [t.strftime('%H:%M') for t in times]
+            for day, times in slots.items()
+        },
+    })
+
 def counselor_detail(request, counselor_id):
     """Individual counselor detail page"""
     counselor = get_object_or_404(Counselor, id=counselor_id, is_active=True)
-    site_settings = SiteSetting.objects.first()
     
     context = {
-        'site_settings': site_settings,
         'counselor': counselor,
     }
     return render(request, 'counselor_detail.html', context)
 
+@cache_public_page
 def testimonials(request):
     """Testimonials listing page"""
-    site_settings = SiteSetting.objects.first()
     testimonials_list = Testimonial.objects.filter(is_approved=True)
     
-    paginator = Paginator(testimonials_list, 12)
+    paginator = CursorPaginator(testimonials_list, 12)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
     context = {
-        'site_settings': site_settings,
         'page_obj': page_obj,
     }
     return render(request, 'testimonials.html', context)
 
 def search(request):
     """Global search functionality"""
-    site_settings = SiteSetting.objects.first()
     query = request.GET.get('q', '')
     
-    results = {
-        'services': [],
-        'blog': [],
-        'resources': [],
-        'events': [],
-        'faqs': [],
-    }
+    results = {kind: [] for kind in search_index.RESULT_KINDS}
     
     if query and len(query) >= 3:
-        # Search services
-        results['services'] = Service.objects.filter(
-            Q(name__icontains=query) |
-            Q(short_description__icontains=query) |
-            Q(description__icontains=query),
-            is_active=True
-        )[:5]
-        
-        # Search blog
-        results['blog'] = BlogPost.objects.filter(
-            Q(title__icontains=query) |
-            Q(content__icontains=query) |
-            Q(excerpt__icontains=query),
-            is_published=True
-        )[:5]
-        
-        # Search resources
-        results['resources'] = Resource.objects.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query)
-        )[:5]
-        
-        # Search events
-        results['events'] = Event.objects.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query),
-            is_published=True,
-            start_date__gte=timezone.now()
-        )[:5]
-        
-        # Search FAQ
-        results['faqs'] = FAQ.objects.filter(
-            Q(question__icontains=query) |
-            Q(answer__icontains=query),
-            is_active=True
-        )[:5]
+        # One ranked, highlighted query against the full-text index
+        for hit in search_index.search(query, per_kind=5):
+            results[hit.kind].append(hit)
     
     context = {
-        'site_settings': site_settings,
         'query': query,
         'results': results,
     }
@@ -677,67 +634,24 @@ from django.utils import timezone
 from datetime import timedelta
 from .models import *
 
+@query_budget(12)
 @login_required(login_url='/admin/login/')
 @staff_member_required
 def dashboard(request):
     """Main dashboard view - accessible only to staff members"""
     
-    # Get statistics for dashboard
-    total_appointments = Appointment.objects.count()
-    pending_appointments = Appointment.objects.filter(status='pending').count()
-    confirmed_appointments = Appointment.objects.filter(status='confirmed').count()
-    completed_appointments = Appointment.objects.filter(status='completed').count()
+    # Chart range, e.g. ?days=30
+    try:
+        days = int(request.GET.get('days', 7))
+    except ValueError:
+        days = 7
     
     # Get recent appointments
-    recent_appointments = Appointment.objects.all().order_by('-created_at')[:10]
-    
-    # Get blog stats
-    total_blog_posts = BlogPost.objects.count()
-    published_posts = BlogPost.objects.filter(is_published=True).count()
-    
-    # Get contact messages
-    unread_messages = ContactMessage.objects.filter(is_read=False).count()
-    
-    # Get subscribers
-    total_subscribers = NewsletterSubscriber.objects.filter(is_active=True).count()
-    
-    # Get events
-    upcoming_events = Event.objects.filter(
-        start_date__gte=timezone.now(),
-        is_published=True
-    ).count()
-    
-    # Chart data (last 7 days)
-    last_7_days = []
-    appointments_data = []
-    
-    for i in range(6, -1, -1):
-        date = timezone.now().date() - timedelta(days=i)
-        last_7_days.append(date.strftime('%a'))
-        count = Appointment.objects.filter(
-            preferred_date=date
-        ).count()
-        appointments_data.append(count)
-    
-    # Service distribution
-    service_types = Appointment.objects.values('appointment_type').annotate(
-        count=Count('appointment_type')
-    )
+    recent_appointments = Appointment.objects.select_related('counselor').order_by('-created_at')[:10]
     
     context = {
-        'total_appointments': total_appointments,
-        'pending_appointments': pending_appointments,
-        'confirmed_appointments': confirmed_appointments,
-        'completed_appointments': completed_appointments,
+        **get_dashboard_stats(days),
         'recent_appointments': recent_appointments,
-        'total_blog_posts': total_blog_posts,
-        'published_posts': published_posts,
-        'unread_messages': unread_messages,
-        'total_subscribers': total_subscribers,
-        'upcoming_events': upcoming_events,
-        'last_7_days': last_7_days,
-        'appointments_data': appointments_data,
-        'service_types': service_types,
     }
     
     return render(request, 'dashboard/dashboard.html', context)